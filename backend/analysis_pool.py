@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any
+
+from backend.engines.match_analyzer import analyze_frames
+from backend.parsers.grid_parser import STREAM_CHUNK_BYTES, iter_json_frames
+
+
+def analysis_workers() -> int:
+    """Worker processes for match analysis (`ANALYSIS_WORKERS`, default: all cores)."""
+
+    configured = os.environ.get("ANALYSIS_WORKERS")
+    if configured:
+        return max(1, int(configured))
+    return os.cpu_count() or 1
+
+
+_POOL: ProcessPoolExecutor | None = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_analysis_pool() -> ProcessPoolExecutor:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ProcessPoolExecutor(max_workers=analysis_workers())
+        return _POOL
+
+
+def shutdown_analysis_pool() -> None:
+    global _POOL
+    with _POOL_LOCK:
+        pool, _POOL = _POOL, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+class AnalysisOverloaded(RuntimeError):
+    """Raised when the analysis queue is full (admission control)."""
+
+
+# What a bad upload or a lost worker raises from `AnalysisExecutor.run`; anything else is a bug.
+ANALYSIS_ERRORS = (
+    AnalysisOverloaded,
+    BrokenProcessPool,
+    OSError,
+    ValueError,
+    TypeError,
+    AttributeError,
+    KeyError,
+)
+
+
+def analysis_max_pending() -> int:
+    """Max analyses queued or running at once (`ANALYSIS_MAX_PENDING`, default: 4 per worker)."""
+
+    configured = os.environ.get("ANALYSIS_MAX_PENDING")
+    if configured:
+        return max(1, int(configured))
+    return 4 * analysis_workers()
+
+
+class AnalysisExecutor:
+    """Bounded front door to the process pool.
+
+    All CPU-bound analysis goes through `run`, so the uvicorn loop thread only
+    awaits results. Requests beyond `max_pending` are rejected immediately
+    (`block=False`) or wait for a free slot (`block=True`, used for batches).
+    Counters are only touched on the event loop thread.
+    """
+
+    def __init__(self, max_pending: int | None = None):
+        self.max_pending = max_pending or analysis_max_pending()
+        self.in_flight = 0
+        self.waiting = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._slot_freed: tuple[asyncio.AbstractEventLoop, asyncio.Condition] | None = None
+
+    def _condition(self) -> asyncio.Condition:
+        # asyncio primitives are bound to one loop (tests spin up several).
+        loop = asyncio.get_running_loop()
+        if self._slot_freed is None or self._slot_freed[0] is not loop:
+            self._slot_freed = (loop, asyncio.Condition())
+        return self._slot_freed[1]
+
+    async def run(self, fn, *args, block: bool = False):
+        cond = self._condition()
+        async with cond:
+            if self.in_flight >= self.max_pending:
+                if not block:
+                    self.rejected += 1
+                    raise AnalysisOverloaded(
+                        f"Analysis queue is full ({self.in_flight} pending). Retry shortly."
+                    )
+                self.waiting += 1
+                try:
+                    await cond.wait_for(lambda: self.in_flight < self.max_pending)
+                finally:
+                    self.waiting -= 1
+            self.in_flight += 1
+
+        job = get_analysis_pool().submit(fn, *args)
+        try:
+            try:
+                result = await asyncio.wrap_future(job)
+            except asyncio.CancelledError:
+                # A started worker cannot be interrupted: keep its slot (and the
+                # caller's input files) until it is done.
+                if not job.cancel():
+                    await asyncio.wait({asyncio.wrap_future(job)})
+                raise
+        except BaseException:
+            self.failed += 1
+            raise
+        else:
+            self.completed += 1
+            return result
+        finally:
+            async with cond:
+                self.in_flight -= 1
+                cond.notify()
+
+    def stats(self) -> dict[str, int]:
+        workers = analysis_workers()
+        return {
+            "workers": workers,
+            "max_pending": self.max_pending,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            # Admitted but not yet running, plus callers still waiting for admission
+            "queue_depth": max(0, self.in_flight - workers) + self.waiting,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+
+def analyze_match_file(path: str, target_frames: int, sampling: str) -> dict[str, Any]:
+    """Worker entry point: stream-parse and analyze one spooled match file."""
+
+    with open(path, "rb") as f:
+        return analyze_frames(iter_json_frames(f), target_frames=target_frames, sampling=sampling)
+
+
+async def spool_upload(upload) -> tuple[Path, str]:
+    """Copy an UploadFile to a named temp file (chunked) and return (path, sha256).
+
+    Worker processes cannot share the request's file handle, so each upload is
+    handed over by path instead of pickling the whole payload.
+    """
+
+    h = hashlib.sha256()
+    await upload.seek(0)
+    fd, name = tempfile.mkstemp(prefix="match_", suffix=".json")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await upload.read(STREAM_CHUNK_BYTES)
+                if not chunk:
+                    break
+                h.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        os.unlink(name)
+        raise
+    return Path(name), h.hexdigest()
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import io
+import os
+import struct
+import tarfile
+import tempfile
+import zlib
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, BinaryIO, Self
+
+ARCHIVE_CODECS = ("gzip", "zstd")
+DEFAULT_LEVELS = {"gzip": 6, "zstd": 3}
+ARCHIVE_SUFFIXES = {"gzip": ".tar.gz", "zstd": ".tar.zst"}
+
+# Uncompressed bytes per independently compressed block
+BLOCK_SIZE = 1024 * 1024
+
+# Deflate window: each gzip block is primed with this much of the previous block (as pigz does)
+_DEFLATE_WINDOW = 32 * 1024
+
+_FIXED_MTIME = 0
+
+
+def _deflate_block(block: bytes, dictionary: bytes, level: int, last: bool) -> bytes:
+    kwargs = {"zdict": dictionary} if dictionary else {}
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS, **kwargs)
+    # A sync flush ends the block on a byte boundary, so blocks can simply be concatenated.
+    return compressor.compress(block) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+def _zstd_block(block: bytes, level: int) -> bytes:
+    import zstandard
+
+    # One frame per block; concatenated zstd frames decode as one stream.
+    return zstandard.ZstdCompressor(level=level, write_checksum=True).compress(block)
+
+
+def _gzip_header(level: int) -> bytes:
+    # Same fixed header as gzip.GzipFile(mtime=0, filename=""): no name, OS "unknown".
+    xfl = 2 if level == 9 else 4 if level == 1 else 0
+    return b"\x1f\x8b\x08\x00" + struct.pack("<I", _FIXED_MTIME) + bytes([xfl, 255])
+
+
+class BlockCompressor(io.RawIOBase):
+    """Write-only stream that compresses fixed-size blocks on a thread pool.
+
+    The input is cut into `block_size` blocks and every block is compressed
+    on its own (gzip: raw deflate primed with the previous 32 KiB, joined into
+    one gzip member; zstd: one frame per block). Results are written in input
+    order, so the output depends only on the bytes, codec, level and block
+    size, never on `workers`. zlib and zstd release the GIL while compressing.
+    """
+
+    def __init__(
+        self,
+        out: BinaryIO,
+        *,
+        codec: str = "gzip",
+        level: int | None = None,
+        workers: int | None = None,
+        block_size: int = BLOCK_SIZE,
+    ):
+        super().__init__()
+        if codec not in ARCHIVE_CODECS:
+            raise ValueError(f"Unknown archive codec: {codec} (allowed: {', '.join(ARCHIVE_CODECS)})")
+        if codec == "zstd":
+            try:
+                import zstandard  # noqa: F401
+            except ImportError as e:
+                raise RuntimeError(
+                    "zstd archives need the optional `zstandard` package. Fix: pip install zstandard"
+                ) from e
+        self._out = out
+        self._codec = codec
+        self._level = DEFAULT_LEVELS[codec] if level is None else int(level)
+        self._block_size = block_size
+        workers = workers or os.cpu_count() or 1
+        self._pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+        # Bounded read-ahead: at most two blocks per worker are in flight.
+        self._max_pending = 2 * workers
+        self._pending: deque[Future[bytes] | bytes] = deque()
+        self._buffer = bytearray()
+        self._blocks = 0
+        self._size = 0
+        self._crc = 0
+        self._window = b""
+        if codec == "gzip":
+            out.write(_gzip_header(self._level))
+
+    def writable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._size
+
+    def write(self, data: Any) -> int:
+        if self.closed:
+            raise ValueError("write to closed BlockCompressor")
+        data = memoryview(data).cast("B")
+        self._buffer += data
+        self._size += len(data)
+        while len(self._buffer) >= self._block_size:
+            block = bytes(self._buffer[: self._block_size])
+            del self._buffer[: self._block_size]
+            self._submit(block, last=False)
+        return len(data)
+
+    def _submit(self, block: bytes, last: bool) -> None:
+        job: Callable[[], bytes]
+        if self._codec == "gzip":
+            self._crc = zlib.crc32(block, self._crc)
+            job = partial(_deflate_block, block, self._window, self._level, last)
+            self._window = (self._window + block)[-_DEFLATE_WINDOW:]
+        else:
+            job = partial(_zstd_block, block, self._level)
+        self._blocks += 1
+        self._pending.append(self._pool.submit(job) if self._pool is not None else job())
+        self._drain(self._max_pending)
+
+    def _drain(self, keep: int) -> None:
+        while len(self._pending) > keep:
+            item = self._pending.popleft()
+            self._out.write(item.result() if isinstance(item, Future) else item)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            # gzip always needs a final (possibly empty) block; zstd needs at least one frame.
+            if self._codec == "gzip" or self._buffer or not self._blocks:
+                self._submit(bytes(self._buffer), last=True)
+                self._buffer.clear()
+            self._drain(0)
+            if self._codec == "gzip":
+                self._out.write(struct.pack("<II", self._crc, self._size & 0xFFFFFFFF))
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+            super().close()
+
+
+class DeterministicTarWriter:
+    """PAX tar with fixed metadata (mtime 0, root owner, 0644/0755), streamed into a `BlockCompressor`.
+
+    Members are written in the order they are added; `add_tree` walks
+    directories in sorted name order.
+    """
+
+    def __init__(self, out: BinaryIO, **compress: Any):
+        self._compressor = BlockCompressor(out, **compress)
+        # Closed by `close`: the writer owns the tar stream for its whole lifetime.
+        self._tar = tarfile.open(  # noqa: SIM115
+            fileobj=self._compressor, mode="w", format=tarfile.PAX_FORMAT
+        )
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    @staticmethod
+    def _info(arcname: str, **attrs: Any) -> tarfile.TarInfo:
+        ti = tarfile.TarInfo(name=arcname)
+        ti.uid = 0
+        ti.gid = 0
+        ti.uname = ""
+        ti.gname = ""
+        ti.mtime = _FIXED_MTIME
+        for key, value in attrs.items():
+            setattr(ti, key, value)
+        return ti
+
+    def add_dir(self, arcname: str) -> None:
+        self._tar.addfile(self._info(arcname, type=tarfile.DIRTYPE, mode=0o755))
+
+    def add_bytes(self, arcname: str, data: bytes) -> None:
+        self._tar.addfile(self._info(arcname, size=len(data), mode=0o644), io.BytesIO(data))
+
+    def add_file(self, src: Path, arcname: str) -> None:
+        with src.open("rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            self._tar.addfile(self._info(arcname, size=size, mode=0o644), f)
+
+    def add_tree(self, root: Path, arcname: str) -> None:
+        """Add `root` and everything below it, streaming one file at a time."""
+
+        self.add_dir(arcname)
+        for entry in sorted(os.scandir(root), key=lambda e: e.name):
+            child = f"{arcname}/{entry.name}"
+            if entry.is_dir():
+                self.add_tree(Path(entry.path), child)
+            else:
+                self.add_file(Path(entry.path), child)
+
+    def close(self) -> None:
+        self._tar.close()
+        self._compressor.close()
+
+
+def pack_to_archive(
+    pack_root: Path,
+    out_path: Path,
+    *,
+    codec: str = "gzip",
+    level: int | None = None,
+    workers: int | None = None,
+) -> None:
+    """Archive the demo pack as `demo_pack/...` into a deterministic .tar.gz / .tar.zst.
+
+    Determinism matters for judge-proof CI: even if file contents are identical,
+    the archive hash can vary if mtimes/owners/order vary. The archive is
+    written next to `out_path` and renamed into place when complete.
+    """
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{out_path.name}.", suffix=".tmp", dir=out_path.parent)
+    try:
+        with (
+            os.fdopen(fd, "wb") as raw,
+            DeterministicTarWriter(raw, codec=codec, level=level, workers=workers) as tar,
+        ):
+            tar.add_tree(pack_root, "demo_pack")
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, out_path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
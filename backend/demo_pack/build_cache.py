@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+from backend.demo_pack.builder import MatchBuild, build_matches
+from backend.demo_pack.schemas import DemoEvent, DemoMoment, EvidencePanelRecord
+
+# Bump to invalidate every cache entry (e.g. when the entry layout changes).
+CACHE_FORMAT_VERSION = 1
+
+# Modules whose code determines per-match output (events, moments, panels).
+_BUILDER_MODULES = (
+    "backend.demo_pack.builder",
+    "backend.demo_pack.determinism",
+    "backend.demo_pack.schemas",
+    "backend.parsers.grid_parser",
+    "backend.engines.change_points",
+    "backend.engines.pattern_detector",
+    "backend.engines.spatial_analyzer",
+    "backend.engines.spatial_batch",
+    "backend.engines.teamfight_tracker",
+)
+
+
+@lru_cache(maxsize=1)
+def builder_code_version() -> str:
+    """sha256 over the source of every module that shapes per-match build output."""
+
+    h = hashlib.sha256(f"format:{CACHE_FORMAT_VERSION}".encode())
+    for name in _BUILDER_MODULES:
+        __import__(name)
+        source = Path(sys.modules[name].__file__)
+        h.update(name.encode())
+        h.update(source.read_bytes())
+    return h.hexdigest()
+
+
+def match_fingerprint(path: Path) -> str:
+    """Cache key for one match file: input bytes + file name + builder code version."""
+
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    # The file stem is the match_id fallback, so it is part of the input.
+    return hashlib.sha256(f"{h.hexdigest()}|{path.name}|{builder_code_version()}".encode()).hexdigest()
+
+
+class MatchBuildCache:
+    """On-disk cache of per-match build results, one JSON file per fingerprint.
+
+    Entries are content-addressed, so a changed match file or builder change
+    simply misses; stale entries are dropped by `prune`.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def get(self, key: str) -> MatchBuild | None:
+        try:
+            with self._entry_path(key).open("r", encoding="utf-8") as f:
+                raw = json.load(f)
+            build = MatchBuild(
+                match_id=raw["match_id"],
+                events=[DemoEvent.model_validate(e) for e in raw["events"]],
+                moments=[DemoMoment.model_validate(m) for m in raw["moments"]],
+                panels={eid: EvidencePanelRecord.model_validate(p) for eid, p in raw["panels"].items()},
+            )
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (ValueError, KeyError, TypeError):
+            # Unreadable entry: rebuild and overwrite it.
+            self.misses += 1
+            return None
+        self.hits += 1
+        return build
+
+    def put(self, key: str, build: MatchBuild) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        raw = {
+            "version": CACHE_FORMAT_VERSION,
+            "match_id": build.match_id,
+            "events": [e.model_dump() for e in build.events],
+            "moments": [m.model_dump() for m in build.moments],
+            "panels": {eid: p.model_dump() for eid, p in sorted(build.panels.items())},
+        }
+        fd, tmp = tempfile.mkstemp(prefix=".entry_", suffix=".tmp", dir=self.root)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(raw, f, ensure_ascii=False, sort_keys=True)
+            os.replace(tmp, self._entry_path(key))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def prune(self, keep: set[str]) -> int:
+        """Delete entries not in `keep`; returns how many were removed."""
+
+        removed = 0
+        if not self.root.exists():
+            return removed
+        for entry in self.root.glob("*.json"):
+            if entry.stem not in keep:
+                entry.unlink()
+                removed += 1
+        return removed
+
+
+def build_matches_cached(paths: list[Path], cache: MatchBuildCache | None, workers: int | None = None) -> list[MatchBuild]:
+    """`build_matches` that reuses cached results for unchanged match files.
+
+    Only cache misses go to the process pool; results keep the order of `paths`.
+    """
+
+    if cache is None:
+        return build_matches(paths, workers=workers)
+
+    keys = [match_fingerprint(p) for p in paths]
+    results: list[MatchBuild | None] = [cache.get(k) for k in keys]
+    missing = [i for i, r in enumerate(results) if r is None]
+    for i, built in zip(missing, build_matches([paths[i] for i in missing], workers=workers)):
+        cache.put(keys[i], built)
+        results[i] = built
+    return results  # type: ignore[return-value]
@@ -1,13 +1,29 @@
 from __future__ import annotations
 
+import bisect
+import heapq
 import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from collections.abc import Callable
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
 from backend.demo_pack.determinism import SortKey, format_game_time, make_evidence_id, stable_str_hash
-from backend.demo_pack.schemas import DemoEvent, DemoMoment, DemoPattern, EvidencePanel, PatternInstance
+from backend.demo_pack.schemas import (
+    DemoEvent,
+    DemoMoment,
+    DemoPattern,
+    EvidencePanel,
+    EvidencePanelRecord,
+    PatternInstance,
+)
+from backend.engines.change_points import detect_change_points, frame_features
 from backend.engines.pattern_detector import detect_patterns
-from backend.engines.spatial_analyzer import detect_teamfight
+from backend.engines.spatial_analyzer import TF_MIN_PLAYERS_PER_TEAM
+from backend.engines.teamfight_tracker import track_teamfights
+from backend.parsers.grid_parser import extract_position_tensor
 
 
 def load_demo_match_file(path: Path) -> dict[str, Any]:
@@ -15,6 +31,41 @@ def load_demo_match_file(path: Path) -> dict[str, Any]:
         return json.load(f)
 
 
+@dataclass(frozen=True)
+class MatchBuild:
+    """Per-match build output (everything that does not need other matches)."""
+
+    match_id: str
+    events: list[DemoEvent]
+    moments: list[DemoMoment]
+    panels: dict[str, EvidencePanelRecord]
+
+
+def build_match(path: Path) -> MatchBuild:
+    """Run the per-match stages: load -> synthesize_events -> build_moments -> panels."""
+
+    match = load_demo_match_file(path)
+    match_id = match.get("match_id") or path.stem
+    events = synthesize_events(match_id, match)
+    moments = build_moments(match_id, events)
+    panels = build_panel_records({match_id: events}, {match_id: moments})
+    return MatchBuild(match_id=match_id, events=events, moments=moments, panels=panels)
+
+
+def build_matches(paths: list[Path], workers: int | None = None) -> list[MatchBuild]:
+    """`build_match` for every path, in a process pool when `workers` > 1.
+
+    Results come back in the order of `paths` regardless of which worker
+    finishes first, so the merged pack stays byte-for-byte deterministic.
+    """
+
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    if workers <= 1:
+        return [build_match(p) for p in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(build_match, paths))
+
+
 def _iter_frames(match: dict[str, Any]) -> list[dict[str, Any]]:
     frames = match.get("frames")
     if isinstance(frames, list) and all(isinstance(x, dict) for x in frames):
@@ -42,6 +93,37 @@ def _iter_frames(match: dict[str, Any]) -> list[dict[str, Any]]:
     return out
 
 
+def fight_segments(
+    fight: dict[str, Any],
+    timestamps: list[int],
+    is_fight: list[bool],
+    segment_seconds: int | None = None,
+) -> list[tuple[int, str]]:
+    """Frames that represent one merged fight, as (frame index, phase).
+
+    The first teamfight frame ("start"), then the first teamfight frame at
+    least `segment_seconds` after the previous pick ("ongoing"), and the last
+    teamfight frame ("end") unless it is already picked.
+    """
+
+    if segment_seconds is None:
+        segment_seconds = TEAMFIGHT_SEGMENT_SECONDS
+    picked: list[tuple[int, str]] = []
+    last = None
+    next_ts = None
+    idx = fight["start_frame"]
+    while idx < len(timestamps) and timestamps[idx] <= fight["end_ts"]:
+        if is_fight[idx]:
+            last = idx
+            if next_ts is None or timestamps[idx] >= next_ts:
+                picked.append((idx, "ongoing" if picked else "start"))
+                next_ts = timestamps[idx] + segment_seconds
+        idx += 1
+    if last is not None and picked[-1][0] != last:
+        picked.append((last, "end"))
+    return picked
+
+
 def synthesize_events(match_id: str, match: dict[str, Any]) -> list[DemoEvent]:
     """Create a deterministic event list from frames.
 
@@ -49,15 +131,71 @@ def synthesize_events(match_id: str, match: dict[str, Any]) -> list[DemoEvent]:
     a small, deterministic set of events using:
     - periodic position snapshots
     - teamfight detection
+    - change points over per-frame features (`backend.engines.change_points`)
     - pattern detector outputs
     """
 
     frames = _iter_frames(match)
+    games = [
+        frame.get("game") or frame.get("data", {}).get("seriesState", {}).get("games", [{}])[0]
+        for frame in frames
+    ]
+    # One columnar pass over the whole match; heuristics read from the shared tensor.
+    positions = extract_position_tensor(games)
+    timestamps = [int(frame.get("ts", idx * 10)) for idx, frame in enumerate(frames)]
+    features = frame_features(positions.xy)
+    blue_near_red = features["blue_near_red"].tolist()
+    red_near_blue = features["red_near_blue"].tolist()
+    fights = track_teamfights(range(len(frames)), timestamps, blue_near_red, red_near_blue)
+    is_fight = [
+        b >= TF_MIN_PLAYERS_PER_TEAM and r >= TF_MIN_PLAYERS_PER_TEAM
+        for b, r in zip(blue_near_red, red_near_blue)
+    ]
     events: list[dict[str, Any]] = []
 
-    for idx, frame in enumerate(frames):
-        ts = int(frame.get("ts", idx * 10))
-        game = frame.get("game") or frame.get("data", {}).get("seriesState", {}).get("games", [{}])[0]
+    # One CHANGE_POINT event per detected shift in the per-frame feature series
+    for cp in detect_change_points(timestamps, features):
+        events.append({
+            "ts": cp["ts"],
+            "event_type": "CHANGE_POINT",
+            "payload": {
+                "frame_idx": cp["frame"],
+                "magnitude": round(cp["magnitude"], 2),
+                "driver": cp["driver"],
+                "direction": cp["direction"],
+            },
+            "raw_index": cp["frame"],
+        })
+
+    # TEAMFIGHT events per merged fight: its start, one per segment and its end,
+    # so long fights stay represented among the moment candidates. Start and
+    # ongoing events only carry what is known at their frame (elapsed seconds,
+    # participants so far); the fight totals go on the end event.
+    for fight in fights:
+        seen = fight["start_frame"]
+        blue = red = 0
+        for idx, phase in fight_segments(fight, timestamps, is_fight):
+            while seen <= idx:
+                if is_fight[seen]:
+                    blue = max(blue, int(blue_near_red[seen]))
+                    red = max(red, int(red_near_blue[seen]))
+                seen += 1
+            events.append({
+                "ts": timestamps[idx],
+                "event_type": "TEAMFIGHT",
+                "payload": {
+                    "frame_idx": idx,
+                    "teams": len(games[idx].get("teams", [])),
+                    "detected": True,
+                    "phase": phase,
+                    "fight_start_ts": int(fight["start_ts"]),
+                    "duration_seconds": int(timestamps[idx] - fight["start_ts"]),
+                    "participants": {"blue": blue, "red": red},
+                },
+                "raw_index": idx,
+            })
+
+    for idx, (ts, game) in enumerate(zip(timestamps, games)):
         teams = game.get("teams", [])
         # Minimal payload used for determinism (avoid floats that drift)
         payload_base = {
@@ -73,34 +211,8 @@ def synthesize_events(match_id: str, match: dict[str, Any]) -> list[DemoEvent]:
                 "raw_index": idx,
             })
 
-        # Derive player positions for heuristics
-        all_players_by_team: list[list[dict[str, Any]]] = []
-        for team in teams:
-            players = []
-            for p in team.get("players", []):
-                pos = p.get("position") or {}
-                if pos.get("x") is None or pos.get("y") is None:
-                    continue
-                players.append({
-                    "id": str(p.get("id")),
-                    "name": str(p.get("name")),
-                    "x": float(pos.get("x")),
-                    "y": float(pos.get("y")),
-                    "alive": bool(p.get("alive", True)),
-                })
-            all_players_by_team.append(players)
-
-        # TEAMFIGHT_START events (deduplicated by minimum spacing)
-        if detect_teamfight(all_players_by_team):
-            events.append({
-                "ts": ts,
-                "event_type": "TEAMFIGHT",
-                "payload": {**payload_base, "detected": True},
-                "raw_index": idx,
-            })
-
         # PATTERN_DETECTED events for the first team (as in existing demo code)
-        blue_team = all_players_by_team[0] if all_players_by_team else []
+        blue_team = positions.team_players(idx, 0) if teams else []
         for pat in detect_patterns(blue_team, ts):
             events.append({
                 "ts": ts,
@@ -139,55 +251,126 @@ def synthesize_events(match_id: str, match: dict[str, Any]) -> list[DemoEvent]:
     return demo_events
 
 
-def build_moments(match_id: str, events: list[DemoEvent]) -> list[DemoMoment]:
-    """Deterministically build 3–5 moments per match.
+# Moment selection defaults (3–5 moments, at least 90s apart)
+MIN_MOMENTS = 3
+MAX_MOMENTS = 5
+MOMENT_SPACING_SECONDS = 90
+# A long teamfight gets one TEAMFIGHT event per segment of this length
+TEAMFIGHT_SEGMENT_SECONDS = MOMENT_SPACING_SECONDS
+MOMENT_CANDIDATE_TYPES = frozenset({"TEAMFIGHT", "PATTERN", "CHANGE_POINT"})
+# A candidate is ranked by the strongest change point this close to it
+CHANGE_POINT_RANK_WINDOW_SECONDS = 30
+
+
+class _SpacedSelection:
+    """Selected events plus their sorted timestamps for O(log k) spacing checks."""
+
+    def __init__(self, spacing_seconds: int):
+        self.spacing_seconds = spacing_seconds
+        self.events: list[DemoEvent] = []
+        self.ids: set[str] = set()
+        self._ts: list[int] = []
 
-    CPD here is implemented as a deterministic heuristic: prioritize TEAMFIGHT and
-    PATTERN events, then fallback to high-structure SNAPSHOT events.
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def is_spaced(self, ts: int) -> bool:
+        i = bisect.bisect_left(self._ts, ts)
+        if i < len(self._ts) and self._ts[i] - ts < self.spacing_seconds:
+            return False
+        return i == 0 or ts - self._ts[i - 1] >= self.spacing_seconds
+
+    def add(self, e: DemoEvent) -> None:
+        self.events.append(e)
+        self.ids.add(e.evidence_id)
+        bisect.insort(self._ts, e.ts)
+
+
+def change_point_rank(
+    events: list[DemoEvent], window_seconds: int = CHANGE_POINT_RANK_WINDOW_SECONDS
+) -> Callable[[DemoEvent], tuple[float, int]]:
+    """`build_moments` rank: strongest CHANGE_POINT within ±`window_seconds` first.
+
+    At equal strength a TEAMFIGHT/PATTERN beats the bare change point, since it
+    names what happened. Without change points every candidate ties, which
+    leaves the selection chronological.
+    """
+
+    points = sorted((e.ts, e.payload["magnitude"]) for e in events if e.event_type == "CHANGE_POINT")
+    point_ts = [ts for ts, _magnitude in points]
+
+    def rank(e: DemoEvent) -> tuple[float, int]:
+        lo = bisect.bisect_left(point_ts, e.ts - window_seconds)
+        hi = bisect.bisect_right(point_ts, e.ts + window_seconds)
+        strength = max((magnitude for _ts, magnitude in points[lo:hi]), default=0.0)
+        return -strength, int(e.event_type == "CHANGE_POINT")
+
+    return rank
+
+
+def build_moments(
+    match_id: str,
+    events: list[DemoEvent],
+    *,
+    min_moments: int = MIN_MOMENTS,
+    max_moments: int = MAX_MOMENTS,
+    spacing_seconds: int = MOMENT_SPACING_SECONDS,
+    rank: Callable[[DemoEvent], Any] | None = None,
+) -> list[DemoMoment]:
+    """Deterministically build `min_moments`–`max_moments` moments per match.
+
+    Candidates are TEAMFIGHT, PATTERN and CHANGE_POINT events, with fallback to
+    high-structure SNAPSHOT events. They are taken best-first from a heap
+    ordered by `rank` (lower is better; default: `change_point_rank`, i.e. by
+    change-point magnitude) and kept if they are at least `spacing_seconds`
+    away from every moment selected so far. Moment ids (M01, M02, ...) follow
+    match time.
     """
 
-    candidates: list[DemoEvent] = [e for e in events if e.event_type in {"TEAMFIGHT", "PATTERN"}]
-    fallback: list[DemoEvent] = [e for e in events if e.event_type == "SNAPSHOT"]
-    selected: list[DemoEvent] = []
+    if rank is None:
+        rank = change_point_rank(events)
+    # Heap of (rank, position); the position keeps ties in event order.
+    heap = [
+        (rank(e), i)
+        for i, e in enumerate(events)
+        if e.event_type in MOMENT_CANDIDATE_TYPES
+    ]
+    heapq.heapify(heap)
+    selection = _SpacedSelection(spacing_seconds)
 
     # Validity filter: ensure timestamps are sufficiently spaced and within match.
-    last_ts = None
-    for e in candidates:
-        if last_ts is None or abs(e.ts - last_ts) >= 90:
-            selected.append(e)
-            last_ts = e.ts
-        if len(selected) >= 5:
-            break
-
-    # Fallback selection to guarantee 3–5
-    if len(selected) < 3:
-        for e in fallback:
-            if e in selected:
-                continue
-            if last_ts is None or abs(e.ts - last_ts) >= 90:
-                selected.append(e)
-                last_ts = e.ts
-            if len(selected) >= 3:
+    while heap and len(selection) < max_moments:
+        e = events[heapq.heappop(heap)[1]]
+        if selection.is_spaced(e.ts):
+            selection.add(e)
+    candidate_ids = set(selection.ids)
+
+    # Fallback selection to guarantee the minimum
+    if len(selection) < min_moments:
+        for e in events:
+            if len(selection) >= min_moments:
                 break
+            if e.event_type == "SNAPSHOT" and selection.is_spaced(e.ts):
+                selection.add(e)
 
     # If still short (tiny datasets), pad deterministically with earliest events
-    if len(selected) < 3:
+    if len(selection) < min_moments:
         for e in events:
-            if e not in selected:
-                selected.append(e)
-            if len(selected) >= 3:
+            if len(selection) >= min_moments:
                 break
+            if e.evidence_id not in selection.ids:
+                selection.add(e)
 
-    selected = selected[:5]
-
+    # Number moments in match time, whatever order the ranking picked them in.
+    chosen = sorted(selection.events[:max_moments], key=lambda e: (e.ts, e.global_seq))
     moments: list[DemoMoment] = []
-    for i, e in enumerate(selected, start=1):
+    for i, e in enumerate(chosen, start=1):
         title = "Critical Moment" if e.event_type != "PATTERN" else "Pattern Moment"
         description = (
             f"At {e.game_time}, detected {e.event_type.lower()} relevant to macro decision-making."
         )
         reasons = [
-            f"Selected from {e.event_type} candidates" if e in candidates else "Selected as fallback",
+            f"Selected from {e.event_type} candidates" if e.evidence_id in candidate_ids else "Selected as fallback",
             "Deterministic spacing rule applied",
         ]
         moments.append(
@@ -265,29 +448,88 @@ def build_patterns(team_ids: list[str], all_moments: list[DemoMoment]) -> list[D
     return patterns
 
 
-def build_evidence_panels(
+def build_panel_records(
     events_by_match: dict[str, list[DemoEvent]],
     moments_by_match: dict[str, list[DemoMoment]],
     window_seconds: int = 60,
-) -> dict[str, EvidencePanel]:
-    panels: dict[str, EvidencePanel] = {}
+) -> dict[str, EvidencePanelRecord]:
+    """Build normalized evidence panels (references into the events store).
+
+    Events are in store order (sorted by ts), so each context window is a
+    contiguous index range of the match's event list; windows and covering
+    moments come from linear sweeps instead of rescanning the match per event.
+    """
+
+    records: dict[str, EvidencePanelRecord] = {}
     for match_id, events in events_by_match.items():
         moments = moments_by_match.get(match_id, [])
-        for e in events:
-            lo = e.ts - window_seconds
-            hi = e.ts + window_seconds
-            ctx = [x for x in events if lo <= x.ts <= hi]
-            rel_moments = [m for m in moments if m.start_ts <= e.ts <= m.end_ts]
-            panels[e.evidence_id] = EvidencePanel(
+        windows = _context_windows([e.ts for e in events], window_seconds)
+        related = _covering_moments([e.ts for e in events], moments)
+        for idx, (e, (start, end), rel_moments) in enumerate(zip(events, windows, related)):
+            records[e.evidence_id] = EvidencePanelRecord(
                 evidence_id=e.evidence_id,
                 match_id=match_id,
-                event=e,
-                context_window=ctx,
+                event_index=idx,
+                context_start=start,
+                context_end=end,
                 feature_snapshot={
                     "event_type": e.event_type,
                     "ts": e.ts,
                     "match_scoped": True,
                 },
-                related_moments=rel_moments,
+                related_moment_ids=rel_moments,
             )
-    return panels
+    return records
+
+
+def _context_windows(timestamps: list[int], window_seconds: int) -> list[tuple[int, int]]:
+    """Index range of events within ±window_seconds of each event (two-pointer sweep)."""
+
+    windows: list[tuple[int, int]] = []
+    lo = hi = 0
+    n = len(timestamps)
+    for i, ts in enumerate(timestamps):
+        if i and ts < timestamps[i - 1]:
+            raise ValueError("Events must be sorted by ts to build evidence panels")
+        while timestamps[lo] < ts - window_seconds:
+            lo += 1
+        while hi < n and timestamps[hi] <= ts + window_seconds:
+            hi += 1
+        windows.append((lo, hi))
+    return windows
+
+
+def _covering_moments(timestamps: list[int], moments: list[DemoMoment]) -> list[list[str]]:
+    """Ids of the moments whose [start_ts, end_ts] covers each (sorted) timestamp.
+
+    Sweep over moments ordered by start; the active set is a heap keyed by end.
+    Ids keep the order of `moments`.
+    """
+
+    by_start = sorted(range(len(moments)), key=lambda j: (moments[j].start_ts, j))
+    active: list[tuple[int, int]] = []
+    out: list[list[str]] = []
+    nxt = 0
+    for ts in timestamps:
+        while nxt < len(by_start) and moments[by_start[nxt]].start_ts <= ts:
+            j = by_start[nxt]
+            heapq.heappush(active, (moments[j].end_ts, j))
+            nxt += 1
+        while active and active[0][0] < ts:
+            heapq.heappop(active)
+        out.append([moments[j].moment_id for j in sorted(j for _end, j in active)])
+    return out
+
+
+def build_evidence_panels(
+    events_by_match: dict[str, list[DemoEvent]],
+    moments_by_match: dict[str, list[DemoMoment]],
+    window_seconds: int = 60,
+) -> dict[str, EvidencePanel]:
+    """Materialized panels (events/moments are shared, not copied)."""
+
+    records = build_panel_records(events_by_match, moments_by_match, window_seconds)
+    return {
+        evidence_id: record.materialize(events_by_match[record.match_id], moments_by_match.get(record.match_id, []))
+        for evidence_id, record in records.items()
+    }
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import io
+import json
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from pydantic import BaseModel
+
+from backend.demo_pack.schemas import DemoEvent, DemoMoment
+
+COLUMNAR_VERSION = 3
+MANIFEST_NAME = "manifest.json"
+
+STORE_MODELS: dict[str, type[BaseModel]] = {"events": DemoEvent, "moments": DemoMoment}
+
+# Column kind -> on-disk dtype; "str" and "json" are codes into the string table.
+_DTYPES = {"int": "<i8", "bool": "|u1", "str": "<i4", "json": "<i4"}
+
+
+def column_kinds(model: type[BaseModel]) -> dict[str, str]:
+    kinds: dict[str, str] = {}
+    for name, field in model.model_fields.items():
+        if field.annotation is bool:
+            kinds[name] = "bool"
+        elif field.annotation is int:
+            kinds[name] = "int"
+        elif field.annotation is str:
+            kinds[name] = "str"
+        else:
+            kinds[name] = "json"
+    return kinds
+
+
+def _canonical_json(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+def _npy_bytes(array: np.ndarray) -> bytes:
+    buf = io.BytesIO()
+    np.save(buf, array, allow_pickle=False)
+    return buf.getvalue()
+
+
+class StringTable:
+    """Interned strings; codes are assigned in first-seen order."""
+
+    def __init__(self) -> None:
+        self._codes: dict[str, int] = {}
+        self.strings: list[str] = []
+
+    def code(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.strings)
+            self.strings.append(value)
+        return code
+
+
+def encode_columnar(
+    events_by_match: Mapping[str, list[DemoEvent]],
+    moments_by_match: Mapping[str, list[DemoMoment]],
+    build_id: str,
+    source_sizes: Mapping[str, int],
+) -> dict[str, bytes]:
+    """Encode both stores as `.npy` columns; returns file name -> bytes, manifest last.
+
+    Every model field is one column with a fixed little-endian dtype: ints as
+    int64, bools as uint8, strings (and JSON-encoded lists / dicts) as int32
+    codes into one string table shared by both stores. Rows are ordered by
+    sorted match id and `<store>.offsets.npy` holds each match's row range.
+    String codes are assigned in first-seen order, so the bytes are a pure
+    function of the stores and can be part of the determinism hashes.
+
+    `build_id` (also written to `store_index.json`) and the sizes of the JSON
+    store files are recorded so readers can tell, without hashing anything,
+    when the columnar files no longer belong to the JSON stores next to them.
+    """
+
+    table = StringTable()
+    files: dict[str, bytes] = {}
+    stores_meta: dict[str, Any] = {}
+
+    for store, by_match in (("events", events_by_match), ("moments", moments_by_match)):
+        kinds = column_kinds(STORE_MODELS[store])
+        columns: dict[str, list[Any]] = {name: [] for name in kinds}
+        offsets = [0]
+        match_ids = sorted(by_match)
+        for match_id in match_ids:
+            for row in by_match[match_id]:
+                raw = row.model_dump()
+                for name, kind in kinds.items():
+                    value = raw[name]
+                    if kind == "str":
+                        value = table.code(value)
+                    elif kind == "json":
+                        value = table.code(_canonical_json(value))
+                    columns[name].append(value)
+            offsets.append(offsets[-1] + len(by_match[match_id]))
+        for name, kind in kinds.items():
+            files[f"{store}.{name}.npy"] = _npy_bytes(np.asarray(columns[name], dtype=_DTYPES[kind]))
+        files[f"{store}.offsets.npy"] = _npy_bytes(np.asarray(offsets, dtype="<i8"))
+        stores_meta[store] = {"matches": match_ids, "columns": kinds}
+
+    encoded = [s.encode("utf-8") for s in table.strings]
+    string_offsets = np.zeros(len(encoded) + 1, dtype="<i8")
+    np.cumsum([len(b) for b in encoded], out=string_offsets[1:])
+    files["strings.npy"] = _npy_bytes(np.frombuffer(b"".join(encoded), dtype=np.uint8))
+    files["strings.offsets.npy"] = _npy_bytes(string_offsets)
+
+    manifest = {
+        "version": COLUMNAR_VERSION,
+        "build_id": build_id,
+        "source_sizes": dict(sorted(source_sizes.items())),
+        "file_sizes": {name: len(raw) for name, raw in sorted(files.items())},
+        "stores": stores_meta,
+    }
+    files[MANIFEST_NAME] = json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8")
+    return files
+
+
+class ColumnarReader:
+    """Memory-mapped view of one pack's columnar stores (see `open_columnar`).
+
+    Arrays are opened with `np.load(mmap_mode="r")`; a match is decoded from
+    its row slice only when it is requested.
+    """
+
+    def __init__(self, root: Path, manifest: dict[str, Any]):
+        self.root = root
+        self.manifest = manifest
+        self._strings = np.load(root / "strings.npy", mmap_mode="r", allow_pickle=False)
+        self._string_offsets = np.load(root / "strings.offsets.npy", mmap_mode="r", allow_pickle=False)
+        self._arrays: dict[str, dict[str, np.ndarray]] = {}
+        self._match_index: dict[str, dict[str, int]] = {}
+        for store, meta in manifest["stores"].items():
+            arrays = {"offsets": np.load(root / f"{store}.offsets.npy", mmap_mode="r", allow_pickle=False)}
+            for name in meta["columns"]:
+                arrays[name] = np.load(root / f"{store}.{name}.npy", mmap_mode="r", allow_pickle=False)
+            rows = int(arrays["offsets"][-1])
+            if len(arrays["offsets"]) != len(meta["matches"]) + 1 or any(
+                len(a) != rows for name, a in arrays.items() if name != "offsets"
+            ):
+                raise ValueError(f"Columnar store {store!r} has inconsistent column lengths")
+            self._arrays[store] = arrays
+            self._match_index[store] = {mid: i for i, mid in enumerate(meta["matches"])}
+
+    def match_index(self, store: str) -> dict[str, int]:
+        return self._match_index[store]
+
+    def string(self, code: int) -> str:
+        start, end = self._string_offsets[code], self._string_offsets[code + 1]
+        return self._strings[start:end].tobytes().decode("utf-8")
+
+    def rows(self, store: str, match_id: str) -> list[dict[str, Any]]:
+        """Raw field dicts of one match (validated by the caller's model)."""
+
+        arrays = self._arrays[store]
+        i = self._match_index[store][match_id]
+        lo, hi = int(arrays["offsets"][i]), int(arrays["offsets"][i + 1])
+        columns: dict[str, list[Any]] = {}
+        for name, kind in self.manifest["stores"][store]["columns"].items():
+            values = arrays[name][lo:hi].tolist()
+            if kind == "str":
+                values = [self.string(c) for c in values]
+            elif kind == "json":
+                values = [json.loads(self.string(c)) for c in values]
+            elif kind == "bool":
+                values = [bool(v) for v in values]
+            columns[name] = values
+        return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+
+def open_columnar(
+    root: Path, build_id: str | None, sources: Sequence[Path]
+) -> ColumnarReader | None:
+    """Reader for `root`, or None if it is absent, stale or unreadable.
+
+    The JSON stores (`sources`) stay authoritative: columnar files are only
+    used while their manifest carries the `build_id` of the JSON stores'
+    index, the stores keep their build-time sizes and the columnar files
+    their own. These are stat calls only; nothing is hashed on load.
+    """
+
+    if build_id is None:
+        return None
+    try:
+        manifest = json.loads((root / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get("version") != COLUMNAR_VERSION:
+        return None
+    if manifest.get("build_id") != build_id:
+        return None
+    expected_columns = {store: column_kinds(model) for store, model in STORE_MODELS.items()}
+    if {s: m.get("columns") for s, m in (manifest.get("stores") or {}).items()} != expected_columns:
+        return None
+    source_sizes = manifest.get("source_sizes") or {}
+    if sorted(source_sizes) != sorted(p.name for p in sources):
+        return None
+    for path in sources:
+        if path.stat().st_size != source_sizes[path.name]:
+            return None
+    for name, size in (manifest.get("file_sizes") or {}).items():
+        path = root / name
+        if not path.exists() or path.stat().st_size != size:
+            return None
+    try:
+        return ColumnarReader(root, manifest)
+    except (OSError, ValueError, LookupError):
+        return None
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import re
 from dataclasses import dataclass
 
 
 _EVIDENCE_ID_RE = re.compile(r"^[A-Z0-9-]+:\d{6}$")
 
+# Canonical JSON (sorted keys, no whitespace, ASCII only), built once per process.
+_CANONICAL_ENCODER = json.JSONEncoder(sort_keys=True, separators=(",", ":"), ensure_ascii=True)
+
 
 def format_game_time(ts_seconds: int) -> str:
     m, s = divmod(max(0, int(ts_seconds)), 60)
@@ -30,7 +35,7 @@ class SortKey:
     Tie-breakers are ordered from most-semantic to least-semantic:
     1) `ts` (timestamp seconds)
     2) `event_type`
-    3) `stable_payload_hash` (canonical JSON of payload, sort_keys=True)
+    3) `stable_payload_hash` (BLAKE2b digest of the payload's canonical JSON)
     4) `raw_index` (original frame index; last-resort tiebreaker)
 
     NOTE: If new event types introduce additional fields (team_id, player_id, x/y),
@@ -44,12 +49,11 @@ class SortKey:
 
 
 def stable_str_hash(obj: object) -> str:
-    """Deterministic hash for sorting.
+    """Deterministic hash for sorting: 32 hex chars, whatever the payload size.
 
-    Uses a canonical string representation so that dict ordering differences
+    Hashes a canonical JSON encoding so that dict ordering differences
     don't affect the result.
     """
 
-    import json
-
-    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=True)
+    canonical = _CANONICAL_ENCODER.encode(obj).encode("ascii")
+    return hashlib.blake2b(canonical, digest_size=16).hexdigest()
@@ -1,13 +1,29 @@
 from __future__ import annotations
 
-import gzip
+import hashlib
 import json
-import tarfile
+import os
+import shutil
+import tempfile
+from collections.abc import Mapping, Sequence
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
-from backend.demo_pack.schemas import DemoEvent, DemoMoment, DemoPattern, EvidencePanel
+from backend.demo_pack.archive import pack_to_archive
+from backend.demo_pack.columnar import encode_columnar
+from backend.demo_pack.determinism import stable_str_hash
+from backend.demo_pack.metrics import compute_integrity_report
+from backend.demo_pack.schemas import (
+    DemoEvent,
+    DemoMoment,
+    DemoPattern,
+    EvidencePanel,
+    EvidencePanelRecord,
+)
+
+# evidence_refs.json v1 embedded full panels; v2 stores EvidencePanelRecord references.
+EVIDENCE_REFS_VERSION = 2
 
 
 @dataclass(frozen=True)
@@ -38,11 +54,103 @@ class DemoPackPaths:
     def evidence_refs(self) -> Path:
         return self.processed_dir / "evidence_refs.json"
 
+    @property
+    def store_index(self) -> Path:
+        return self.processed_dir / "store_index.json"
 
-def write_json(path: Path, data: Any) -> None:
+    @property
+    def integrity_report(self) -> Path:
+        return self.processed_dir / "integrity_report.json"
+
+    @property
+    def columnar_dir(self) -> Path:
+        return self.processed_dir / "columnar"
+
+    @property
+    def store_files(self) -> tuple[Path, ...]:
+        return (self.events_store, self.moments_store, self.patterns_store, self.evidence_refs)
+
+
+def _replace_atomically(path: Path, raw: bytes) -> None:
+    # Write-then-rename: a served pack memory-maps these files, and truncating
+    # a mapped file in place would crash readers (SIGBUS) during a rebuild.
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(raw)
+        os.chmod(tmp, 0o644)  # mkstemp creates 0600
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def write_json(path: Path, data: Any) -> None:
+    _replace_atomically(path, json.dumps(data, ensure_ascii=False, indent=2, sort_keys=True).encode("utf-8"))
+
+
+def _dumps(data: Any) -> str:
+    return json.dumps(data, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def write_indexed_json(path: Path, data: dict[str, Any], section: str) -> dict[str, Any]:
+    """Write `data` exactly like `write_json` and index the entries of `data[section]`.
+
+    Returns `{"size", "section", "keys": {key: [start, end]}}` with byte offsets of
+    each entry's JSON value, so readers can decode a single entry from a mmap.
+    Relies on `json.dumps(indent=2)` prefixing every nested line with the
+    parent's indent, which lets nested values be serialized on their own.
+    """
+
+    chunks: list[bytes] = []
+    offset = 0
+    keys: dict[str, list[int]] = {}
+
+    def emit(text: str) -> None:
+        nonlocal offset
+        raw = text.encode("utf-8")
+        chunks.append(raw)
+        offset += len(raw)
+
+    top_keys = sorted(data)
+    emit("{" if top_keys else "{}")
+    for i, key in enumerate(top_keys):
+        emit(f"\n  {_dumps(key)}: ")
+        value = data[key]
+        if key == section and isinstance(value, dict) and value:
+            emit("{")
+            sub_keys = sorted(value)
+            for j, sub_key in enumerate(sub_keys):
+                emit(f"\n    {_dumps(sub_key)}: ")
+                start = offset
+                emit(_dumps(value[sub_key]).replace("\n", "\n    "))
+                keys[sub_key] = [start, offset]
+                if j < len(sub_keys) - 1:
+                    emit(",")
+            emit("\n  }")
+        else:
+            emit(_dumps(value).replace("\n", "\n  "))
+        if i < len(top_keys) - 1:
+            emit(",")
+    if top_keys:
+        emit("\n}")
+
+    _replace_atomically(path, b"".join(chunks))
+    return {"size": offset, "section": section, "keys": keys}
+
+
+def store_digests(paths: Sequence[Path]) -> dict[str, str]:
+    """sha256 of each store file, keyed by file name."""
+
+    digests: dict[str, str] = {}
+    for path in paths:
+        h = hashlib.sha256()
+        with path.open("rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        digests[path.name] = h.hexdigest()
+    return dict(sorted(digests.items()))
 
 
 def write_stores(
@@ -50,9 +158,18 @@ def write_stores(
     events_by_match: dict[str, list[DemoEvent]],
     moments_by_match: dict[str, list[DemoMoment]],
     patterns: list[DemoPattern],
-    evidence_panels: dict[str, EvidencePanel],
+    evidence_panels: Mapping[str, EvidencePanel | EvidencePanelRecord],
+    *,
+    columnar: bool = False,
 ) -> None:
+    """Write the JSON stores (plus index and integrity report) under `pack_root`.
+
+    With `columnar`, events and moments are also written as memory-mappable
+    `.npy` columns in `processed/columnar/` (see `encode_columnar`).
+    """
+
     paths = DemoPackPaths(pack_root)
+    records = normalize_evidence_panels(events_by_match, evidence_panels)
 
     events_out = {
         "version": 1,
@@ -73,91 +190,93 @@ def write_stores(
         "patterns": [p.model_dump() for p in patterns],
     }
     evidence_out = {
-        "version": 1,
+        "version": EVIDENCE_REFS_VERSION,
         "panels": {
-            evidence_id: panel.model_dump()
-            for evidence_id, panel in sorted(evidence_panels.items())
+            evidence_id: record.model_dump()
+            for evidence_id, record in sorted(records.items())
         },
     }
 
-    write_json(paths.events_store, events_out)
-    write_json(paths.moments_store, moments_out)
+    # Byte offsets of every match / panel, for lazy per-key loading at runtime.
+    index = {
+        "version": 1,
+        "files": {
+            paths.events_store.name: write_indexed_json(paths.events_store, events_out, "matches"),
+            paths.moments_store.name: write_indexed_json(paths.moments_store, moments_out, "matches"),
+            paths.evidence_refs.name: write_indexed_json(paths.evidence_refs, evidence_out, "panels"),
+        },
+    }
     write_json(paths.patterns_store, patterns_out)
-    write_json(paths.evidence_refs, evidence_out)
+    # Content-derived token of this build: the columnar manifest must carry the
+    # same one, so columns left over from another build are never served.
+    digests = store_digests(paths.store_files)
+    index["build_id"] = stable_str_hash(digests)
+    write_json(paths.store_index, index)
+
+    # Integrity is fixed at build time; the runtime trusts it while the store
+    # files keep the sha256 recorded here.
+    write_json(paths.integrity_report, {
+        "version": 2,
+        "store_sha256": digests,
+        "report": compute_integrity_report(events_by_match, moments_by_match, patterns, records),
+    })
+
+    if columnar:
+        source_sizes = {p.name: p.stat().st_size for p in (paths.events_store, paths.moments_store)}
+        files = encode_columnar(events_by_match, moments_by_match, index["build_id"], source_sizes)
+        for name, raw in files.items():
+            _replace_atomically(paths.columnar_dir / name, raw)
+        # Columns of an earlier build that this one no longer writes.
+        for stale in paths.columnar_dir.iterdir():
+            if stale.name not in files:
+                stale.unlink()
+    elif paths.columnar_dir.exists():
+        # Columnar files from an earlier build no longer describe these stores.
+        shutil.rmtree(paths.columnar_dir)
+
+
+def normalize_evidence_panels(
+    events_by_match: Mapping[str, list[DemoEvent]],
+    evidence_panels: Mapping[str, EvidencePanel | EvidencePanelRecord],
+) -> dict[str, EvidencePanelRecord]:
+    """Convert materialized panels to records; records pass through unchanged."""
 
+    event_index: dict[str, dict[str, int]] = {}
+    records: dict[str, EvidencePanelRecord] = {}
+    for evidence_id, panel in evidence_panels.items():
+        if isinstance(panel, EvidencePanelRecord):
+            records[evidence_id] = panel
+            continue
+        index = event_index.get(panel.match_id)
+        if index is None:
+            index = {e.evidence_id: i for i, e in enumerate(events_by_match[panel.match_id])}
+            event_index[panel.match_id] = index
+        records[evidence_id] = EvidencePanelRecord.from_panel(panel, index)
+    return records
 
-def pack_to_tar_gz(pack_root: Path, out_tar_gz: Path) -> None:
-    """Create a deterministic tar.gz for the demo pack.
 
-    Determinism matters for judge-proof CI: even if file contents are identical,
-    the archive hash can vary if mtimes/owners/order vary.
+def decode_evidence_panel(
+    raw: dict[str, Any],
+    events_by_match: Mapping[str, list[DemoEvent]],
+    moments_by_match: Mapping[str, list[DemoMoment]],
+) -> EvidencePanel:
+    """Decode one `evidence_refs.json` entry (v1 full panel or v2 record)."""
+
+    if "context_window" in raw:
+        return EvidencePanel.model_validate(raw)
+    record = EvidencePanelRecord.model_validate(raw)
+    return record.materialize(events_by_match[record.match_id], moments_by_match.get(record.match_id, []))
+
+
+def pack_to_tar_gz(
+    pack_root: Path, out_tar_gz: Path, *, level: int | None = None, workers: int | None = None
+) -> None:
+    """Create a deterministic tar.gz for the demo pack (see `archive.pack_to_archive`).
+
+    The bytes depend on the pack contents and `level`, not on `workers`.
     """
 
-    out_tar_gz.parent.mkdir(parents=True, exist_ok=True)
-    if out_tar_gz.exists():
-        out_tar_gz.unlink()
-
-    fixed_mtime = 0
-
-    def _add_dir(tar: tarfile.TarFile, arcname: str) -> None:
-        ti = tarfile.TarInfo(name=arcname)
-        ti.type = tarfile.DIRTYPE
-        ti.mode = 0o755
-        ti.uid = 0
-        ti.gid = 0
-        ti.uname = ""
-        ti.gname = ""
-        ti.mtime = fixed_mtime
-        tar.addfile(ti)
-
-    def _add_file(tar: tarfile.TarFile, src: Path, arcname: str) -> None:
-        st = src.stat()
-        ti = tarfile.TarInfo(name=arcname)
-        ti.size = st.st_size
-        ti.mode = 0o644
-        ti.uid = 0
-        ti.gid = 0
-        ti.uname = ""
-        ti.gname = ""
-        ti.mtime = fixed_mtime
-        with src.open("rb") as f:
-            tar.addfile(ti, fileobj=f)
-
-    # Use a deterministic gzip header (mtime=0, no embedded original filename)
-    with out_tar_gz.open("wb") as raw:
-        with gzip.GzipFile(fileobj=raw, mode="wb", filename="", mtime=fixed_mtime) as gzf:
-            with tarfile.open(fileobj=gzf, mode="w", format=tarfile.PAX_FORMAT) as tar:
-                root_arc = "demo_pack"
-                _add_dir(tar, root_arc)
-
-                # Add directories/files in stable sorted order
-                rel_paths = sorted(
-                    [p.relative_to(pack_root) for p in pack_root.rglob("*")],
-                    key=lambda p: p.as_posix(),
-                )
-                added_dirs: set[str] = set([root_arc])
-                for rel in rel_paths:
-                    src = pack_root / rel
-                    arc = f"{root_arc}/{rel.as_posix()}"
-
-                    # Ensure parent dirs exist in archive in stable order
-                    parents = []
-                    cur = rel.parent
-                    while cur != Path("."):
-                        parents.append(cur)
-                        cur = cur.parent
-                    for d in reversed(parents):
-                        d_arc = f"{root_arc}/{d.as_posix()}"
-                        if d_arc not in added_dirs:
-                            _add_dir(tar, d_arc)
-                            added_dirs.add(d_arc)
-
-                    if src.is_dir():
-                        if arc not in added_dirs:
-                            _add_dir(tar, arc)
-                            added_dirs.add(arc)
-                        continue
-                    _add_file(tar, src, arc)
+    pack_to_archive(pack_root, out_tar_gz, codec="gzip", level=level, workers=workers)
 
 
 def load_stores(pack_root: Path) -> tuple[
@@ -186,7 +305,7 @@ def load_stores(pack_root: Path) -> tuple[
     }
     patterns = [DemoPattern.model_validate(p) for p in patterns_raw.get("patterns", [])]
     evidence_panels = {
-        eid: EvidencePanel.model_validate(p)
+        eid: decode_evidence_panel(p, events_by_match, moments_by_match)
         for eid, p in evidence_raw.get("panels", {}).items()
     }
 
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import base64
+from collections.abc import Collection, Iterable, Mapping
 from dataclasses import dataclass
+from itertools import pairwise
 
-from backend.demo_pack.schemas import DemoEvent, DemoMoment
+from backend.demo_pack.schemas import DemoEvent, DemoMoment, DemoPattern
 
 
 @dataclass(frozen=True)
@@ -12,6 +15,64 @@ class ObservationMaskingMetrics:
     reduction_pct: int
 
 
+def merge_windows(windows: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Sort closed [lo, hi] windows and merge the overlapping ones."""
+
+    merged: list[tuple[int, int]] = []
+    for lo, hi in sorted(windows):
+        if merged and lo <= merged[-1][1]:
+            if hi > merged[-1][1]:
+                merged[-1] = (merged[-1][0], hi)
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+def kept_event_mask(
+    events: list[DemoEvent],
+    windows: list[tuple[int, int]],
+    high_signal_types: Collection[str],
+) -> list[bool]:
+    """Masking policy for one match, as one flag per event (True = kept).
+
+    One sweep over the events in time order against the merged windows:
+    O((events + windows) log windows) instead of events x windows.
+    """
+
+    merged = merge_windows(windows)
+    order: Iterable[int] = range(len(events))
+    if any(a.ts > b.ts for a, b in pairwise(events)):
+        order = sorted(order, key=lambda i: events[i].ts)
+
+    kept = [False] * len(events)
+    j = 0
+    for i in order:
+        e = events[i]
+        while j < len(merged) and merged[j][1] < e.ts:
+            j += 1
+        kept[i] = e.event_type in high_signal_types or (j < len(merged) and merged[j][0] <= e.ts)
+    return kept
+
+
+def encode_bitmap(flags: list[bool]) -> str:
+    """Base64 bitmap, LSB first: bit i of byte i // 8 is flags[i]."""
+
+    raw = bytearray((len(flags) + 7) // 8)
+    for i, flag in enumerate(flags):
+        if flag:
+            raw[i >> 3] |= 1 << (i & 7)
+    return base64.b64encode(bytes(raw)).decode("ascii")
+
+
+def decode_bitmap(encoded: str, length: int) -> list[bool]:
+    """Inverse of `encode_bitmap`; raises ValueError if it does not hold `length` flags."""
+
+    raw = base64.b64decode(encoded, validate=True)
+    if len(raw) != (length + 7) // 8:
+        raise ValueError(f"Bitmap holds {len(raw) * 8} flags, expected {length}")
+    return [bool(raw[i >> 3] >> (i & 7) & 1) for i in range(length)]
+
+
 def compute_observation_masking(
     events_by_match: dict[str, list[DemoEvent]],
     moments_by_match: dict[str, list[DemoMoment]],
@@ -26,11 +87,16 @@ def compute_observation_masking(
     - Keep all high-signal events (by type).
     - Keep any event within ±window_seconds of any precomputed moment window.
     - Everything else is considered maskable background.
+
+    `kept_bitmaps` holds the per-event decision for each match (see
+    `encode_bitmap`; bit i is the i-th event of the match in the events store),
+    so the masked view can be served without re-running the policy.
     """
 
-    high_signal_types = {"TEAMFIGHT", "PATTERN"}
+    high_signal_types = {"TEAMFIGHT", "PATTERN", "CHANGE_POINT"}
 
-    kept_ids: set[str] = set()
+    kept_bitmaps: dict[str, str] = {}
+    events_after = 0
     total_events = 0
 
     for match_id, events in events_by_match.items():
@@ -38,18 +104,10 @@ def compute_observation_masking(
 
         moments = moments_by_match.get(match_id, [])
         moment_windows = [(max(0, m.start_ts - window_seconds), m.end_ts + window_seconds) for m in moments]
+        kept = kept_event_mask(events, moment_windows, high_signal_types)
+        events_after += sum(kept)
+        kept_bitmaps[match_id] = encode_bitmap(kept)
 
-        for e in events:
-            if e.event_type in high_signal_types:
-                kept_ids.add(e.evidence_id)
-                continue
-
-            for lo, hi in moment_windows:
-                if lo <= e.ts <= hi:
-                    kept_ids.add(e.evidence_id)
-                    break
-
-    events_after = len(kept_ids)
     if total_events <= 0:
         reduction_pct = 0
     else:
@@ -71,4 +129,56 @@ def compute_observation_masking(
         "events_before": metrics.events_before,
         "events_after": metrics.events_after,
         "reduction_pct": metrics.reduction_pct,
+        "kept_bitmaps": dict(sorted(kept_bitmaps.items())),
+    }
+
+
+def compute_integrity_report(
+    events_by_match: Mapping[str, list[DemoEvent]],
+    moments_by_match: Mapping[str, list[DemoMoment]],
+    patterns: list[DemoPattern],
+    panel_ids: Collection[str],
+) -> dict:
+    """Count broken references across the stores (served by /api/demo/integrity).
+
+    A reference is broken when a moment points at an event outside its match,
+    or a pattern instance / event has no evidence panel. Only panel ids are
+    needed, so panels are never materialized here.
+    """
+
+    broken_refs = 0
+    total_events = 0
+    total_moments = 0
+
+    for match_id, events in events_by_match.items():
+        total_events += len(events)
+        # Evidence panels must exist for EVERY event (evidence references must never break)
+        for e in events:
+            if e.evidence_id not in panel_ids:
+                broken_refs += 1
+
+    for match_id, moments in moments_by_match.items():
+        total_moments += len(moments)
+        event_ids = {e.evidence_id for e in events_by_match.get(match_id, [])}
+        for m in moments:
+            if m.primary_event_ref not in event_ids:
+                broken_refs += 1
+            for r in m.related_event_refs:
+                if r not in event_ids:
+                    broken_refs += 1
+
+    for p in patterns:
+        for inst in p.instances:
+            for eid in inst.evidence_refs:
+                if eid not in panel_ids:
+                    broken_refs += 1
+
+    return {
+        "mode": "demo",
+        "match_count": len(events_by_match),
+        "total_events": total_events,
+        "total_moments": total_moments,
+        "total_patterns": len(patterns),
+        "total_evidence_panels": len(panel_ids),
+        "broken_refs": broken_refs,
     }
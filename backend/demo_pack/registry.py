@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from backend.demo_pack.runtime import DemoStores, read_demo_stores
+
+# Pack ids are directory names; this also rules out "..", separators and hidden dirs.
+_PACK_ID_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,127}$")
+
+
+class UnknownDemoPack(LookupError):
+    def __init__(self, message: str, *, fix: str = "Use one of the ids listed by /api/demo/packs"):
+        super().__init__(message)
+        self.fix = fix
+
+
+def pack_resident_bytes(pack_root: Path) -> int:
+    """Memory charged to a loaded pack: an approximation by its store file sizes.
+
+    This is what a lazy (memory-mapped) pack can page in: the JSON stores and,
+    when present, the columnar `.npy` files and their manifest. It does not
+    count the decoded pydantic objects, derived indexes or cached response
+    bodies, which can be several times larger, so treat `max_bytes` as a
+    budget on store sizes rather than a hard limit on process memory.
+    """
+
+    processed = pack_root / "processed"
+    files = [*processed.glob("*.json"), *(processed / "columnar").glob("*")]
+    return sum(p.stat().st_size for p in files if p.is_file())
+
+
+class DemoPackRegistry:
+    """Serves many frozen packs from `packs_dir/<pack_id>/`, loaded on first use.
+
+    Resident packs are kept in LRU order and evicted once their combined
+    `pack_resident_bytes` exceed `max_bytes` (the most recently used pack is
+    always kept). Eviction only drops the registry's reference: requests that
+    still hold an evicted `DemoStores` keep using it.
+    """
+
+    def __init__(self, packs_dir: str | Path | None, max_bytes: int = 512 * 1024 * 1024):
+        self.packs_dir = Path(packs_dir) if packs_dir else None
+        self.max_bytes = max_bytes
+        self._resident: OrderedDict[str, tuple[DemoStores, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._load_locks: dict[str, threading.Lock] = {}
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def pack_root(self, pack_id: str) -> Path:
+        if self.packs_dir is None:
+            raise UnknownDemoPack(
+                f"Unknown pack_id: {pack_id}",
+                fix="Set DEMO_PACKS_DIR to a directory of extracted demo packs",
+            )
+        if not _PACK_ID_RE.match(pack_id):
+            raise UnknownDemoPack(f"Invalid pack_id: {pack_id!r}")
+        root = self.packs_dir / pack_id
+        if not (root / "processed").is_dir():
+            raise UnknownDemoPack(f"Unknown pack_id: {pack_id}")
+        return root
+
+    def available(self) -> list[str]:
+        """Ids of all packs under `packs_dir` (loaded or not)."""
+
+        if self.packs_dir is None or not self.packs_dir.is_dir():
+            return []
+        return sorted(
+            p.name for p in self.packs_dir.iterdir() if _PACK_ID_RE.match(p.name) and (p / "processed").is_dir()
+        )
+
+    def get(self, pack_id: str) -> DemoStores:
+        with self._lock:
+            entry = self._resident.get(pack_id)
+            if entry is not None:
+                self._resident.move_to_end(pack_id)
+                self.hits += 1
+                return entry[0]
+        root = self.pack_root(pack_id)
+        with self._lock:
+            load_lock = self._load_locks.setdefault(pack_id, threading.Lock())
+
+        # One load per pack; other packs stay servable while it runs.
+        with load_lock:
+            with self._lock:
+                entry = self._resident.get(pack_id)
+                if entry is not None:
+                    self._resident.move_to_end(pack_id)
+                    self.hits += 1
+                    return entry[0]
+            stores = read_demo_stores(root)
+            size = pack_resident_bytes(root)
+            with self._lock:
+                self._resident[pack_id] = (stores, size)
+                self._bytes += size
+                self.loads += 1
+                while self._bytes > self.max_bytes and len(self._resident) > 1:
+                    _pack_id, (_stores, evicted_size) = self._resident.popitem(last=False)
+                    self._bytes -= evicted_size
+                    self.evictions += 1
+            return stores
+
+    def __contains__(self, pack_id: object) -> bool:
+        with self._lock:
+            return pack_id in self._resident
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "resident": list(self._resident),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "loads": self.loads,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import threading
+from collections.abc import Hashable
+from dataclasses import dataclass
+from typing import Any
+
+# Bodies smaller than this are not worth a gzip variant.
+GZIP_MIN_BYTES = 1024
+
+
+@dataclass(frozen=True)
+class FrozenResponse:
+    """Ready-to-send JSON body for immutable demo data, plus its validators."""
+
+    body: bytes
+    etag: str
+    gzip_body: bytes | None = None
+
+    @property
+    def gzip_etag(self) -> str:
+        # Strong ETags identify one representation; the gzip bytes get their own.
+        return self.etag[:-1] + '-gz"'
+
+    def matches(self, if_none_match: str | None) -> bool:
+        """True if an `If-None-Match` header already names this resource."""
+
+        if not if_none_match:
+            return False
+        tags = {t.strip() for t in if_none_match.split(",")}
+        if "*" in tags:
+            return True
+        # Weak comparison is what RFC 9110 prescribes for If-None-Match.
+        tags = {t.removeprefix("W/") for t in tags}
+        return self.etag in tags or self.gzip_etag in tags
+
+
+def freeze_json(payload: Any) -> FrozenResponse:
+    """Encode `payload` once, the same way FastAPI's JSONResponse would."""
+
+    body = json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    gzip_body = None
+    if len(body) >= GZIP_MIN_BYTES:
+        # mtime=0 keeps the compressed bytes (and thus the response) reproducible.
+        gzip_body = gzip.compress(body, compresslevel=6, mtime=0)
+    return FrozenResponse(body=body, etag=etag, gzip_body=gzip_body)
+
+
+class FrozenResponseCache:
+    """Per-pack memo of encoded responses, keyed by (endpoint, key).
+
+    The demo stores never change after load, so an entry is valid for the
+    lifetime of the stores it was built from.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[Hashable, FrozenResponse] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> FrozenResponse | None:
+        return self._entries.get(key)
+
+    def put(self, key: Hashable, payload: Any) -> FrozenResponse:
+        frozen = freeze_json(payload)
+        with self._lock:
+            return self._entries.setdefault(key, frozen)
+
+    def __len__(self) -> int:
+        return len(self._entries)
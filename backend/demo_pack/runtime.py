@@ -1,23 +1,121 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import mmap
 import os
+import threading
+import traceback
+from collections.abc import Callable, Iterator, Mapping
 from dataclasses import dataclass
+from functools import cached_property, partial
 from pathlib import Path
-from typing import Any
+from typing import Any, TypeVar
 
+from backend.demo_pack.columnar import ColumnarReader, open_columnar
+from backend.demo_pack.io import decode_evidence_panel, store_digests
+from backend.demo_pack.metrics import compute_integrity_report, decode_bitmap
+from backend.demo_pack.responses import FrozenResponseCache
 from backend.demo_pack.schemas import DemoEvent, DemoMoment, DemoPattern, EvidencePanel
 
+T = TypeVar("T")
+
 
 @dataclass(frozen=True)
 class DemoStores:
-    events_by_match: dict[str, list[DemoEvent]]
-    moments_by_match: dict[str, list[DemoMoment]]
+    events_by_match: Mapping[str, list[DemoEvent]]
+    moments_by_match: Mapping[str, list[DemoMoment]]
     patterns: list[DemoPattern]
-    panels_by_evidence_id: dict[str, EvidencePanel]
+    panels_by_evidence_id: Mapping[str, EvidencePanel]
     metadata: dict[str, Any]
     observation_masking: dict[str, Any] | None
     benchmarks: dict[str, Any] | None
+    # Build-time integrity record ({"store_sha256", "report"}); None when missing.
+    precomputed_integrity: dict[str, Any] | None = None
+    pack_root: Path | None = None
+
+    # Secondary indexes: built once per load, so demo endpoints are dict lookups.
+
+    @cached_property
+    def match_ids(self) -> list[str]:
+        return sorted(self.events_by_match)
+
+    @cached_property
+    def team_ids(self) -> list[str]:
+        return sorted({t for mid in self.events_by_match for t in teams_of_match(mid)})
+
+    @cached_property
+    def patterns_by_team(self) -> dict[str, list[DemoPattern]]:
+        index: dict[str, list[DemoPattern]] = {}
+        for p in self.patterns:
+            index.setdefault(p.team_id, []).append(p)
+        return index
+
+    def moments_referencing(self, match_id: str, evidence_id: str) -> list[DemoMoment]:
+        """Moments of `match_id` that reference `evidence_id` (primary or related).
+
+        Only that match's moments are decoded.
+        """
+
+        return [
+            m
+            for m in self.moments_by_match.get(match_id, [])
+            if m.primary_event_ref == evidence_id or evidence_id in m.related_event_refs
+        ]
+
+    @cached_property
+    def masking_bitmaps(self) -> Mapping[str, str]:
+        return (self.observation_masking or {}).get("kept_bitmaps") or {}
+
+    def kept_events(self, match_id: str) -> list[DemoEvent] | None:
+        """Events of `match_id` that survive observation masking (None without a bitmap)."""
+
+        encoded = self.masking_bitmaps.get(match_id)
+        events = self.events_by_match.get(match_id)
+        if encoded is None or events is None:
+            return None
+        try:
+            flags = decode_bitmap(encoded, len(events))
+        except ValueError as e:
+            raise DemoPackCorrupted(f"Observation masking bitmap for {match_id} does not match its events ({e})")
+        return [e for e, keep in zip(events, flags) if keep]
+
+    @cached_property
+    def responses(self) -> FrozenResponseCache:
+        """Encoded (and gzipped) endpoint bodies for this pack."""
+
+        return FrozenResponseCache()
+
+    def prebuild_indexes(self) -> None:
+        """Build the indexes that need no store decoding (keys and patterns only)."""
+
+        for name in ("match_ids", "team_ids", "patterns_by_team"):
+            getattr(self, name)
+
+    @cached_property
+    def integrity_report(self) -> dict[str, Any]:
+        """Integrity report for these stores, computed at most once per load.
+
+        The build-time report is used only while every store file still has
+        the sha256 recorded with it; hashing happens here, on first use, not
+        when the pack is loaded.
+        """
+
+        recorded = self.precomputed_integrity
+        if recorded is not None and self.pack_root is not None:
+            processed = self.pack_root / "processed"
+            paths = [processed / name for name in recorded["store_sha256"]]
+            if all(p.exists() for p in paths) and store_digests(paths) == recorded["store_sha256"]:
+                return recorded["report"]
+        return compute_integrity_report(
+            self.events_by_match, self.moments_by_match, self.patterns, self.panels_by_evidence_id
+        )
+
+
+def teams_of_match(match_id: str) -> list[str]:
+    """Team ids are the left/right tokens of the match id (e.g. "TL-C9-G2")."""
+
+    return match_id.split("-")[:2]
 
 
 class DemoPackCorrupted(RuntimeError):
@@ -26,6 +124,65 @@ class DemoPackCorrupted(RuntimeError):
         self.fix = fix
 
 
+class LazyStoreMapping(Mapping[str, T]):
+    """Read-only mapping over one memory-mapped store.
+
+    Keys are known up front (from the build-time `store_index.json` or the
+    columnar manifest); `read(key)` fetches the raw entry, which is decoded
+    (and validated) on first access.
+    """
+
+    def __init__(self, keys: Mapping[str, Any], read: Callable[[str], Any], decode: Callable[[Any], T], source: Path):
+        self._keys = keys
+        self._read = read
+        self._decode = decode
+        self._source = source
+        self._values: dict[str, T] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def over_json(
+        cls, buffer: mmap.mmap, offsets: dict[str, list[int]], decode: Callable[[Any], T], source: Path
+    ) -> LazyStoreMapping[T]:
+        """Entries are byte ranges of an indexed JSON file (see `write_indexed_json`)."""
+
+        return cls(offsets, lambda key: json.loads(buffer[slice(*offsets[key])]), decode, source)
+
+    def __getitem__(self, key: str) -> T:
+        value = self._values.get(key)
+        if value is not None:
+            return value
+        if key not in self._keys:
+            raise KeyError(key)
+        value = self._load(key)
+        with self._lock:
+            return self._values.setdefault(key, value)
+
+    def _load(self, key: str) -> T:
+        try:
+            return self._decode(self._read(key))
+        except (ValueError, LookupError) as e:  # bad JSON, failed validation, dangling reference
+            raise DemoPackCorrupted(f"Demo pack entry {key!r} is corrupted: {self._source}") from e
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._keys
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @property
+    def decoded_count(self) -> int:
+        return len(self._values)
+
+    def check(self, key: str) -> None:
+        """Decode and validate one entry without caching it."""
+
+        self._load(key)
+
+
 _CACHED: DemoStores | None = None
 
 
@@ -49,16 +206,116 @@ def _try_read_json(path: Path) -> dict[str, Any] | None:
         raise DemoPackCorrupted(f"Demo pack JSON is corrupted: {path}") from e
 
 
-def load_demo_stores(pack_root: str | Path | None = None) -> DemoStores:
-    """Load precomputed demo stores from disk.
+def _read_store_index(path: Path) -> dict[str, Any] | None:
+    try:
+        index = _try_read_json(path)
+    except DemoPackCorrupted:
+        return None  # the index is only an accelerator
+    if not isinstance(index, dict) or index.get("version") != 1 or not isinstance(index.get("files"), dict):
+        return None
+    return index
 
-    This is intentionally "zero compute" at runtime: it only loads frozen JSON.
+
+def _index_entry(index: dict[str, Any] | None, path: Path) -> dict[str, Any] | None:
+    """Index entry for `path`, or None if the file no longer has its build-time size.
+
+    Any edit of a store file shifts its size in practice, so a mismatch means
+    the offsets cannot be trusted and the file is loaded eagerly instead.
+    """
+
+    if index is None:
+        return None
+    entry = index["files"].get(path.name)
+    if not isinstance(entry, dict) or not isinstance(entry.get("keys"), dict):
+        return None
+    try:
+        size = path.stat().st_size
+    except FileNotFoundError as e:
+        raise DemoPackCorrupted(f"Missing required demo pack file: {path}") from e
+    if size == 0 or size != entry.get("size"):
+        return None
+    return entry
+
+
+def _load_section(
+    path: Path,
+    section: str,
+    decode: Callable[[Any], T],
+    index: dict[str, Any] | None,
+) -> Mapping[str, T]:
+    entry = _index_entry(index, path)
+    if entry is None:
+        raw = _read_json(path).get(section, {})
+        return {key: _decode_eager(decode, value, path) for key, value in raw.items()}
+    with path.open("rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return LazyStoreMapping.over_json(buffer, entry["keys"], decode, path)
+
+
+def _decode_eager(decode: Callable[[Any], T], value: Any, path: Path) -> T:
+    try:
+        return decode(value)
+    except (ValueError, LookupError) as e:
+        raise DemoPackCorrupted(f"Demo pack entry is invalid: {path}") from e
+
+
+def _read_precomputed_integrity(processed: Path) -> dict[str, Any] | None:
+    try:
+        raw = _try_read_json(processed / "integrity_report.json")
+    except DemoPackCorrupted:
+        return None
+    if not isinstance(raw, dict) or raw.get("version") != 2 or not isinstance(raw.get("report"), dict):
+        return None
+    digests = raw.get("store_sha256")
+    names = {"events_store.json", "moments_store.json", "patterns_store.json", "evidence_refs.json"}
+    if not isinstance(digests, dict) or set(digests) != names:
+        return None
+    return {"store_sha256": digests, "report": raw["report"]}
+
+
+def deep_integrity_report(stores: DemoStores) -> dict[str, Any]:
+    """Re-verify the stores from scratch, including decoding every entry.
+
+    Slow (touches the whole pack); meant to run off the request path.
     """
 
-    global _CACHED
-    if _CACHED is not None:
-        return _CACHED
+    report = dict(compute_integrity_report(
+        stores.events_by_match, stores.moments_by_match, stores.patterns, stores.panels_by_evidence_id
+    ))
+    unreadable = 0
+    panels = stores.panels_by_evidence_id
+    if isinstance(panels, LazyStoreMapping):
+        for evidence_id in panels:
+            try:
+                panels.check(evidence_id)
+            except DemoPackCorrupted:
+                unreadable += 1
+    report["unreadable_panels"] = unreadable
+    report["broken_refs"] += unreadable
+    report["deep"] = True
+    return report
+
+
+def _open_columnar(processed: Path, index: dict[str, Any] | None) -> ColumnarReader | None:
+    """Columnar events/moments, if the pack has them and they belong to its JSON stores."""
+
+    sources = [processed / "events_store.json", processed / "moments_store.json"]
+    for path in sources:
+        if not path.exists():
+            raise DemoPackCorrupted(f"Missing required demo pack file: {path}")
+    build_id = index.get("build_id") if index is not None else None
+    return open_columnar(processed / "columnar", build_id, sources)
+
 
+def _decode_events(raw: Any) -> list[DemoEvent]:
+    return [DemoEvent.model_validate(e) for e in raw]
+
+
+def _decode_moments(raw: Any) -> list[DemoMoment]:
+    return [DemoMoment.model_validate(m) for m in raw]
+
+
+def resolve_pack_root(pack_root: str | Path | None = None) -> Path:
     if pack_root is None:
         env_root = os.environ.get("DEMO_PACK_ROOT")
         if not env_root:
@@ -67,33 +324,41 @@ def load_demo_stores(pack_root: str | Path | None = None) -> DemoStores:
                 fix='Set DEMO_PACK_ROOT to the extracted demo pack directory (e.g., "artifacts/demo_pack")',
             )
         pack_root = env_root
-    pack_root = Path(pack_root)
+    return Path(pack_root)
+
+
+def read_demo_stores(pack_root: Path) -> DemoStores:
+    """Read one pack from disk (uncached; see `load_demo_stores`)."""
 
     processed = pack_root / "processed"
-    events_raw = _read_json(processed / "events_store.json")
-    moments_raw = _read_json(processed / "moments_store.json")
+    index = _read_store_index(processed / "store_index.json")
+    columnar = _open_columnar(processed, index)
+    if columnar is not None:
+        source = processed / "columnar"
+        events_by_match: Mapping[str, list[DemoEvent]] = LazyStoreMapping(
+            columnar.match_index("events"), partial(columnar.rows, "events"), _decode_events, source
+        )
+        moments_by_match: Mapping[str, list[DemoMoment]] = LazyStoreMapping(
+            columnar.match_index("moments"), partial(columnar.rows, "moments"), _decode_moments, source
+        )
+    else:
+        events_by_match = _load_section(processed / "events_store.json", "matches", _decode_events, index)
+        moments_by_match = _load_section(processed / "moments_store.json", "matches", _decode_moments, index)
+    # Panels reference the (shared) events/moments of their match; resolved per panel.
+    panels_by_evidence_id: Mapping[str, EvidencePanel] = _load_section(
+        processed / "evidence_refs.json",
+        "panels",
+        lambda raw: decode_evidence_panel(raw, events_by_match, moments_by_match),
+        index,
+    )
     patterns_raw = _read_json(processed / "patterns_store.json")
-    evidence_raw = _read_json(processed / "evidence_refs.json")
+    patterns = [DemoPattern.model_validate(p) for p in patterns_raw.get("patterns", [])]
 
     metadata = _try_read_json(pack_root / "metadata.json") or {}
     observation_masking = _try_read_json(processed / "observation_masking.json")
     benchmarks = _try_read_json(processed / "benchmarks.json")
 
-    events_by_match = {
-        mid: [DemoEvent.model_validate(e) for e in evs]
-        for mid, evs in events_raw.get("matches", {}).items()
-    }
-    moments_by_match = {
-        mid: [DemoMoment.model_validate(m) for m in moms]
-        for mid, moms in moments_raw.get("matches", {}).items()
-    }
-    patterns = [DemoPattern.model_validate(p) for p in patterns_raw.get("patterns", [])]
-    panels_by_evidence_id = {
-        eid: EvidencePanel.model_validate(p)
-        for eid, p in evidence_raw.get("panels", {}).items()
-    }
-
-    _CACHED = DemoStores(
+    stores = DemoStores(
         events_by_match=events_by_match,
         moments_by_match=moments_by_match,
         patterns=patterns,
@@ -101,5 +366,151 @@ def load_demo_stores(pack_root: str | Path | None = None) -> DemoStores:
         metadata=metadata,
         observation_masking=observation_masking,
         benchmarks=benchmarks,
+        precomputed_integrity=_read_precomputed_integrity(processed),
+        pack_root=pack_root,
     )
-    return _CACHED
+    stores.prebuild_indexes()
+    return stores
+
+
+def pack_fingerprint(pack_root: Path) -> tuple | None:
+    """Cheap change detector: (name, size, mtime_ns) of the pack's JSON files."""
+
+    files = [pack_root / "metadata.json", *sorted((pack_root / "processed").glob("*.json"))]
+    out = []
+    for path in files:
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            continue
+        out.append((path.name, st.st_size, st.st_mtime_ns))
+    return tuple(out) or None
+
+
+class DemoPackManager:
+    """Owns the served demo pack and swaps in new ones without downtime.
+
+    A reload reads and validates the new pack off to the side, then replaces
+    the module-level snapshot in a single assignment. Requests that already
+    hold the old `DemoStores` keep using it (its memory maps stay valid) until
+    they finish.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.last_error: str | None = None
+        self._fingerprint: tuple | None = None
+        self._pending: tuple | None = None
+        # Fingerprint of the last rejected pack; the watcher skips it until it changes.
+        self._rejected: tuple | None = None
+
+    def reload(self, pack_root: str | Path | None = None, *, validate: bool = True) -> DemoStores:
+        """Load `pack_root` (default: DEMO_PACK_ROOT) and swap it in.
+
+        With `validate`, the new stores are re-verified from scratch (see
+        `deep_integrity_report`; the report shipped with the pack is not
+        used) and a pack with broken references is rejected while the
+        current one keeps serving.
+        """
+
+        root = resolve_pack_root(pack_root)
+        with self._lock:
+            return self._swap_in(root, validate)
+
+    def ensure_loaded(self, pack_root: str | Path | None = None) -> DemoStores:
+        """First load: concurrent callers wait for one read instead of each reading the pack."""
+
+        root = resolve_pack_root(pack_root)
+        with self._lock:
+            if _CACHED is not None:
+                return _CACHED
+            return self._swap_in(root, validate=False)
+
+    def _swap_in(self, root: Path, validate: bool) -> DemoStores:
+        global _CACHED
+        fingerprint = pack_fingerprint(root)
+        try:
+            stores = read_demo_stores(root)
+            if validate:
+                broken = deep_integrity_report(stores)["broken_refs"]
+                if broken:
+                    raise DemoPackCorrupted(
+                        f"New demo pack at {root} has {broken} broken references",
+                        fix="Rebuild the demo pack; the previous pack is still being served",
+                    )
+        except DemoPackCorrupted as e:
+            self.last_error = str(e)
+            self._rejected = fingerprint
+            raise
+        _CACHED = stores
+        self.generation += 1
+        self.last_error = None
+        self._rejected = None
+        self._fingerprint = self._pending = fingerprint
+        return stores
+
+    def check_for_update(self) -> bool:
+        """Reload if DEMO_PACK_ROOT changed on disk; returns whether a swap happened.
+
+        A change must look the same on two consecutive checks before it is
+        loaded, so a pack that is still being written is not picked up. A
+        pack that was rejected is not read again until its files change.
+        """
+
+        fingerprint = pack_fingerprint(resolve_pack_root())
+        if fingerprint is None or fingerprint in (self._fingerprint, self._rejected):
+            self._pending = self._fingerprint
+            return False
+        if fingerprint != self._pending:
+            self._pending = fingerprint
+            return False
+        self.reload()
+        return True
+
+    async def watch(self, interval_seconds: float) -> None:
+        """Poll for pack updates until cancelled; failed reloads keep the old pack.
+
+        Any error (a rejected pack, an OSError during a concurrent rebuild,
+        ...) is recorded in `last_error` and logged once per distinct
+        message; polling continues and the reload is retried.
+        """
+
+        logged: str | None = None
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await asyncio.to_thread(self.check_for_update)
+            except Exception as e:  # noqa: BLE001 - any failure must not stop polling
+                if not isinstance(e, DemoPackCorrupted):
+                    self.last_error = f"Demo pack reload failed: {type(e).__name__}: {e}"
+                if self.last_error != logged:
+                    logged = self.last_error
+                    print(traceback.format_exc())
+
+    def status(self) -> dict[str, Any]:
+        stores = _CACHED
+        return {
+            "generation": self.generation,
+            "pack_root": str(stores.pack_root) if stores is not None and stores.pack_root else None,
+            "loaded": stores is not None,
+            "last_error": self.last_error,
+        }
+
+
+demo_pack_manager = DemoPackManager()
+
+
+def load_demo_stores(pack_root: str | Path | None = None) -> DemoStores:
+    """Return the served demo stores, loading them on first use.
+
+    This is intentionally "zero compute" at runtime: it only loads frozen JSON.
+    Packs with a `store_index.json` are memory-mapped and decoded per match /
+    per evidence id on first access; older or edited packs load eagerly.
+    Use `demo_pack_manager.reload()` to switch to a new pack.
+    """
+
+    stores = _CACHED
+    if stores is not None:
+        return stores
+    return demo_pack_manager.ensure_loaded(pack_root)
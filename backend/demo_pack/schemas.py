@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections.abc import Mapping, Sequence
 from typing import Any, Literal
 
 from pydantic import BaseModel, Field
@@ -60,3 +61,55 @@ class EvidencePanel(BaseModel):
     context_window: list[DemoEvent]
     feature_snapshot: dict[str, Any] = Field(default_factory=dict)
     related_moments: list[DemoMoment] = Field(default_factory=list)
+
+
+class EvidencePanelRecord(BaseModel):
+    """Normalized evidence panel as stored in `evidence_refs.json`.
+
+    Instead of copies, the record points into the match's event list
+    (`event_index`, `[context_start, context_end)`) and moment ids; the full
+    `EvidencePanel` is rebuilt on demand via `materialize`.
+    """
+
+    evidence_id: str
+    match_id: str
+    event_index: int = Field(ge=0)
+    context_start: int = Field(ge=0)
+    context_end: int = Field(ge=0)
+    feature_snapshot: dict[str, Any] = Field(default_factory=dict)
+    related_moment_ids: list[str] = Field(default_factory=list)
+
+    @classmethod
+    def from_panel(cls, panel: EvidencePanel, event_index: Mapping[str, int]) -> EvidencePanelRecord:
+        """Normalize a materialized panel; `event_index` maps evidence_id -> position in the match."""
+
+        idx = event_index[panel.evidence_id]
+        ctx = [event_index[e.evidence_id] for e in panel.context_window]
+        start, end = (ctx[0], ctx[-1] + 1) if ctx else (idx, idx)
+        if ctx != list(range(start, end)):
+            raise ValueError(f"Context window of {panel.evidence_id} is not a contiguous event range")
+        return cls(
+            evidence_id=panel.evidence_id,
+            match_id=panel.match_id,
+            event_index=idx,
+            context_start=start,
+            context_end=end,
+            feature_snapshot=dict(panel.feature_snapshot),
+            related_moment_ids=[m.moment_id for m in panel.related_moments],
+        )
+
+    def materialize(self, events: Sequence[DemoEvent], moments: Sequence[DemoMoment]) -> EvidencePanel:
+        """Resolve references against the match's events/moments (shared, not copied)."""
+
+        event = events[self.event_index]
+        if event.evidence_id != self.evidence_id or self.context_end > len(events):
+            raise ValueError(f"Evidence panel {self.evidence_id} does not match the events store")
+        moments_by_id = {m.moment_id: m for m in moments}
+        return EvidencePanel(
+            evidence_id=self.evidence_id,
+            match_id=self.match_id,
+            event=event,
+            context_window=list(events[self.context_start:self.context_end]),
+            feature_snapshot=dict(self.feature_snapshot),
+            related_moments=[moments_by_id[mid] for mid in self.related_moment_ids],
+        )
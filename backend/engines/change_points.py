@@ -0,0 +1,129 @@
+import bisect
+
+import numpy as np
+
+from backend.engines.spatial_batch import analyze_frame_batch
+
+# Frames links bzw. rechts eines Kandidaten, deren Mittelwerte verglichen werden
+CPD_WINDOW_FRAMES = 6
+
+# Mindestabstand (Frames) zwischen zwei gemeldeten Change Points
+CPD_MIN_DISTANCE_FRAMES = 6
+
+# Mindeststärke (Mittelwertverschiebung in Standardabweichungen, z-Wert)
+CPD_THRESHOLD = 3.0
+
+FEATURE_NAMES = ("cohesion_blue", "cohesion_red", "team_distance", "blue_near_red", "red_near_blue", "isolated")
+
+
+def frame_features(positions):
+    """
+    Feature-Serien pro Frame aus dem Positions-Tensor (frames, teams, players, 2).
+    Ergebnis: Dict Feature-Name -> Array (frames,), Reihenfolge wie FEATURE_NAMES.
+    """
+    positions = np.asarray(positions, dtype=float)
+    frames = positions.shape[0]
+    if positions.ndim != 4 or positions.shape[1] < 2:
+        return {name: np.zeros(frames) for name in FEATURE_NAMES}
+
+    batch = analyze_frame_batch(positions)
+    with np.errstate(invalid="ignore"):
+        present = ~np.isnan(positions[:, :2]).any(axis=-1)
+        count = present.sum(axis=-1)
+        centroid = np.where(present[..., None], positions[:, :2], 0.0).sum(axis=2) / np.maximum(count, 1)[..., None]
+    delta = centroid[:, 0] - centroid[:, 1]
+    team_distance = np.hypot(delta[:, 0], delta[:, 1])
+    # Frames ohne Spieler eines Teams haben keine sinnvolle Distanz
+    team_distance = np.where((count > 0).all(axis=1), team_distance, 0.0)
+
+    return {
+        "cohesion_blue": batch["cohesion"][:, 0],
+        "cohesion_red": batch["cohesion"][:, 1],
+        "team_distance": team_distance,
+        "blue_near_red": batch["blue_near_red"].astype(float),
+        "red_near_blue": batch["red_near_blue"].astype(float),
+        "isolated": batch["isolated"].sum(axis=(1, 2)).astype(float),
+    }
+
+
+def mean_shift_scores(features, window=CPD_WINDOW_FRAMES):
+    """
+    Fenster-CUSUM: Stärke der Mittelwertverschiebung pro Frame.
+
+    Für jeden Frame t werden die Mittelwerte von [t - window, t) und
+    [t, t + window) verglichen, je Feature standardisiert (z-Wert eines
+    Zwei-Stichproben-Vergleichs). Über Präfixsummen in O(frames * features).
+    Ergebnis: (scores, drivers, shifts), je Array (frames,):
+    - scores: stärkster z-Wert über alle Features (0 am Rand)
+    - drivers: Index des stärksten Features
+    - shifts: Vorzeichen der Verschiebung dieses Features (+1 / -1)
+    """
+    x = np.column_stack([np.asarray(v, dtype=float) for v in features.values()])
+    frames = x.shape[0]
+    scores = np.zeros(frames)
+    drivers = np.zeros(frames, dtype=int)
+    shifts = np.zeros(frames, dtype=int)
+    if frames < 2 * window or window < 1:
+        return scores, drivers, shifts
+
+    mean = x.mean(axis=0)
+    std = x.std(axis=0)
+    # Konstante Features (bis auf Rundungsrauschen) tragen nichts bei
+    active = std > 1e-9 * np.maximum(1.0, np.abs(mean))
+    z = np.zeros_like(x)
+    z[:, active] = (x[:, active] - mean[active]) / std[active]
+
+    prefix = np.vstack([np.zeros((1, x.shape[1])), np.cumsum(z, axis=0)])
+    t = np.arange(window, frames - window + 1)
+    left = prefix[t] - prefix[t - window]
+    right = prefix[t + window] - prefix[t]
+    stat = (right - left) / window * np.sqrt(window / 2)
+
+    strongest = np.abs(stat).argmax(axis=1)
+    picked = stat[np.arange(len(t)), strongest]
+    scores[t] = np.abs(picked)
+    drivers[t] = strongest
+    shifts[t] = np.sign(picked).astype(int)
+    return scores, drivers, shifts
+
+
+def detect_change_points(
+    timestamps,
+    features,
+    window=CPD_WINDOW_FRAMES,
+    min_distance=CPD_MIN_DISTANCE_FRAMES,
+    threshold=CPD_THRESHOLD,
+):
+    """
+    Deterministische Change Points über die Feature-Serien eines Matches.
+
+    Kandidaten sind alle Frames mit Score >= `threshold`; sie werden nach
+    Stärke (bei Gleichstand früherer Frame zuerst) übernommen, solange kein
+    stärkerer Change Point näher als `min_distance` Frames liegt.
+    Ergebnis: Liste von Dicts (frame, ts, magnitude, driver, direction),
+    nach Frame sortiert.
+    """
+    names = list(features)
+    scores, drivers, shifts = mean_shift_scores(features, window=window)
+    candidates = np.flatnonzero(scores >= threshold)
+    order = candidates[np.lexsort((candidates, -scores[candidates]))]
+
+    kept = []
+    for frame in order.tolist():
+        i = bisect.bisect_left(kept, frame)
+        if i < len(kept) and kept[i] - frame < min_distance:
+            continue
+        if i > 0 and frame - kept[i - 1] < min_distance:
+            continue
+        kept.insert(i, frame)
+
+    return [
+        {
+            "frame": frame,
+            "ts": int(timestamps[frame]),
+            "magnitude": float(scores[frame]),
+            "driver": names[drivers[frame]],
+            "direction": "up" if shifts[frame] > 0 else "down",
+        }
+        for frame in kept
+    ]
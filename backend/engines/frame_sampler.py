@@ -0,0 +1,99 @@
+from typing import Literal, get_args
+
+SamplingMode = Literal["stride", "time", "adaptive"]
+SAMPLING_MODES = get_args(SamplingMode)
+
+# Kleinste erlaubte Zielgröße (erster und letzter Frame)
+MIN_TARGET_FRAMES = 2
+
+DEFAULT_SAMPLING_MODE = "adaptive"
+DEFAULT_TARGET_FRAMES = 100
+
+# Adaptive: Frames innerhalb dieses Fensters nach einem Teamfight-Frame gelten als "nah"
+TEAMFIGHT_WINDOW_SECONDS = 30
+
+
+class FrameSampler:
+    """
+    Streaming-Dezimierung über das gesamte Match mit fester Zielgröße.
+
+    Die Länge des Matches ist beim Streaming vorher unbekannt. Deshalb wird
+    mit Schrittweite 1 begonnen; sobald mehr als `target_frames` Samples
+    gehalten werden, verdoppelt sich die Schrittweite und jedes zweite Sample
+    fällt weg. Speicher und Analyseaufwand hängen so von der Zielgröße ab,
+    nicht von der Anzahl der Input-Frames.
+
+    Modi:
+    - "stride": jeder n-te Frame (n verdoppelt sich bei Überlauf)
+    - "time": erster Frame pro Zeit-Bucket (Bucket-Breite verdoppelt sich)
+    - "adaptive": wie "stride", zusätzlich werden Frames nahe an Teamfights
+      bevorzugt behalten (höchstens die Hälfte des Budgets)
+    """
+
+    def __init__(self, target_frames=DEFAULT_TARGET_FRAMES, mode=DEFAULT_SAMPLING_MODE, bucket_seconds=10):
+        if mode not in SAMPLING_MODES:
+            raise ValueError(f"Unbekannter Sampling-Modus: {mode} (erlaubt: {', '.join(SAMPLING_MODES)})")
+        if target_frames < MIN_TARGET_FRAMES:
+            raise ValueError(f"target_frames muss mindestens {MIN_TARGET_FRAMES} sein.")
+        self.target_frames = int(target_frames)
+        self.mode = mode
+        self.stride = 1
+        self.bucket_seconds = bucket_seconds
+        self.priority_stride = 1
+        self._last_bucket = None
+        self._priority_seen = 0
+        # (idx, ts, payload)
+        self._regular = []
+        self._priority = []
+
+    def offer(self, idx, ts, make_payload, priority=False):
+        """
+        Bietet Frame `idx` (Spielzeit `ts`) an. `make_payload` wird nur
+        aufgerufen, wenn der Frame behalten wird. Gibt zurück, ob er behalten wurde.
+        """
+        if self.mode == "adaptive" and priority:
+            ordinal = self._priority_seen
+            self._priority_seen += 1
+            if ordinal % self.priority_stride:
+                return False
+            self._priority.append((ordinal, ts, idx, make_payload()))
+        elif self.mode == "time":
+            bucket = ts // self.bucket_seconds
+            if self._last_bucket is not None and bucket <= self._last_bucket:
+                return False
+            self._last_bucket = bucket
+            self._regular.append((idx, ts, make_payload()))
+        else:
+            if idx % self.stride:
+                return False
+            self._regular.append((idx, ts, make_payload()))
+
+        while len(self._regular) + len(self._priority) > self.target_frames:
+            self._compact()
+        return True
+
+    def _compact(self):
+        if len(self._priority) > self.target_frames // 2:
+            self.priority_stride *= 2
+            self._priority = [s for s in self._priority if s[0] % self.priority_stride == 0]
+        elif self.mode == "time":
+            self.bucket_seconds *= 2
+            kept = []
+            last_bucket = None
+            for s in self._regular:
+                bucket = s[1] // self.bucket_seconds
+                if last_bucket is None or bucket > last_bucket:
+                    kept.append(s)
+                    last_bucket = bucket
+            self._regular = kept
+            self._last_bucket = last_bucket
+        else:
+            self.stride *= 2
+            self._regular = [s for s in self._regular if s[0] % self.stride == 0]
+
+    def samples(self):
+        """Behaltene Payloads in Frame-Reihenfolge."""
+        merged = [(idx, payload) for idx, _ts, payload in self._regular]
+        merged.extend((idx, payload) for _ordinal, _ts, idx, payload in self._priority)
+        merged.sort(key=lambda s: s[0])
+        return [payload for _idx, payload in merged]
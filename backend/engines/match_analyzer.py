@@ -0,0 +1,253 @@
+from backend.engines.frame_sampler import (
+    DEFAULT_SAMPLING_MODE,
+    DEFAULT_TARGET_FRAMES,
+    TEAMFIGHT_WINDOW_SECONDS,
+    FrameSampler,
+)
+from backend.engines.heatmap_generator import generate_death_heatmap, generate_victory_heatmap
+from backend.engines.insight_generator import generate_coaching_insights
+from backend.engines.pattern_detector import detect_patterns
+from backend.engines.risk_calculator import calculate_risk_score, classify_risk_stage
+from backend.engines.spatial_analyzer import analyze_isolation, detect_teamfight
+from backend.engines.spatial_batch import analyze_frame_batch
+from backend.engines.teamfight_tracker import TeamfightTracker
+from backend.parsers.grid_parser import PositionTensorBuilder, extract_player_positions
+
+# Bump when the analytics output changes (part of the parsing cache key)
+ANALYTICS_VERSION = "4"
+
+# Dummy: 10s per frame
+FRAME_SECONDS = 10
+
+# Frames per vectorized spatial batch
+BLOCK_FRAMES = 64
+
+
+class MatchAnalyzer:
+    """
+    Inkrementelle Match-Analyse: Frames werden einzeln per `add_frame`
+    verarbeitet, sobald sie aus dem Upload-Stream kommen. Es wird kein
+    Frame-Array vorgehalten, nur die aggregierten Verläufe und der letzte Frame.
+
+    Teamfights werden auf jedem Frame erkannt; Timeline, Cohesion und Patterns
+    nur auf den Frames, die der `FrameSampler` für das gesamte Match behält.
+    Positionen landen in einem wiederverwendeten PositionTensor-Block, der
+    alle BLOCK_FRAMES Frames vektorisiert ausgewertet wird.
+    """
+
+    def __init__(self, target_frames=DEFAULT_TARGET_FRAMES, sampling=DEFAULT_SAMPLING_MODE):
+        self.sampler = FrameSampler(target_frames=target_frames, mode=sampling, bucket_seconds=FRAME_SECONDS)
+        self.frame_count = 0
+        self.last_series_id = "N/A"
+        self.last_frame = {}
+        self.teamfight_events = []
+        self.teamfights = TeamfightTracker()
+        # Risiko des zuletzt ausgewerteten Frames (auch wenn er nicht gesampelt wurde)
+        self.last_risk_score = None
+        self._positions = PositionTensorBuilder(capacity=BLOCK_FRAMES)
+        # (idx, game_time_seconds, game_time) per buffered frame
+        self._pending = []
+
+    def add_frame(self, frame):
+        """
+        Puffert einen Frame; ausgewertet wird blockweise (oder per `flush`).
+        """
+        idx = self.frame_count
+        self.frame_count += 1
+        self.last_frame = frame
+
+        series_state = frame.get("data", {}).get("seriesState", {})
+        self.last_series_id = series_state.get("id", self.last_series_id)
+        games = series_state.get("games", [])
+        if not games:
+            return
+
+        game = games[0]
+        game_time_seconds = idx * FRAME_SECONDS
+        game_time = f"{game_time_seconds // 60:02d}:{game_time_seconds % 60:02d}"
+
+        self._positions.append(game)
+        self._pending.append((idx, game_time_seconds, game_time))
+        if len(self._pending) >= BLOCK_FRAMES:
+            self.flush()
+
+    def flush(self):
+        """
+        Wertet die gepufferten Frames als einen vektorisierten Block aus und
+        gibt pro Frame ein kompaktes Update zurück (z.B. für Live-Deltas).
+        """
+        if not self._pending:
+            return []
+        tensor = self._positions.build()
+        batch = analyze_frame_batch(tensor.xy)
+        updates = [
+            self._process_frame(tensor, batch, row, idx, game_time_seconds, game_time)
+            for row, (idx, game_time_seconds, game_time) in enumerate(self._pending)
+        ]
+        self._pending = []
+        self._positions.reset()
+        return updates
+
+    def _process_frame(self, tensor, batch, row, idx, game_time_seconds, game_time):
+        # Teamfight detection (Zustand steckt im Tracker)
+        is_teamfight = bool(batch["teamfight"][row])
+        fight_events = []
+        for event in self.teamfights.update(
+            idx, game_time_seconds, batch["blue_near_red"][row], batch["red_near_blue"][row]
+        ):
+            if event["type"] == "start":
+                self.teamfight_events.append({
+                    "start_time": game_time,
+                    "start_time_seconds": game_time_seconds,
+                    "end_time_seconds": game_time_seconds,
+                    "duration_seconds": 0,
+                    "participants": dict(event["fight"]["participants"]),
+                    "won": idx % 2 == 0  # Mock winner logic
+                })
+            fight_events.append({"type": event["type"], **self.teamfight_events[-1]})
+        teamfight = None
+        if is_teamfight:
+            self._sync_teamfight(self.teamfights.current)
+            # Kopie: der Eintrag wird von späteren Frames weiter aktualisiert
+            entry = self.teamfight_events[-1]
+            teamfight = {**entry, "participants": dict(entry["participants"])}
+
+        # Mock Gold-Diff development
+        gold_diff = (idx * 50) - 2000 if idx < 50 else (idx * -30) + 2000
+
+        # Risk calculation
+        game_state = {
+            "gold_diff": gold_diff,
+            "team_objectives": {"towers": 2, "dragons": 1},
+            "enemy_objectives": {"towers": 1},
+            "team_vision": 15.5,
+            "enemy_vision": 12.0
+        }
+        risk_score = calculate_risk_score(game_state)
+        self.last_risk_score = risk_score
+
+        # Spatial analysis
+        cohesion_blue = float(batch["cohesion"][row, 0])
+
+        near_teamfight = self.teamfights.in_fight(game_time_seconds, TEAMFIGHT_WINDOW_SECONDS)
+        sampled = self.sampler.offer(
+            idx,
+            game_time_seconds,
+            lambda: self._sample(tensor, row, game_time_seconds, game_time, gold_diff, risk_score, cohesion_blue),
+            priority=near_teamfight,
+        )
+
+        return {
+            "frame": idx,
+            "game_time": game_time,
+            "gold_diff": gold_diff,
+            "risk_score": risk_score,
+            "stage": classify_risk_stage(risk_score),
+            "cohesion_score": cohesion_blue,
+            "is_teamfight": is_teamfight,
+            "teamfight": teamfight,
+            "teamfight_events": fight_events,
+            "sampled": sampled,
+        }
+
+    def _sync_teamfight(self, fight):
+        entry = self.teamfight_events[-1]
+        entry["end_time_seconds"] = fight["end_ts"]
+        entry["duration_seconds"] = fight["duration_seconds"]
+        entry["participants"] = dict(fight["participants"])
+
+    def close_teamfights(self):
+        """
+        Schließt einen noch laufenden Teamfight ab (Match-Ende) und gibt die
+        End-Events im Format von `teamfight_events` zurück.
+        """
+        self.flush()
+        return [{"type": e["type"], **self.teamfight_events[-1]} for e in self.teamfights.close()]
+
+    def _sample(self, tensor, row, game_time_seconds, game_time, gold_diff, risk_score, cohesion_blue):
+        # Pattern detection (only on sampled frames)
+        patterns = [
+            {"game_time": game_time, "pattern": p}
+            for p in detect_patterns(tensor.team_players(row, 0), game_time_seconds)
+        ]
+
+        return {
+            "timeline": {
+                "game_time": game_time,
+                "gold_diff": gold_diff,
+                "risk_score": risk_score
+            },
+            "cohesion": {
+                "game_time": game_time,
+                "cohesion_score": cohesion_blue
+            },
+            "patterns": patterns,
+        }
+
+    def result(self):
+        self.flush()
+        samples = self.sampler.samples()
+        timeline_data = [s["timeline"] for s in samples]
+        cohesion_history = [s["cohesion"] for s in samples]
+        pattern_history = [p for s in samples for p in s["patterns"]]
+
+        # Final state for heatmaps and alerts (last frame)
+        last_series_state = self.last_frame.get("data", {}).get("seriesState", {})
+        last_series_id = last_series_state.get("id", self.last_series_id)
+
+        last_games = last_series_state.get("games") or []
+        last_game = last_games[0] if last_games else {}
+        last_teams_pos = extract_player_positions(last_game)
+
+        # Endstand aus dem letzten Frame, nicht aus dem letzten Sample
+        final_risk = self.last_risk_score if self.last_risk_score is not None else 50
+        stage = classify_risk_stage(final_risk)
+
+        # Isolation Alerts
+        isolation_alerts_red = analyze_isolation(last_teams_pos[1], last_teams_pos[0]) if len(last_teams_pos) > 1 else []
+
+        # Insights generation
+        insights = generate_coaching_insights({
+            "cohesion_history": cohesion_history,
+            "risk_score": final_risk,
+            "pattern_history": pattern_history
+        })
+
+        return {
+            "series_id": last_series_id,
+            "timeline": timeline_data,
+            "risk_score": final_risk,
+            "stage": stage,
+            "cohesion_history": cohesion_history,
+            "pattern_history": pattern_history,
+            "teamfights": self.teamfight_events,
+            "insights": insights,
+            "is_teamfight": detect_teamfight(last_teams_pos) if len(last_teams_pos) > 1 else False,
+            "isolation_alerts": isolation_alerts_red,
+            "causal_chain": [
+                {"cause": "Bad Spacing", "impact": -15},
+                {"cause": "Gold Deficit", "impact": -5},
+                {"cause": "Vision Loss", "impact": -8}
+            ],
+            "sampling": {
+                "mode": self.sampler.mode,
+                "target_frames": self.sampler.target_frames,
+                "input_frames": self.frame_count,
+                "sampled_frames": len(samples),
+            },
+            "heatmaps": {
+                "deaths": generate_death_heatmap([[12000, 12000], [12500, 12500], [8000, 9000]]),
+                "victories": generate_victory_heatmap([[4000, 4000], [4500, 4500]]),
+                "hotspots": ["Bot River", "Baron Pit"]
+            }
+        }
+
+
+def analyze_frames(frames, target_frames=DEFAULT_TARGET_FRAMES, sampling=DEFAULT_SAMPLING_MODE):
+    """
+    Analysiert einen (beliebig langen) Frame-Iterator Frame für Frame.
+    """
+    analyzer = MatchAnalyzer(target_frames=target_frames, sampling=sampling)
+    for frame in frames:
+        analyzer.add_frame(frame)
+    return analyzer.result()
@@ -0,0 +1,153 @@
+import sys
+
+import numpy as np
+
+from backend.engines.spatial_analyzer import (
+    COHESION_SPREAD_MAX,
+    LCI_ALLY_DIST,
+    LCI_ENEMY_DIST,
+    TF_MIN_PLAYERS_PER_TEAM,
+    TF_PLAYER_DISTANCE,
+)
+
+# Default von `analyze_isolation`, wenn kein Ally/Enemy vorhanden ist
+NO_DISTANCE = 9999.0
+
+# Ab Python 3.12 summiert `sum()` Floats kompensiert (Neumaier)
+_COMPENSATED_SUM = sys.version_info >= (3, 12)
+
+
+def _present_mask(positions):
+    return ~np.isnan(positions).any(axis=-1)
+
+
+def _python_sum(values):
+    """
+    Summiert über die letzte Achse in derselben Reihenfolge (und mit derselben
+    Kompensation) wie Pythons `sum()`, damit die Ergebnisse bitgenau mit den
+    skalaren Funktionen übereinstimmen.
+    """
+    total = np.zeros(values.shape[:-1])
+    if not _COMPENSATED_SUM:
+        for i in range(values.shape[-1]):
+            total = total + values[..., i]
+        return total
+    comp = np.zeros(values.shape[:-1])
+    for i in range(values.shape[-1]):
+        v = values[..., i]
+        t = total + v
+        comp = comp + np.where(np.abs(total) >= np.abs(v), (total - t) + v, (v - t) + total)
+        total = t
+    return np.where((comp != 0) & np.isfinite(comp), total + comp, total)
+
+
+def _pairwise_distances(a, b):
+    # a: (F, P, 2), b: (F, Q, 2) -> (F, P, Q)
+    dx = b[:, None, :, 0] - a[:, :, None, 0]
+    dy = b[:, None, :, 1] - a[:, :, None, 1]
+    return np.sqrt(dx * dx + dy * dy)
+
+
+def batch_cohesion_scores(positions, rounded=True):
+    """
+    Cohesion Score für alle Frames und Teams auf einmal.
+    positions: Array (frames, teams, players, 2), fehlende Spieler als NaN.
+    Ergebnis: (frames, teams), identisch zu `calculate_cohesion_score`.
+    """
+    positions = np.asarray(positions, dtype=float)
+    present = _present_mask(positions)
+    count = present.sum(axis=-1)
+    x = np.where(present, positions[..., 0], 0.0)
+    y = np.where(present, positions[..., 1], 0.0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        avg_x = _python_sum(x) / count
+        avg_y = _python_sum(y) / count
+        dx = x - avg_x[..., None]
+        dy = y - avg_y[..., None]
+        dist = np.where(present, np.sqrt(dx * dx + dy * dy), 0.0)
+
+        total_dist = np.zeros(count.shape)
+        for i in range(dist.shape[-1]):
+            total_dist = total_dist + dist[..., i]
+        avg_spread = total_dist / count
+        score = np.maximum(0.0, 100 - (avg_spread / COHESION_SPREAD_MAX * 100))
+
+    score = np.where(count < 2, 100.0, score)
+    if rounded:
+        # Pythons round() (nicht np.round), damit die Werte exakt übereinstimmen
+        score = np.array([round(v, 2) for v in score.ravel().tolist()]).reshape(score.shape)
+    return score
+
+
+def batch_proximity_counts(positions):
+    """
+    Anzahl Blue-Spieler mit einem Red-Spieler in Reichweite und umgekehrt.
+    Ergebnis: zwei Arrays (frames,).
+    """
+    positions = np.asarray(positions, dtype=float)
+    frames = positions.shape[0]
+    if positions.ndim != 4 or positions.shape[1] < 2:
+        zeros = np.zeros(frames, dtype=int)
+        return zeros, zeros.copy()
+    near = _pairwise_distances(positions[:, 0], positions[:, 1]) < TF_PLAYER_DISTANCE
+    blue_near_red = near.any(axis=2).sum(axis=1)
+    red_near_blue = near.any(axis=1).sum(axis=1)
+    return blue_near_red, red_near_blue
+
+
+def batch_detect_teamfight(positions):
+    """
+    Teamfight-Flag pro Frame, identisch zu `detect_teamfight`.
+    """
+    blue_near_red, red_near_blue = batch_proximity_counts(positions)
+    return (blue_near_red >= TF_MIN_PLAYERS_PER_TEAM) & (red_near_blue >= TF_MIN_PLAYERS_PER_TEAM)
+
+
+def batch_isolation_distances(positions):
+    """
+    Minimale Distanz zum nächsten Ally bzw. Enemy für jeden Spieler.
+    Ergebnis: zwei Arrays (frames, 2, players); NO_DISTANCE, wenn niemand da ist.
+    """
+    positions = np.asarray(positions, dtype=float)
+    blue, red = positions[:, 0], positions[:, 1]
+    players = blue.shape[1]
+
+    def _min(dist):
+        dist = np.where(np.isnan(dist), np.inf, dist)
+        out = dist.min(axis=-1, initial=np.inf)
+        return np.where(np.isinf(out), NO_DISTANCE, out)
+
+    self_pair = np.eye(players, dtype=bool)[None]
+    min_ally = np.stack([
+        _min(np.where(self_pair, np.nan, _pairwise_distances(blue, blue))),
+        _min(np.where(self_pair, np.nan, _pairwise_distances(red, red))),
+    ], axis=1)
+    min_enemy = np.stack([
+        _min(_pairwise_distances(blue, red)),
+        _min(_pairwise_distances(red, blue)),
+    ], axis=1)
+    return min_ally, min_enemy
+
+
+def analyze_frame_batch(positions):
+    """
+    Alle räumlichen Kennzahlen für einen Frame-Block in wenigen Array-Operationen.
+    positions: (frames, teams, players, 2), fehlende Spieler als NaN.
+    """
+    positions = np.asarray(positions, dtype=float)
+    blue_near_red, red_near_blue = batch_proximity_counts(positions)
+    result = {
+        "cohesion": batch_cohesion_scores(positions),
+        "blue_near_red": blue_near_red,
+        "red_near_blue": red_near_blue,
+        "teamfight": (blue_near_red >= TF_MIN_PLAYERS_PER_TEAM) & (red_near_blue >= TF_MIN_PLAYERS_PER_TEAM),
+    }
+    if positions.shape[1] >= 2:
+        min_ally, min_enemy = batch_isolation_distances(positions)
+        result["min_ally_dist"] = min_ally
+        result["min_enemy_dist"] = min_enemy
+        result["isolated"] = (
+            _present_mask(positions[:, :2]) & (min_ally > LCI_ALLY_DIST) & (min_enemy < LCI_ENEMY_DIST)
+        )
+    return result
@@ -0,0 +1,102 @@
+from backend.engines.spatial_analyzer import TF_MIN_PLAYERS_PER_TEAM
+
+# Teamfight-Frames mit höchstens diesem Abstand gehören zum selben Fight
+TEAMFIGHT_MERGE_GAP_SECONDS = 20
+
+
+class TeamfightTracker:
+    """
+    Inkrementelle Teamfight-Erkennung als Zustandsmaschine.
+
+    Konsumiert pro Frame die Proximity-Zählungen aus `analyze_frame_batch`
+    (`blue_near_red`, `red_near_blue`) und hält nur den laufenden Fight.
+    `update` gibt die dabei entstandenen Events zurück:
+    - {"type": "start", "fight": ...} beim ersten Teamfight-Frame
+    - {"type": "end", "fight": ...}, sobald die Lücke größer als `merge_gap_seconds` ist
+      (bzw. beim nächsten Fight oder bei `close`)
+
+    Ein Fight ist ein Dict mit start_frame, start_ts, end_ts, duration_seconds
+    und participants ({"blue": n, "red": n}, Maximum über den Fight). Das
+    Dict des laufenden Fights wird beim Verlängern an Ort und Stelle aktualisiert.
+    """
+
+    def __init__(self, merge_gap_seconds=TEAMFIGHT_MERGE_GAP_SECONDS, min_players=TF_MIN_PLAYERS_PER_TEAM):
+        self.merge_gap_seconds = merge_gap_seconds
+        self.min_players = min_players
+        self.current = None
+        self.last_end_ts = None
+        self.fight_count = 0
+
+    def update(self, frame_idx, ts, blue_near_red, red_near_blue):
+        """
+        Verarbeitet einen Frame. Gibt die Liste der neuen Events zurück (meist leer).
+        """
+        blue_near_red = int(blue_near_red)
+        red_near_blue = int(red_near_blue)
+        is_fight = blue_near_red >= self.min_players and red_near_blue >= self.min_players
+        events = []
+
+        fight = self.current
+        if fight is not None and ts - fight["end_ts"] > self.merge_gap_seconds:
+            events.append(self._end())
+            fight = None
+
+        if not is_fight:
+            return events
+
+        if fight is None:
+            fight = {
+                "start_frame": frame_idx,
+                "start_ts": ts,
+                "end_ts": ts,
+                "duration_seconds": 0,
+                "participants": {"blue": blue_near_red, "red": red_near_blue},
+            }
+            self.current = fight
+            self.fight_count += 1
+            events.append({"type": "start", "fight": fight})
+        else:
+            fight["end_ts"] = ts
+            fight["duration_seconds"] = ts - fight["start_ts"]
+            participants = fight["participants"]
+            participants["blue"] = max(participants["blue"], blue_near_red)
+            participants["red"] = max(participants["red"], red_near_blue)
+        self.last_end_ts = ts
+        return events
+
+    def update_batch(self, frame_indices, timestamps, blue_near_red, red_near_blue):
+        """
+        `update` für einen ganzen Block (z.B. Ergebnis von `analyze_frame_batch`).
+        """
+        events = []
+        for frame_idx, ts, blue, red in zip(frame_indices, timestamps, blue_near_red, red_near_blue):
+            events.extend(self.update(frame_idx, ts, blue, red))
+        return events
+
+    def in_fight(self, ts, window_seconds):
+        """
+        Liegt `ts` höchstens `window_seconds` nach dem letzten Teamfight-Frame?
+        """
+        return self.last_end_ts is not None and ts - self.last_end_ts <= window_seconds
+
+    def close(self):
+        """
+        Beendet einen noch offenen Fight (Match-Ende).
+        """
+        if self.current is None:
+            return []
+        return [self._end()]
+
+    def _end(self):
+        fight, self.current = self.current, None
+        return {"type": "end", "fight": fight}
+
+
+def track_teamfights(frame_indices, timestamps, blue_near_red, red_near_blue, merge_gap_seconds=TEAMFIGHT_MERGE_GAP_SECONDS):
+    """
+    Alle abgeschlossenen Fights für eine komplette Frame-Folge.
+    """
+    tracker = TeamfightTracker(merge_gap_seconds=merge_gap_seconds)
+    events = tracker.update_batch(frame_indices, timestamps, blue_near_red, red_near_blue)
+    events.extend(tracker.close())
+    return [e["fight"] for e in events if e["type"] == "end"]
@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections.abc import AsyncIterator
+from typing import Any
+
+from backend.engines.frame_sampler import DEFAULT_SAMPLING_MODE, DEFAULT_TARGET_FRAMES
+from backend.engines.match_analyzer import MatchAnalyzer
+from backend.parsers.grid_parser import PositionTensorBuilder
+
+# Seconds between SSE keep-alive comments when no frames arrive
+HEARTBEAT_SECONDS = 15.0
+
+# Per-subscriber backlog; a subscriber that falls this far behind is dropped
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+# Sessions without pushed frames or new subscribers for this long may be evicted
+SESSION_IDLE_SECONDS = 300.0
+
+# Largest frame push body accepted (`LIVE_MAX_BODY_BYTES`)
+MAX_PUSH_BYTES = 8 * 1024 * 1024
+
+
+class LiveSessionLimit(RuntimeError):
+    """Raised when no more live sessions can be opened."""
+
+
+class LiveSessionConflict(RuntimeError):
+    """Raised when a push asks for other sampling settings than its open session uses."""
+
+
+def format_sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+class LiveMatchSession:
+    """Incremental analytics for one in-progress match.
+
+    Every pushed frame is analyzed on its own (a one-frame vectorized block),
+    so the cost per frame is O(1) and independent of how long the match has
+    been running. Per-frame deltas are fanned out to all SSE subscribers.
+
+    `analyze_frames` may run on a worker thread (one batch at a time per
+    session, see `push_frames_async`); publishing to subscribers always
+    happens on the event loop.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        target_frames: int = DEFAULT_TARGET_FRAMES,
+        sampling: str = DEFAULT_SAMPLING_MODE,
+    ):
+        self.session_id = session_id
+        self.target_frames = target_frames
+        self.sampling = sampling
+        self.analyzer = MatchAnalyzer(target_frames=target_frames, sampling=sampling)
+        self.closed = False
+        self.last_active = time.monotonic()
+        self._subscribers: set[asyncio.Queue] = set()
+        self._analyzer_lock = threading.Lock()
+        self._push_lock = asyncio.Lock()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    @staticmethod
+    def check_frame(frame: Any, scratch: PositionTensorBuilder | None = None) -> None:
+        """Raise TypeError or ValueError unless `MatchAnalyzer.add_frame` can read `frame`.
+
+        Player positions are parsed into a throwaway `scratch` builder, so a
+        bad team, player or coordinate fails here rather than mid-analysis.
+        """
+
+        if not isinstance(frame, dict):
+            raise TypeError("frame must be a JSON object")
+        data = frame.get("data", {})
+        series_state = data.get("seriesState", {}) if isinstance(data, dict) else None
+        if not isinstance(series_state, dict):
+            raise TypeError("frame.data.seriesState must be an object")
+        games = series_state.get("games", [])
+        if not isinstance(games, list) or (games and not isinstance(games[0], dict)):
+            raise TypeError("frame.data.seriesState.games must be a list of objects")
+        if not games:
+            return
+        scratch = scratch or PositionTensorBuilder(capacity=1)
+        try:
+            scratch.append(games[0])
+        except (AttributeError, TypeError, ValueError, OverflowError) as e:
+            raise ValueError(
+                f"frame.data.seriesState.games[0] has invalid teams or player positions ({e})"
+            ) from None
+        finally:
+            scratch.reset()
+
+    @classmethod
+    def check_frames(cls, frames: list[Any]) -> None:
+        scratch = PositionTensorBuilder(capacity=1)
+        for i, frame in enumerate(frames):
+            try:
+                cls.check_frame(frame, scratch)
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"frame {i}: {e}") from None
+
+    def analyze_frames(self, frames: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Check every frame first, then analyze them; returns the deltas unpublished.
+
+        An invalid payload raises ValueError and leaves the session untouched.
+        """
+
+        self.check_frames(frames)
+        self.last_active = time.monotonic()
+        deltas = []
+        for frame in frames:
+            with self._analyzer_lock:
+                self.analyzer.add_frame(frame)
+                deltas.extend(self.analyzer.flush())
+        return deltas
+
+    def publish_deltas(self, deltas: list[dict[str, Any]]) -> None:
+        self.last_active = time.monotonic()
+        for delta in deltas:
+            self._publish("frame", delta)
+            for fight_event in delta["teamfight_events"]:
+                self._publish("teamfight", fight_event)
+
+    def push_frames(self, frames: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        deltas = self.analyze_frames(frames)
+        self.publish_deltas(deltas)
+        return deltas
+
+    async def push_frames_async(self, frames: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """`push_frames` with the analysis on a worker thread, keeping the event loop free."""
+
+        async with self._push_lock:
+            deltas = await asyncio.to_thread(self.analyze_frames, frames)
+            self.publish_deltas(deltas)
+            return deltas
+
+    def push_frame(self, frame: dict[str, Any]) -> list[dict[str, Any]]:
+        return self.push_frames([frame])
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._analyzer_lock:
+            return self.analyzer.result()
+
+    def close(self) -> None:
+        self.closed = True
+        with self._analyzer_lock:
+            fight_events = self.analyzer.close_teamfights()
+        for fight_event in fight_events:
+            self._publish("teamfight", fight_event)
+        self._publish("end", {"session_id": self.session_id, "frames": self.analyzer.frame_count})
+
+    def subscribe(self) -> asyncio.Queue:
+        self.last_active = time.monotonic()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    def _publish(self, event: str, data: dict[str, Any]) -> None:
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait((event, data))
+            except asyncio.QueueFull:
+                # Slow consumer: drop it rather than buffering without bound. Its
+                # backlog is replaced by an `end` event, so the stream finishes
+                # and the client can reconnect for a fresh snapshot.
+                self._subscribers.discard(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(("end", {
+                    "session_id": self.session_id,
+                    "frames": self.analyzer.frame_count,
+                    "reason": "lagged",
+                }))
+
+    async def events(self, queue: asyncio.Queue) -> AsyncIterator[str]:
+        """SSE stream: one `snapshot`, then `frame`/`teamfight` events until `end`.
+
+        `end` carries `reason: "lagged"` when this subscriber fell more than
+        SUBSCRIBER_QUEUE_SIZE events behind and was dropped.
+        """
+
+        try:
+            yield format_sse("snapshot", self.snapshot())
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+                except TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(event, data)
+                if event == "end":
+                    break
+        finally:
+            self.unsubscribe(queue)
+
+
+class LiveSessionRegistry:
+    def __init__(self, max_sessions: int | None = None, idle_seconds: float | None = None):
+        self.max_sessions = max_sessions or int(os.environ.get("LIVE_MAX_SESSIONS", "32"))
+        if idle_seconds is None:
+            idle_seconds = float(
+                os.environ.get("LIVE_SESSION_IDLE_SECONDS", str(SESSION_IDLE_SECONDS))
+            )
+        self.idle_seconds = idle_seconds
+        self._sessions: dict[str, LiveMatchSession] = {}
+
+    def get(self, session_id: str) -> LiveMatchSession | None:
+        return self._sessions.get(session_id)
+
+    def get_or_create(
+        self,
+        session_id: str,
+        target_frames: int | None = None,
+        sampling: str | None = None,
+    ) -> LiveMatchSession:
+        """Return the open session or start one; `None` settings mean "as opened" / default."""
+
+        session = self._sessions.get(session_id)
+        if session is not None:
+            if not session.closed:
+                requested = {"target_frames": target_frames, "sampling": sampling}
+                current = {"target_frames": session.target_frames, "sampling": session.sampling}
+                mismatched = [k for k, v in requested.items() if v is not None and v != current[k]]
+                if mismatched:
+                    raise LiveSessionConflict(
+                        f"Live session {session_id} is open with "
+                        + ", ".join(f"{k}={current[k]}" for k in mismatched)
+                    )
+                return session
+            del self._sessions[session_id]
+        if len(self._sessions) >= self.max_sessions:
+            # Reclaim a closed or idle session (least recently active first) before
+            # refusing a new one; sessions still receiving frames are never evicted.
+            now = time.monotonic()
+            reclaimable = [
+                s
+                for s in self._sessions.values()
+                if s.closed or now - s.last_active >= self.idle_seconds
+            ]
+            if not reclaimable:
+                raise LiveSessionLimit(f"Too many live sessions (max {self.max_sessions}).")
+            self.close(min(reclaimable, key=lambda s: (not s.closed, s.last_active)).session_id)
+        session = LiveMatchSession(
+            session_id,
+            target_frames=DEFAULT_TARGET_FRAMES if target_frames is None else target_frames,
+            sampling=DEFAULT_SAMPLING_MODE if sampling is None else sampling,
+        )
+        self._sessions[session_id] = session
+        return session
+
+    def close(self, session_id: str) -> bool:
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+        if not session.closed:
+            session.close()
+        return True
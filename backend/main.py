@@ -1,24 +1,66 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
+import hmac
 import json
+import logging
 import os
-from pathlib import Path
 from typing import List
-from backend.parsers.grid_parser import extract_player_positions
-from backend.engines.risk_calculator import calculate_risk_score, classify_risk_stage
-from backend.engines.spatial_analyzer import calculate_cohesion_score, detect_teamfight, analyze_isolation
-from backend.engines.heatmap_generator import generate_death_heatmap, generate_victory_heatmap
-from backend.engines.pattern_detector import detect_patterns
-from backend.engines.insight_generator import generate_coaching_insights
+from backend.parsers.grid_parser import iter_json_frames
+from backend.engines.match_analyzer import ANALYTICS_VERSION, analyze_frames
+from backend.analytics_cache import AnalyticsCache, hash_stream, make_cache_key
+from backend.engines.frame_sampler import (
+    DEFAULT_SAMPLING_MODE,
+    DEFAULT_TARGET_FRAMES,
+    MIN_TARGET_FRAMES,
+    SamplingMode,
+)
+from backend.analysis_pool import (
+    ANALYSIS_ERRORS,
+    AnalysisExecutor,
+    AnalysisOverloaded,
+    analyze_match_file,
+    shutdown_analysis_pool,
+    spool_upload,
+)
 from backend.engines.validator import validate_model_accuracy
 
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 import io
 import csv
 
-from backend.demo_pack.runtime import DemoPackCorrupted, load_demo_stores
+from backend.demo_pack.responses import FrozenResponse, freeze_json
+from backend.demo_pack.registry import DemoPackRegistry, UnknownDemoPack
+from backend.demo_pack.runtime import (
+    DemoPackCorrupted,
+    DemoStores,
+    deep_integrity_report,
+    demo_pack_manager,
+    load_demo_stores,
+)
+from backend.live import (
+    MAX_PUSH_BYTES,
+    LiveMatchSession,
+    LiveSessionConflict,
+    LiveSessionLimit,
+    LiveSessionRegistry,
+)
+
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Optional hot reload: poll DEMO_PACK_ROOT every N seconds (0 = off)
+    watch_seconds = float(os.environ.get("DEMO_PACK_WATCH_SECONDS", "0"))
+    watcher = asyncio.create_task(demo_pack_manager.watch(watch_seconds)) if watch_seconds > 0 else None
+    yield
+    if watcher is not None:
+        watcher.cancel()
+    shutdown_analysis_pool()
 
-app = FastAPI(title="Macro Health Monitor API")
+
+app = FastAPI(title="Macro Health Monitor API", lifespan=lifespan)
 
 # CORS Setup
 app.add_middleware(
@@ -29,167 +71,94 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Simple in-memory cache
-parsing_cache = {}
+# Content-addressed analytics cache (payload sha256 + analytics version + sampling)
+parsing_cache = AnalyticsCache(
+    max_entries=int(os.environ.get("ANALYTICS_CACHE_MAX_ENTRIES", "128")),
+    max_bytes=int(os.environ.get("ANALYTICS_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+)
 
-# Reusable parsing logic
-async def process_match_data(content: bytes, filename: str = None):
-    # Check cache if filename provided
-    if filename and filename in parsing_cache:
-        return parsing_cache[filename]
-        
-    # Accept either:
-    # - JSONL (one JSON object per line)
-    # - JSON (single object or list of objects)
-    try:
-        decoded = content.decode("utf-8")
-    except UnicodeDecodeError:
-        decoded = content.decode("utf-8", errors="replace")
+# Bounded executor for CPU-bound analysis (admission control + queue-depth metric)
+analysis_executor = AnalysisExecutor()
 
-    frames = []
-    try:
-        parsed = json.loads(decoded)
-        if isinstance(parsed, list):
-            frames = [f for f in parsed if isinstance(f, dict)]
-        elif isinstance(parsed, dict):
-            frames = [parsed]
-    except json.JSONDecodeError:
-        # Fall back to JSONL parsing
-        lines = decoded.splitlines()
-        for line in lines:
-            if not line.strip():
-                continue
-            frames.append(json.loads(line))
-    timeline_data = []
-    cohesion_history = []
-    pattern_history = []
-    teamfight_events = []
-    
-    # We limit to 100 frames for performance in the demo
-    frames = frames[:100]
-    last_series_id = "N/A"
-    
-    for idx, frame in enumerate(frames):
-        series_state = frame.get("data", {}).get("seriesState", {})
-        last_series_id = series_state.get("id", last_series_id)
-        games = series_state.get("games", [])
-        if not games:
-            continue
-        
-        game = games[0]
-        game_time_seconds = idx * 10 # Dummy: 10s per frame
-        game_time = f"{game_time_seconds // 60:02d}:{game_time_seconds % 60:02d}"
-        
-        teams_pos = extract_player_positions(game)
-        
-        # Teamfight detection
-        if detect_teamfight(teams_pos):
-            if not teamfight_events or teamfight_events[-1]["end_time_seconds"] < game_time_seconds - 20:
-                teamfight_events.append({
-                    "start_time": game_time,
-                    "start_time_seconds": game_time_seconds,
-                    "end_time_seconds": game_time_seconds,
-                    "won": idx % 2 == 0 # Mock winner logic
-                })
-            else:
-                teamfight_events[-1]["end_time_seconds"] = game_time_seconds
-        
-        blue_team_pos = teams_pos[0] if len(teams_pos) > 0 else []
-        
-        # Pattern detection
-        patterns = detect_patterns(blue_team_pos, game_time_seconds)
-        for p in patterns:
-            pattern_history.append({
-                "game_time": game_time,
-                "pattern": p
-            })
-            
-        # Mock Gold-Diff development
-        gold_diff = (idx * 50) - 2000 if idx < 50 else (idx * -30) + 2000
-        
-        # Risk calculation
-        game_state = {
-            "gold_diff": gold_diff,
-            "team_objectives": {"towers": 2, "dragons": 1}, 
-            "enemy_objectives": {"towers": 1},
-            "team_vision": 15.5,
-            "enemy_vision": 12.0
-        }
-        risk_score = calculate_risk_score(game_state)
-        
-        timeline_data.append({
-            "game_time": game_time,
-            "gold_diff": gold_diff,
-            "risk_score": risk_score
-        })
-        
-        # Spatial analysis
-        cohesion_blue = calculate_cohesion_score(blue_team_pos)
-        cohesion_history.append({
-            "game_time": game_time,
-            "cohesion_score": cohesion_blue
-        })
-
-    # Final state for heatmaps and alerts (last frame)
-    last_frame = frames[-1] if frames else {}
-    last_series_state = last_frame.get("data", {}).get("seriesState", {})
-    last_series_id = last_series_state.get("id", last_series_id)
-
-    last_games = last_series_state.get("games") or []
-    last_game = last_games[0] if last_games else {}
-    last_teams_pos = extract_player_positions(last_game)
-    
-    final_risk = timeline_data[-1]["risk_score"] if timeline_data else 50
-    stage = classify_risk_stage(final_risk)
-    
-    # Isolation Alerts
-    isolation_alerts_red = analyze_isolation(last_teams_pos[1], last_teams_pos[0]) if len(last_teams_pos) > 1 else []
-    
-    # Insights generation
-    insights = generate_coaching_insights({
-        "cohesion_history": cohesion_history,
-        "risk_score": final_risk,
-        "pattern_history": pattern_history
-    })
-
-    result = {
-        "series_id": last_series_id,
-        "timeline": timeline_data,
-        "risk_score": final_risk,
-        "stage": stage,
-        "cohesion_history": cohesion_history,
-        "pattern_history": pattern_history,
-        "teamfights": teamfight_events,
-        "insights": insights,
-        "is_teamfight": detect_teamfight(last_teams_pos) if len(last_teams_pos) > 1 else False,
-        "isolation_alerts": isolation_alerts_red,
-        "causal_chain": [
-            {"cause": "Bad Spacing", "impact": -15},
-            {"cause": "Gold Deficit", "impact": -5},
-            {"cause": "Vision Loss", "impact": -8}
-        ],
-        "heatmaps": {
-            "deaths": generate_death_heatmap([[12000, 12000], [12500, 12500], [8000, 9000]]),
-            "victories": generate_victory_heatmap([[4000, 4000], [4500, 4500]]),
-            "hotspots": ["Bot River", "Baron Pit"]
-        }
-    }
+# Additional frozen packs under DEMO_PACKS_DIR/<pack_id>, selected with ?pack_id=
+demo_packs = DemoPackRegistry(
+    os.environ.get("DEMO_PACKS_DIR"),
+    max_bytes=int(os.environ.get("DEMO_PACKS_MAX_BYTES", str(512 * 1024 * 1024))),
+)
 
-    # Store in cache
-    if filename:
-        parsing_cache[filename] = result
+# In-progress matches fed frame by frame (SSE live analytics)
+live_sessions = LiveSessionRegistry()
+live_max_body_bytes = int(os.environ.get("LIVE_MAX_BODY_BYTES", str(MAX_PUSH_BYTES)))
 
+# Reusable parsing logic
+def process_match_stream(
+    fileobj,
+    filename: str | None = None,
+    target_frames: int = DEFAULT_TARGET_FRAMES,
+    sampling: str = DEFAULT_SAMPLING_MODE,
+):
+    """Analyze a match upload frame by frame while it is being read.
+
+    Accepts JSONL (one JSON object per line) or JSON (single object or list of
+    objects). Only the frame currently being decoded is held in memory. The
+    whole match is covered; per-frame series are decimated to `target_frames`.
+
+    Results are cached by payload content, never by `filename` (two different
+    uploads named `match.jsonl` must not collide).
+    """
+    key = make_cache_key(hash_stream(fileobj), ANALYTICS_VERSION, sampling, target_frames)
+    cached = parsing_cache.get(key)
+    if cached is not None:
+        return cached
+
+    result = analyze_frames(iter_json_frames(fileobj), target_frames=target_frames, sampling=sampling)
+    parsing_cache.put(key, result)
     return result
 
+
+async def process_match_data(
+    content: bytes,
+    filename: str | None = None,
+    target_frames: int = DEFAULT_TARGET_FRAMES,
+    sampling: str = DEFAULT_SAMPLING_MODE,
+):
+    return process_match_stream(io.BytesIO(content), filename, target_frames, sampling)
+
 @app.get("/api/health")
 async def health_check():
     return {"status": "healthy", "version": "1.0.0"}
 
 
+@app.get("/api/analysis/stats")
+async def analysis_stats():
+    return analysis_executor.stats()
+
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    return parsing_cache.stats()
+
+
+def _demo_stores(pack_id: str | None) -> DemoStores:
+    """The default pack (DEMO_PACK_ROOT), or the registry pack named by `pack_id`."""
+
+    if pack_id is None:
+        return load_demo_stores()
+    try:
+        return demo_packs.get(pack_id)
+    except UnknownDemoPack as e:
+        raise HTTPException(status_code=404, detail=f"{e}. Fix: {e.fix}.")
+
+
+@app.get("/api/demo/packs")
+async def demo_list_packs():
+    return {"packs": demo_packs.available(), "residency": demo_packs.stats()}
+
+
 @app.get("/api/demo/health")
-async def demo_health_check():
+async def demo_health_check(pack_id: str | None = None):
     try:
-        stores = load_demo_stores()
+        stores = _demo_stores(pack_id)
     except DemoPackCorrupted as e:
         raise HTTPException(
             status_code=500,
@@ -206,85 +175,144 @@ async def demo_health_check():
 
 
 @app.get("/api/demo/matches")
-async def demo_list_matches():
+async def demo_list_matches(pack_id: str | None = None):
     try:
-        stores = load_demo_stores()
+        stores = _demo_stores(pack_id)
     except DemoPackCorrupted as e:
         raise HTTPException(status_code=500, detail=f"Demo pack corrupted. {e}. Fix: {e.fix}.")
-    return {"matches": sorted(stores.events_by_match.keys())}
+    return {"matches": stores.match_ids}
 
 
 @app.get("/api/demo/teams")
-async def demo_list_teams():
+async def demo_list_teams(pack_id: str | None = None):
     try:
-        stores = load_demo_stores()
+        stores = _demo_stores(pack_id)
     except DemoPackCorrupted as e:
         raise HTTPException(status_code=500, detail=f"Demo pack corrupted. {e}. Fix: {e.fix}.")
-    team_ids = sorted({t for mid in stores.events_by_match.keys() for t in mid.split("-")[:2]})
-    return {"teams": team_ids}
+    return {"teams": stores.team_ids}
+
+
+def _send_frozen(request: Request, frozen: FrozenResponse) -> Response:
+    """Serve pre-encoded demo JSON with ETag / 304 and optional gzip."""
+
+    headers = {"Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if frozen.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers={**headers, "ETag": frozen.etag})
+    accepts_gzip = "gzip" in request.headers.get("accept-encoding", "").lower()
+    if accepts_gzip and frozen.gzip_body is not None:
+        headers.update({"ETag": frozen.gzip_etag, "Content-Encoding": "gzip"})
+        return Response(frozen.gzip_body, media_type="application/json", headers=headers)
+    return Response(frozen.body, media_type="application/json", headers={**headers, "ETag": frozen.etag})
 
 
 @app.get("/api/demo/show-moments")
-async def demo_show_moments(match_id: str):
+async def demo_show_moments(match_id: str, request: Request, pack_id: str | None = None):
     try:
-        stores = load_demo_stores()
+        stores = _demo_stores(pack_id)
+        key = ("show-moments", match_id)
+        frozen = stores.responses.get(key)
+        if frozen is None:
+            moments = stores.moments_by_match.get(match_id)
+            if moments is None:
+                raise HTTPException(status_code=404, detail=f"Unknown match_id: {match_id}")
+            frozen = stores.responses.put(key, {
+                "match_id": match_id,
+                "moments": [m.model_dump() for m in moments],
+            })
     except DemoPackCorrupted as e:
         raise HTTPException(status_code=500, detail=f"Demo pack corrupted. {e}. Fix: {e.fix}.")
-    moments = stores.moments_by_match.get(match_id)
-    if moments is None:
-        raise HTTPException(status_code=404, detail=f"Unknown match_id: {match_id}")
-    return {
-        "match_id": match_id,
-        "moments": [m.model_dump() for m in moments],
-    }
+    return _send_frozen(request, frozen)
 
 
 @app.get("/api/demo/analyze-moment")
-async def demo_analyze_moment(evidence_id: str):
+async def demo_analyze_moment(evidence_id: str, request: Request, pack_id: str | None = None):
     try:
-        stores = load_demo_stores()
+        stores = _demo_stores(pack_id)
+        key = ("analyze-moment", evidence_id)
+        frozen = stores.responses.get(key)
+        if frozen is None:
+            # Lazy packs decode just this one panel and its match's moments.
+            panel = stores.panels_by_evidence_id.get(evidence_id)
+            if panel is None:
+                # Never echo raw evidence ids into UI-facing errors (coach/judge facing output).
+                raise HTTPException(
+                    status_code=404,
+                    detail="Unknown evidence reference. Fix: rebuild the demo pack or refresh the page.",
+                )
+            moments = stores.moments_referencing(panel.match_id, evidence_id)
+            frozen = stores.responses.put(key, {
+                "panel": panel.model_dump(),
+                "moment_ids": [m.moment_id for m in moments],
+            })
     except DemoPackCorrupted as e:
         raise HTTPException(status_code=500, detail=f"Demo pack corrupted. {e}. Fix: {e.fix}.")
-    panel = stores.panels_by_evidence_id.get(evidence_id)
-    if panel is None:
-        # Never echo raw evidence ids into UI-facing errors (coach/judge facing output).
-        raise HTTPException(
-            status_code=404,
-            detail="Unknown evidence reference. Fix: rebuild the demo pack or refresh the page.",
-        )
-    return {"panel": panel.model_dump()}
+    return _send_frozen(request, frozen)
 
 
 @app.get("/api/demo/scout-team")
-async def demo_scout_team(team_id: str):
+async def demo_scout_team(team_id: str, request: Request, pack_id: str | None = None):
     try:
-        stores = load_demo_stores()
+        stores = _demo_stores(pack_id)
     except DemoPackCorrupted as e:
         raise HTTPException(status_code=500, detail=f"Demo pack corrupted. {e}. Fix: {e.fix}.")
-    patterns = [p for p in stores.patterns if p.team_id == team_id]
-    return {
-        "team_id": team_id,
-        "sample_size": 6,
-        "baseline_note": "Baseline computed within demo dataset only",
-        "patterns": [p.model_dump() for p in patterns],
-    }
+    key = ("scout-team", team_id)
+    frozen = stores.responses.get(key)
+    if frozen is None:
+        payload = {
+            "team_id": team_id,
+            "sample_size": 6,
+            "baseline_note": "Baseline computed within demo dataset only",
+            "patterns": [p.model_dump() for p in stores.patterns_by_team.get(team_id, [])],
+        }
+        # Only known teams are memoized, so arbitrary team_id values cannot grow the cache.
+        frozen = stores.responses.put(key, payload) if team_id in stores.patterns_by_team else freeze_json(payload)
+    return _send_frozen(request, frozen)
+
+
+@app.get("/api/demo/events")
+async def demo_match_events(match_id: str, request: Request, view: str = "all", pack_id: str | None = None):
+    """Events of one match; `view=masked` drops the background removed by observation masking."""
+    if view not in ("all", "masked"):
+        raise HTTPException(status_code=400, detail=f"Unknown view: {view} (allowed: all, masked)")
+    try:
+        stores = _demo_stores(pack_id)
+        key = ("events", match_id, view)
+        frozen = stores.responses.get(key)
+        if frozen is None:
+            if match_id not in stores.events_by_match:
+                raise HTTPException(status_code=404, detail=f"Unknown match_id: {match_id}")
+            events = stores.events_by_match[match_id] if view == "all" else stores.kept_events(match_id)
+            if events is None:
+                raise HTTPException(
+                    status_code=404,
+                    detail="No observation masking bitmap in this pack. Fix: rebuild the demo pack.",
+                )
+            frozen = stores.responses.put(key, {
+                "match_id": match_id,
+                "view": view,
+                "events": [e.model_dump() for e in events],
+            })
+    except DemoPackCorrupted as e:
+        raise HTTPException(status_code=500, detail=f"Demo pack corrupted. {e}. Fix: {e.fix}.")
+    return _send_frozen(request, frozen)
 
 
 @app.get("/api/demo/observation-masking")
-async def demo_observation_masking():
+async def demo_observation_masking(pack_id: str | None = None):
     try:
-        stores = load_demo_stores()
+        stores = _demo_stores(pack_id)
     except DemoPackCorrupted as e:
         raise HTTPException(status_code=500, detail=f"Demo pack corrupted. {e}. Fix: {e.fix}.")
     if stores.observation_masking is None:
         return {"status": "missing", "note": "No observation masking metrics in this pack."}
-    return stores.observation_masking
+    # Per-match bitmaps back /api/demo/events?view=masked; the summary stays small.
+    return {k: v for k, v in stores.observation_masking.items() if k != "kept_bitmaps"}
 
 
 @app.get("/api/demo/benchmarks")
-async def demo_benchmarks():
+async def demo_benchmarks(pack_id: str | None = None):
     try:
-        stores = load_demo_stores()
+        stores = _demo_stores(pack_id)
     except DemoPackCorrupted as e:
         raise HTTPException(status_code=500, detail=f"Demo pack corrupted. {e}. Fix: {e.fix}.")
     if stores.benchmarks is None:
@@ -293,68 +321,57 @@ async def demo_benchmarks():
 
 
 @app.get("/api/demo/integrity")
-async def demo_integrity():
+async def demo_integrity(deep: bool = False, pack_id: str | None = None):
+    """Integrity report for the loaded pack.
+
+    Served from the build-time report while the store files still match its
+    recorded sha256 (checked once, on first use), else computed from the
+    stores. `deep=true` re-verifies every reference and decodes every panel.
+    Both run in a worker thread.
+    """
     try:
-        stores = load_demo_stores()
+        stores = _demo_stores(pack_id)
+        if deep:
+            return await asyncio.to_thread(deep_integrity_report, stores)
+        return await asyncio.to_thread(lambda: stores.integrity_report)
     except DemoPackCorrupted as e:
         raise HTTPException(status_code=500, detail=f"Demo pack corrupted. {e}. Fix: {e.fix}.")
-    broken_refs = 0
-    total_events = sum(len(v) for v in stores.events_by_match.values())
-    total_moments = sum(len(v) for v in stores.moments_by_match.values())
-
-    for match_id, moments in stores.moments_by_match.items():
-        event_ids = {e.evidence_id for e in stores.events_by_match.get(match_id, [])}
-        for m in moments:
-            if m.primary_event_ref not in event_ids:
-                broken_refs += 1
-            for r in m.related_event_refs:
-                if r not in event_ids:
-                    broken_refs += 1
-
-    for p in stores.patterns:
-        for inst in p.instances:
-            for eid in inst.evidence_refs:
-                if eid not in stores.panels_by_evidence_id:
-                    broken_refs += 1
-
-    # Evidence panels must exist for EVERY event (evidence references must never break)
-    for match_id, events in stores.events_by_match.items():
-        for e in events:
-            if e.evidence_id not in stores.panels_by_evidence_id:
-                broken_refs += 1
-
-    match_count = len(stores.events_by_match)
 
-    return {
-        "mode": "demo",
-        "match_count": match_count,
-        "total_events": total_events,
-        "total_moments": total_moments,
-        "total_patterns": len(stores.patterns),
-        "total_evidence_panels": len(stores.panels_by_evidence_id),
-        "broken_refs": broken_refs,
-    }
+
+@app.post("/api/demo/reload")
+async def demo_reload(request: Request):
+    """Admin trigger: load DEMO_PACK_ROOT again and swap it in if it validates.
+
+    Requires `X-Admin-Token` to match `DEMO_ADMIN_TOKEN` (disabled when unset).
+    """
+    token = os.environ.get("DEMO_ADMIN_TOKEN")
+    if not token:
+        raise HTTPException(status_code=403, detail="Demo pack reload is disabled. Fix: set DEMO_ADMIN_TOKEN.")
+    if not hmac.compare_digest(request.headers.get("x-admin-token", "").encode(), token.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token.")
+    try:
+        await asyncio.to_thread(demo_pack_manager.reload)
+    except DemoPackCorrupted as e:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Demo pack reload rejected. {e}. Fix: {e.fix}.",
+        )
+    return demo_pack_manager.status()
 
 
 @app.get("/api/demo/validation")
-async def demo_validation():
+async def demo_validation(pack_id: str | None = None):
     """Return a tiny precomputed validation summary shipped in the demo pack.
 
     This must remain offline + zero-compute at runtime (just frozen JSON).
     """
     try:
-        load_demo_stores()  # validates pack presence + corruption
+        stores = _demo_stores(pack_id)  # validates pack presence + corruption
     except DemoPackCorrupted as e:
         raise HTTPException(status_code=500, detail=f"Demo pack corrupted. {e}. Fix: {e.fix}.")
 
-    pack_root = os.environ.get("DEMO_PACK_ROOT")
-    if not pack_root:
-        raise HTTPException(
-            status_code=500,
-            detail='DEMO_PACK_ROOT is not set. Fix: set DEMO_PACK_ROOT to the extracted demo pack directory.',
-        )
-
-    path = Path(pack_root) / "processed" / "validation_summary.json"
+    # The served pack, which may differ from DEMO_PACK_ROOT's current contents after a reload.
+    path = stores.pack_root / "processed" / "validation_summary.json"
     if not path.exists():
         return {
             "status": "missing",
@@ -367,69 +384,253 @@ async def demo_validation():
         raise HTTPException(status_code=500, detail=f"Validation summary JSON is corrupted: {path}. {e}")
 
 @app.post("/api/parse-match")
-async def parse_match(file: UploadFile = File(...)):
+async def parse_match(
+    file: UploadFile = File(...),
+    sampling: SamplingMode = DEFAULT_SAMPLING_MODE,
+    target_frames: int = Query(DEFAULT_TARGET_FRAMES, ge=MIN_TARGET_FRAMES),
+):
     """
     Endpoint for parsing a single match upload (JSON or JSONL).
     """
+    path = None
     try:
-        content = await file.read()
-        analytics = await process_match_data(content, file.filename)
+        path, digest = await spool_upload(file)
+        key = make_cache_key(digest, ANALYTICS_VERSION, sampling, target_frames)
+        analytics = parsing_cache.get(key)
+        if analytics is None:
+            # CPU-bound work runs off the event loop; /api/health and /api/demo/* stay responsive.
+            analytics = await analysis_executor.run(analyze_match_file, str(path), target_frames, sampling)
+            parsing_cache.put(key, analytics)
         return {"success": True, "analytics": analytics, "series_id": analytics["series_id"]}
+    except AnalysisOverloaded as e:
+        return JSONResponse(
+            status_code=503,
+            content={"success": False, "error": str(e)},
+            headers={"Retry-After": "1"},
+        )
     except Exception as e:
         import traceback
         print(traceback.format_exc())
         return {"success": False, "error": str(e)}
+    finally:
+        if path is not None:
+            path.unlink(missing_ok=True)
+
+def _aggregate_batch(results):
+    # Aggregate statistics across matches (robust against empty cohesion histories)
+    per_match_cohesion = []
+    for r in results:
+        cohesion_history = r.get("cohesion_history", [])
+        if cohesion_history:
+            per_match_cohesion.append(
+                sum(c["cohesion_score"] for c in cohesion_history) / len(cohesion_history)
+            )
+
+    avg_cohesion_all = (sum(per_match_cohesion) / len(per_match_cohesion)) if per_match_cohesion else 0.0
+    total_patterns = sum(len(r['pattern_history']) for r in results)
+    total_teamfights = sum(len(r['teamfights']) for r in results)
+
+    # Validation
+    validation = validate_model_accuracy(results)
+
+    return {
+        "success": True,
+        "count": len(results),
+        "aggregate": {
+            "avg_cohesion": round(avg_cohesion_all, 2),
+            "total_patterns": total_patterns,
+            "total_teamfights": total_teamfights,
+            "risk_trend": "Improving (Based on last 5 matches)",
+            "common_patterns": ["Baron Setup", "Split Push 1-4"],
+            "model_accuracy": validation["accuracy"]
+        },
+        "matches": results,
+        "validation": validation
+    }
+
+
+async def _analyze_uploads(files, target_frames: int, sampling: str):
+    """Yield (upload index, analytics) in completion order.
+
+    Uploads are spooled to temp files and analyzed in the process pool, so a
+    batch uses every core while the event loop stays free for other clients.
+    """
+    spooled = []
+    pending = {}
+    try:
+        for index, file in enumerate(files):
+            path, digest = await spool_upload(file)
+            spooled.append(path)
+            key = make_cache_key(digest, ANALYTICS_VERSION, sampling, target_frames)
+            cached = parsing_cache.get(key)
+            if cached is not None:
+                yield index, cached
+                continue
+            future = asyncio.ensure_future(analysis_executor.run(
+                analyze_match_file, str(path), target_frames, sampling, block=True
+            ))
+            pending[future] = (index, key)
+
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                index, key = pending.pop(future)
+                analytics = future.result()
+                parsing_cache.put(key, analytics)
+                yield index, analytics
+    finally:
+        for future in pending:
+            future.cancel()
+        # Workers that already started keep reading their spooled files.
+        await asyncio.gather(*pending, return_exceptions=True)
+        for path in spooled:
+            path.unlink(missing_ok=True)
+
 
 @app.post("/api/analyze-batch")
-async def analyze_batch(files: List[UploadFile] = File(...)):
+async def analyze_batch(
+    files: List[UploadFile] = File(...),
+    sampling: SamplingMode = DEFAULT_SAMPLING_MODE,
+    target_frames: int = Query(DEFAULT_TARGET_FRAMES, ge=MIN_TARGET_FRAMES),
+    stream: bool = False,
+):
     """
     Endpoint for batch processing multiple match files.
+
+    With `stream=true` the response is NDJSON: one `match` line per file as
+    soon as it finishes, then a final `summary` line with the aggregate.
     """
+    if stream:
+        async def _ndjson():
+            results = {}
+            try:
+                async for index, analytics in _analyze_uploads(files, target_frames, sampling):
+                    results[index] = analytics
+                    yield json.dumps({
+                        "type": "match",
+                        "index": index,
+                        "filename": files[index].filename,
+                        "analytics": analytics,
+                    }) + "\n"
+                if not results:
+                    summary = {"success": False, "error": "No files processed"}
+                else:
+                    summary = _aggregate_batch([results[i] for i in sorted(results)])
+                yield json.dumps({"type": "summary", **summary}) + "\n"
+            except ANALYSIS_ERRORS as e:
+                logger.exception("Batch analysis failed")
+                yield json.dumps({"type": "error", "success": False, "error": str(e)}) + "\n"
+
+        return StreamingResponse(_ndjson(), media_type="application/x-ndjson")
+
     try:
-        results = []
-        for file in files:
-            content = await file.read()
-            analytics = await process_match_data(content, file.filename)
-            results.append(analytics)
-        
+        results = {}
+        async for index, analytics in _analyze_uploads(files, target_frames, sampling):
+            results[index] = analytics
+
         if not results:
             return {"success": False, "error": "No files processed"}
 
-        # Aggregate statistics across matches (robust against empty cohesion histories)
-        per_match_cohesion = []
-        for r in results:
-            cohesion_history = r.get("cohesion_history", [])
-            if cohesion_history:
-                per_match_cohesion.append(
-                    sum(c["cohesion_score"] for c in cohesion_history) / len(cohesion_history)
-                )
-
-        avg_cohesion_all = (sum(per_match_cohesion) / len(per_match_cohesion)) if per_match_cohesion else 0.0
-        total_patterns = sum(len(r['pattern_history']) for r in results)
-        total_teamfights = sum(len(r['teamfights']) for r in results)
-        
-        # Validation
-        validation = validate_model_accuracy(results)
-        
-        return {
-            "success": True,
-            "count": len(results),
-            "aggregate": {
-                "avg_cohesion": round(avg_cohesion_all, 2),
-                "total_patterns": total_patterns,
-                "total_teamfights": total_teamfights,
-                "risk_trend": "Improving (Based on last 5 matches)",
-                "common_patterns": ["Baron Setup", "Split Push 1-4"],
-                "model_accuracy": validation["accuracy"]
-            },
-            "matches": results,
-            "validation": validation
-        }
+        return _aggregate_batch([results[i] for i in sorted(results)])
     except Exception as e:
         import traceback
         print(traceback.format_exc())
         return {"success": False, "error": str(e)}
 
+@app.post("/api/live/{session_id}/frames")
+async def live_push_frames(
+    session_id: str,
+    request: Request,
+    sampling: SamplingMode | None = None,
+    target_frames: int | None = Query(None, ge=MIN_TARGET_FRAMES),
+):
+    """
+    Push one or more frames (JSON object, JSON list or JSONL) of a running match.
+    Subscribers of /api/live/{session_id}/events receive one delta per frame.
+    `sampling`/`target_frames` apply when the session is opened (defaults if
+    omitted); later pushes may only repeat them.
+    """
+    # Read (capped), parse and check the whole body before touching the session.
+    too_large = HTTPException(
+        status_code=413,
+        detail=(
+            f"Frame payload exceeds {live_max_body_bytes} bytes. "
+            "Fix: push fewer frames per request or raise LIVE_MAX_BODY_BYTES"
+        ),
+    )
+    try:
+        content_length = int(request.headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid Content-Length header.")
+    if content_length > live_max_body_bytes:
+        raise too_large
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > live_max_body_bytes:
+            raise too_large
+
+    def parse_frames():
+        frames = list(iter_json_frames(io.BytesIO(body)))
+        LiveMatchSession.check_frames(frames)
+        return frames
+
+    try:
+        frames = await asyncio.to_thread(parse_frames)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid frame payload: {e}")
+
+    try:
+        session = live_sessions.get_or_create(session_id, target_frames=target_frames, sampling=sampling)
+    except LiveSessionLimit as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except LiveSessionConflict as e:
+        raise HTTPException(
+            status_code=409,
+            detail=f"{e}. Fix: push with the same settings or delete the session first.",
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # The analysis runs on a worker thread; deltas are published back on the event loop.
+    deltas = await session.push_frames_async(frames)
+    return {
+        "session_id": session_id,
+        "accepted": len(deltas),
+        "frame_count": session.analyzer.frame_count,
+        "subscribers": session.subscriber_count,
+    }
+
+
+@app.get("/api/live/{session_id}/events")
+async def live_events(session_id: str):
+    """Server-Sent Events: a `snapshot`, then a `frame` delta per pushed frame."""
+    session = live_sessions.get(session_id)
+    if session is None or session.closed:
+        raise HTTPException(status_code=404, detail=f"Unknown live session: {session_id}")
+    queue = session.subscribe()
+    return StreamingResponse(
+        session.events(queue),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/api/live/{session_id}")
+async def live_snapshot(session_id: str):
+    session = live_sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Unknown live session: {session_id}")
+    return {"session_id": session_id, "analytics": session.snapshot()}
+
+
+@app.delete("/api/live/{session_id}")
+async def live_close(session_id: str):
+    if not live_sessions.close(session_id):
+        raise HTTPException(status_code=404, detail=f"Unknown live session: {session_id}")
+    return {"session_id": session_id, "closed": True}
+
+
 @app.get("/api/export-csv")
 async def export_csv():
     """
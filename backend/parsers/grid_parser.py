@@ -1,5 +1,15 @@
+import codecs
 import json
+import math
 import os
+import re
+
+import numpy as np
+
+# Chunk-Größe für das Streaming-Parsing von Uploads (JSON / JSONL)
+STREAM_CHUNK_BYTES = 64 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
 
 def load_grid_data(filepath):
     """
@@ -22,6 +32,87 @@ def load_grid_data(filepath):
     except Exception as e:
         raise Exception(f"Unerwarteter Fehler beim Laden der Daten: {e}")
 
+def iter_json_frames(fileobj, chunk_size=STREAM_CHUNK_BYTES):
+    """
+    Liest Frames inkrementell aus einem binären File-Objekt.
+
+    Unterstützt JSONL (ein Objekt pro Zeile), ein einzelnes JSON-Objekt und
+    ein JSON-Array von Objekten. Es wird immer nur der aktuell unvollständige
+    Frame gepuffert, der Speicherbedarf hängt also nicht von der Dateigröße ab.
+    Nicht-Objekte auf oberster Ebene (bzw. im Array) werden ignoriert.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    buf = ""
+    pos = 0
+    in_array = False
+    eof = False
+    # Erst erneut dekodieren, wenn der Puffer sich seit dem letzten Fehlversuch
+    # verdoppelt hat. Gelesene Chunks werden bis dahin nur gesammelt und dann
+    # einmal angehängt (amortisiert linear auch bei sehr großen Einzel-Frames).
+    retry_at = 0
+    pending = []
+    pending_len = 0
+
+    while True:
+        if not eof and len(buf) - pos + pending_len < retry_at:
+            chunk = fileobj.read(chunk_size)
+            text = text_decoder.decode(chunk, final=not chunk)
+            eof = not chunk
+            if text:
+                pending.append(text)
+                pending_len += len(text)
+            continue
+        if pending:
+            buf = buf[pos:] + "".join(pending)
+            pending = []
+            pending_len = 0
+            pos = 0
+
+        pos = _WHITESPACE.match(buf, pos).end()
+        if pos >= len(buf):
+            if eof:
+                break
+            retry_at = 1
+            continue
+
+        ch = buf[pos]
+        if ch == "\ufeff" and pos == 0:
+            pos += 1
+            continue
+        if not in_array and ch == "[":
+            in_array = True
+            pos += 1
+            continue
+        if in_array and ch == ",":
+            pos += 1
+            continue
+        if in_array and ch == "]":
+            in_array = False
+            pos += 1
+            continue
+
+        try:
+            value, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            retry_at = max(1, 2 * (len(buf) - pos))
+            continue
+        # Ein Skalar am Pufferende (z.B. eine Zahl) kann noch unvollständig sein.
+        if end >= len(buf) and not eof and not isinstance(value, (dict, list)):
+            retry_at = len(buf) - pos + 1
+            continue
+
+        retry_at = 0
+        pos = end
+        if isinstance(value, dict):
+            yield value
+
+    if in_array:
+        raise ValueError("Ungültiges JSON: Array wurde nicht geschlossen.")
+
+
 def extract_player_positions(game_data):
     """
     Extrahiert Spielerpositionen aus einem Game-Snapshot.
@@ -48,6 +139,150 @@ def extract_player_positions(game_data):
     
     return teams_data
 
+class PositionTensor:
+    """
+    Kompakte Match-Positionen: `xy` (frames, teams, players, 2) mit NaN für
+    fehlende Koordinaten, `alive` (frames, teams, players). Spieler-Slots sind
+    pro Team über die Spieler-ID interniert und über das ganze Match stabil.
+    """
+
+    def __init__(self, xy, alive, player_ids, player_names):
+        self.xy = xy
+        self.alive = alive
+        self.player_ids = player_ids
+        self.player_names = player_names
+
+    @property
+    def frame_count(self):
+        return self.xy.shape[0]
+
+    def team_players(self, frame, team):
+        """
+        Spieler eines Teams als Dicts (Format von `extract_player_positions`)
+        für Engines, die noch mit Dicts arbeiten.
+        """
+        if team >= self.xy.shape[1]:
+            return []
+        players = []
+        ids = self.player_ids[team]
+        names = self.player_names[team]
+        for slot, (x, y) in enumerate(self.xy[frame, team].tolist()):
+            if math.isnan(x) or math.isnan(y):
+                continue
+            players.append({
+                "id": ids[slot],
+                "name": names[slot],
+                "x": x,
+                "y": y,
+                "alive": bool(self.alive[frame, team, slot])
+            })
+        return players
+
+    def frame_players(self, frame):
+        return [self.team_players(frame, t) for t in range(self.xy.shape[1])]
+
+
+class PositionTensorBuilder:
+    """
+    Schreibt Game-Snapshots direkt in vorallokierte NumPy-Puffer statt pro
+    Spieler und Frame ein Dict anzulegen. Teams, Spieler-Slots und Frames
+    wachsen bei Bedarf (Verdopplung der Frame-Kapazität).
+    """
+
+    def __init__(self, teams=2, players=5, capacity=64):
+        self._xy = np.full((capacity, teams, players, 2), np.nan)
+        self._alive = np.zeros((capacity, teams, players), dtype=bool)
+        self._slots = [{} for _ in range(teams)]
+        self.player_ids = [[] for _ in range(teams)]
+        self.player_names = [[] for _ in range(teams)]
+        self.frame_count = 0
+
+    def _grow(self, frames=None, teams=None, players=None):
+        f, t, p, _ = self._xy.shape
+        shape = (frames or f, teams or t, players or p)
+        xy = np.full(shape + (2,), np.nan)
+        alive = np.zeros(shape, dtype=bool)
+        xy[:f, :t, :p] = self._xy
+        alive[:f, :t, :p] = self._alive
+        self._xy, self._alive = xy, alive
+        for _ in range(t, shape[1]):
+            self._slots.append({})
+            self.player_ids.append([])
+            self.player_names.append([])
+
+    def _slot(self, team_idx, key, player):
+        slots = self._slots[team_idx]
+        slot = slots.get(key)
+        if slot is None:
+            slot = len(slots)
+            slots[key] = slot
+            player_id = player.get("id")
+            self.player_ids[team_idx].append(None if player_id is None else str(player_id))
+            self.player_names[team_idx].append(player.get("name"))
+            if slot >= self._xy.shape[2]:
+                self._grow(players=self._xy.shape[2] * 2)
+        return slot
+
+    def append(self, game_data):
+        """
+        Fügt einen Game-Snapshot als nächsten Frame hinzu und gibt dessen Index zurück.
+        """
+        idx = self.frame_count
+        if idx >= self._xy.shape[0]:
+            self._grow(frames=self._xy.shape[0] * 2)
+        teams = game_data.get("teams", []) if game_data else []
+        if len(teams) > self._xy.shape[1]:
+            self._grow(teams=len(teams))
+
+        xy = self._xy[idx]
+        alive = self._alive[idx]
+        xy.fill(np.nan)
+        alive.fill(False)
+        for t_idx, team in enumerate(teams):
+            taken = set()
+            for p_idx, p in enumerate(team.get("players", [])):
+                pos = p.get("position")
+                # Nur Spieler mit gültigen Koordinaten extrahieren
+                if not pos or pos.get("x") is None or pos.get("y") is None:
+                    continue
+                player_id = p.get("id")
+                slot = self._slot(t_idx, str(player_id) if player_id is not None else ("#", p_idx), p)
+                # Doppelte Spieler-ID im selben Frame: der erste Eintrag zählt
+                if slot in taken:
+                    continue
+                taken.add(slot)
+                xy = self._xy[idx]
+                alive = self._alive[idx]
+                xy[t_idx, slot, 0] = float(pos["x"])
+                xy[t_idx, slot, 1] = float(pos["y"])
+                alive[t_idx, slot] = bool(p.get("alive", True))
+        self.frame_count += 1
+        return idx
+
+    def build(self):
+        """
+        Tensor über alle bisher angehängten Frames (Views, keine Kopie).
+        """
+        n = self.frame_count
+        return PositionTensor(self._xy[:n], self._alive[:n], self.player_ids, self.player_names)
+
+    def reset(self):
+        """
+        Leert die Frames, behält aber Puffer und Spieler-Slots (für blockweise Analyse).
+        """
+        self.frame_count = 0
+
+
+def extract_position_tensor(games):
+    """
+    Extrahiert die Positionen aller Game-Snapshots eines Matches in einen PositionTensor.
+    """
+    builder = PositionTensorBuilder()
+    for game in games:
+        builder.append(game)
+    return builder.build()
+
+
 def extract_events(game_data):
     """
     Extrahiert Events (Kills, Deaths, Objectives).
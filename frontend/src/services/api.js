@@ -74,6 +74,19 @@ const api = {
     return response.data;
   },
 
+  // Live analytics for an in-progress match (Server-Sent Events).
+  // Returns the EventSource; call .close() to stop listening.
+  subscribeLiveMatch: (sessionId, { onSnapshot, onFrame, onEnd } = {}) => {
+    const source = new EventSource(`/api/live/${encodeURIComponent(sessionId)}/events`);
+    source.addEventListener('snapshot', (e) => onSnapshot && onSnapshot(JSON.parse(e.data)));
+    source.addEventListener('frame', (e) => onFrame && onFrame(JSON.parse(e.data)));
+    source.addEventListener('end', (e) => {
+      source.close();
+      if (onEnd) onEnd(JSON.parse(e.data));
+    });
+    return source;
+  },
+
   analyzeBatch: async (files) => {
     const maxSize = 20 * 1024 * 1024; // 20MB
     for (let i = 0; i < files.length; i++) {
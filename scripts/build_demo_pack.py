@@ -14,15 +14,11 @@ REPO_ROOT = Path(__file__).resolve().parents[1]
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
-from backend.demo_pack.builder import (
-    build_evidence_panels,
-    build_moments,
-    build_patterns,
-    load_demo_match_file,
-    synthesize_events,
-)
+from backend.demo_pack.build_cache import MatchBuildCache, build_matches_cached, match_fingerprint
+from backend.demo_pack.builder import build_patterns
 from backend.demo_pack.metrics import compute_observation_masking
-from backend.demo_pack.io import pack_to_tar_gz, write_stores
+from backend.demo_pack.archive import ARCHIVE_CODECS, ARCHIVE_SUFFIXES, pack_to_archive
+from backend.demo_pack.io import write_stores
 
 
 def _sha256_file(path: Path) -> str:
@@ -103,7 +99,7 @@ def _measure_demo_endpoint_latencies(pack_root: Path) -> dict[str, float]:
     os.environ["DEMO_PACK_ROOT"] = str(pack_root)
     import backend.demo_pack.runtime as runtime
 
-    runtime._CACHED = None
+    runtime.demo_pack_manager.reload(pack_root)
 
     from backend.main import app
 
@@ -164,7 +160,18 @@ def main() -> int:
     ap.add_argument("--source", choices=["auto", "real", "synthetic"], default="auto")
     ap.add_argument("--matches-dir", default=None)
     ap.add_argument("--out", default="artifacts/demo_pack")
-    ap.add_argument("--tar", default="artifacts/demo_pack.tar.gz")
+    ap.add_argument("--tar", default=None, help="Archive path (default: artifacts/demo_pack.tar.gz / .tar.zst)")
+    ap.add_argument("--tar-codec", choices=ARCHIVE_CODECS, default="gzip", help="zstd needs the zstandard package")
+    ap.add_argument("--tar-level", type=int, default=None, help="Compression level (default: gzip 6, zstd 3)")
+    ap.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Per-match build processes and archive compression threads (default: all cores)",
+    )
+    ap.add_argument("--cache-dir", default="artifacts/demo_pack_cache", help="Per-match build cache (one subdir per source)")
+    ap.add_argument("--no-cache", action="store_true", help="Rebuild every match from scratch")
+    ap.add_argument("--columnar", action="store_true", help="Also write memory-mappable .npy events/moments columns")
     args = ap.parse_args()
 
     if args.matches_dir:
@@ -190,7 +197,7 @@ def main() -> int:
                 source = "synthetic"
                 matches_dir = matches_dir_synth
     out_root = Path(args.out)
-    tar_path = Path(args.tar)
+    tar_path = Path(args.tar or f"artifacts/demo_pack{ARCHIVE_SUFFIXES[args.tar_codec]}")
 
     if out_root.exists():
         shutil.rmtree(out_root)
@@ -205,28 +212,31 @@ def main() -> int:
             )
         raise SystemExit(f"Expected 6 matches in {matches_dir}, found {len(match_paths)}")
 
+    # Unchanged matches (same input bytes + builder code) come from the cache;
+    # the rest run in parallel. Results are merged in sorted path order.
+    cache = None if args.no_cache else MatchBuildCache(Path(args.cache_dir) / source)
+    built_matches = build_matches_cached(match_paths, cache, workers=args.workers)
+    if cache is not None:
+        cache.prune({match_fingerprint(mp) for mp in match_paths})
+        print(f"Match build cache: {cache.hits} reused, {cache.misses} rebuilt")
+
     events_by_match = {}
     moments_by_match = {}
+    evidence_panels = {}
     all_moments = []
-
-    for mp in match_paths:
-        match = load_demo_match_file(mp)
-        match_id = match.get("match_id") or mp.stem
+    for mp, built in zip(match_paths, built_matches):
         # copy raw match into pack
-        shutil.copy2(mp, out_root / "matches" / f"{match_id}.json")
-
-        events = synthesize_events(match_id, match)
-        events_by_match[match_id] = events
-        moments = build_moments(match_id, events)
-        moments_by_match[match_id] = moments
-        all_moments.extend(moments)
+        shutil.copy2(mp, out_root / "matches" / f"{built.match_id}.json")
+        events_by_match[built.match_id] = built.events
+        moments_by_match[built.match_id] = built.moments
+        evidence_panels.update(built.panels)
+        all_moments.extend(built.moments)
 
     # team ids are derived from match ids (left/right token)
     team_ids = sorted({t for mid in events_by_match.keys() for t in mid.split("-")[:2]})
     patterns = build_patterns(team_ids=team_ids, all_moments=all_moments)
-    evidence_panels = build_evidence_panels(events_by_match, moments_by_match)
 
-    write_stores(out_root, events_by_match, moments_by_match, patterns, evidence_panels)
+    write_stores(out_root, events_by_match, moments_by_match, patterns, evidence_panels, columnar=args.columnar)
 
     # Validation (tiny manual label set; shipped as frozen JSON)
     labels_path = REPO_ROOT / "data" / "validation_labels.json"
@@ -272,6 +282,8 @@ def main() -> int:
         "patterns_store.json": _sha256_file(out_root / "processed" / "patterns_store.json"),
         "evidence_refs.json": _sha256_file(out_root / "processed" / "evidence_refs.json"),
     }
+    for path in sorted((out_root / "processed" / "columnar").glob("*")):
+        determinism_sha256[f"columnar/{path.name}"] = _sha256_file(path)
     determinism_sha256_combined = hashlib.sha256(
         ("|".join([f"{k}:{v}" for k, v in sorted(determinism_sha256.items())])).encode("utf-8")
     ).hexdigest()
@@ -282,9 +294,11 @@ def main() -> int:
     else:
         endpoint_lat_ms = _deterministic_endpoint_latencies()
         build_ms = 0
+    # Integrity report is precomputed by write_stores
+    integrity = json.loads((out_root / "processed" / "integrity_report.json").read_text(encoding="utf-8"))
     benchmarks = {
         "version": 1,
-        "integrity_ok": True,
+        "integrity_ok": integrity["report"]["broken_refs"] == 0,
         "pack_build_ms": build_ms,
         "endpoint_latencies_ms": endpoint_lat_ms,
         "determinism_sha256": determinism_sha256,
@@ -311,7 +325,7 @@ def main() -> int:
     if verifier_src.exists():
         shutil.copy2(verifier_src, out_root / "verify_integrity.py")
 
-    pack_to_tar_gz(out_root, tar_path)
+    pack_to_archive(out_root, tar_path, codec=args.tar_codec, level=args.tar_level, workers=args.workers)
     print(f"Wrote demo pack: {tar_path}")
     return 0
 
@@ -37,18 +37,12 @@ def _write_demo_matches(out_dir: Path, frames: int) -> None:
         )
 
 
-def _build_pack_to(pack_root: Path, matches_dir: Path) -> None:
+def _build_pack_to(pack_root: Path, matches_dir: Path, workers: int | None = None) -> None:
     repo_root = Path(__file__).resolve().parents[1]
     if str(repo_root) not in sys.path:
         sys.path.insert(0, str(repo_root))
 
-    from backend.demo_pack.builder import (
-        build_evidence_panels,
-        build_moments,
-        build_patterns,
-        load_demo_match_file,
-        synthesize_events,
-    )
+    from backend.demo_pack.builder import build_matches, build_patterns
     from backend.demo_pack.io import write_stores
 
     match_paths = sorted(matches_dir.glob("*.json"))
@@ -57,19 +51,16 @@ def _build_pack_to(pack_root: Path, matches_dir: Path) -> None:
 
     events_by_match = {}
     moments_by_match = {}
+    panels = {}
     all_moments = []
-    for mp in match_paths:
-        match = load_demo_match_file(mp)
-        match_id = match.get("match_id") or mp.stem
-        events = synthesize_events(match_id, match)
-        events_by_match[match_id] = events
-        moments = build_moments(match_id, events)
-        moments_by_match[match_id] = moments
-        all_moments.extend(moments)
+    for built in build_matches(match_paths, workers=workers):
+        events_by_match[built.match_id] = built.events
+        moments_by_match[built.match_id] = built.moments
+        panels.update(built.panels)
+        all_moments.extend(built.moments)
 
     team_ids = sorted({t for mid in events_by_match.keys() for t in mid.split("-")[:2]})
     patterns = build_patterns(team_ids=team_ids, all_moments=all_moments)
-    panels = build_evidence_panels(events_by_match, moments_by_match)
     write_stores(pack_root, events_by_match, moments_by_match, patterns, panels)
 
 
@@ -77,6 +68,7 @@ def main() -> int:
     ap = argparse.ArgumentParser()
     ap.add_argument("--frames", type=int, default=120)
     ap.add_argument("--work-dir", default="artifacts/determinism_check")
+    ap.add_argument("--workers", type=int, default=None, help="Per-match build processes (default: all cores)")
     args = ap.parse_args()
 
     work = Path(args.work_dir)
@@ -88,8 +80,9 @@ def main() -> int:
 
     pack_a = work / "pack_a"
     pack_b = work / "pack_b"
-    _build_pack_to(pack_a, work / "matches")
-    _build_pack_to(pack_b, work / "matches")
+    # Build A serially and B in parallel: the merge order must not leak into the pack.
+    _build_pack_to(pack_a, work / "matches", workers=1)
+    _build_pack_to(pack_b, work / "matches", workers=args.workers)
 
     compare = [
         ("events_store.json", pack_a / "processed" / "events_store.json", pack_b / "processed" / "events_store.json"),
@@ -14,6 +14,24 @@ def _read_json(path: Path) -> dict:
         return json.load(f)
 
 
+def _verify_panel_record(evidence_id: str, panel: dict, events: list, moments: list) -> list[str]:
+    errors = []
+    idx = panel.get("event_index")
+    start = panel.get("context_start")
+    end = panel.get("context_end")
+    if not all(isinstance(v, int) for v in (idx, start, end)):
+        return [f"Panel record {evidence_id} has invalid indices"]
+    if not (0 <= idx < len(events)) or events[idx].get("evidence_id") != evidence_id:
+        errors.append(f"Panel record {evidence_id} points at the wrong event")
+    if not (0 <= start <= end <= len(events)):
+        errors.append(f"Panel record {evidence_id} context range out of bounds")
+    moment_ids = {m.get("moment_id") for m in moments}
+    for mid in panel.get("related_moment_ids", []):
+        if mid not in moment_ids:
+            errors.append(f"Related moment {mid} missing for {evidence_id}")
+    return errors
+
+
 def verify(pack_root: Path) -> dict:
     # This verifier must run from an extracted demo pack without importing repo code.
     matches_dir = pack_root / "matches"
@@ -108,6 +126,10 @@ def verify(pack_root: Path) -> dict:
                 continue
             if panel.get("match_id") != match_id:
                 errors.append(f"Panel match_id mismatch for {evidence_id}")
+            if "context_window" not in panel:
+                # v2 record: references into this match's events/moments
+                errors.extend(_verify_panel_record(evidence_id, panel, events, moments_by_match.get(match_id, [])))
+                continue
             for ctx in panel.get("context_window", []):
                 if ctx.get("match_id") != match_id:
                     errors.append(f"Context window leaked match for {evidence_id}")
@@ -1,8 +1,69 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 
 # Ensure repository root is on sys.path for tests.
 REPO_ROOT = Path(__file__).resolve().parents[1]
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
+
+
+def _write_demo_pack(root: Path, match_ids=("TL-C9-G2",), *, events_per_match: int = 1, columnar: bool = False):
+    # Imported lazily: the repo root is put on sys.path above.
+    from backend.demo_pack.io import write_stores
+    from backend.demo_pack.schemas import DemoEvent, DemoMoment, EvidencePanelRecord
+
+    events = {
+        mid: [
+            DemoEvent(
+                match_id=mid,
+                ts=seq * 10,
+                game_time=f"00:{seq * 10:02d}",
+                event_type="SNAPSHOT",
+                payload={"frame_idx": seq, "label": "Ünïcode"},
+                global_seq=seq,
+                evidence_id=f"{mid}:{seq:06d}",
+            )
+            for seq in range(1, events_per_match + 1)
+        ]
+        for mid in match_ids
+    }
+    moments = {
+        mid: [
+            DemoMoment(
+                match_id=mid,
+                moment_id=f"{mid}:M01",
+                title="Snapshot",
+                description="First snapshot",
+                start_ts=evs[0].ts,
+                end_ts=evs[-1].ts,
+                passes_validity_filter=True,
+                validity_reasons=[],
+                primary_event_ref=evs[0].evidence_id,
+                related_event_refs=[e.evidence_id for e in evs[1:]],
+            )
+        ]
+        for mid, evs in events.items()
+    }
+    panels = {
+        e.evidence_id: EvidencePanelRecord(
+            evidence_id=e.evidence_id, match_id=e.match_id, event_index=i, context_start=i, context_end=i + 1
+        )
+        for evs in events.values()
+        for i, e in enumerate(evs)
+    }
+    write_stores(root, events, moments, [], panels, columnar=columnar)
+    return events, moments
+
+
+@pytest.fixture
+def write_demo_pack():
+    """Writer for minimal valid packs: `write_demo_pack(root, match_ids, events_per_match=, columnar=)`.
+
+    Each match gets `events_per_match` SNAPSHOT events (one evidence panel
+    each) and one moment on its first event. Returns (events, moments).
+    """
+
+    return _write_demo_pack
@@ -17,6 +17,9 @@ def _run_build(tmp_path: Path, *, source: str, matches_dir: Path | None = None)
         str(out_root),
         "--tar",
         str(tar_path),
+        # Keep the per-match build cache out of the repo checkout.
+        "--cache-dir",
+        str(tmp_path / "demo_pack_cache"),
     ]
     if matches_dir is not None:
         cmd.extend(["--matches-dir", str(matches_dir)])
@@ -97,3 +97,28 @@ def test_demo_pack_double_build_is_identical(tmp_path: Path):
         a = _read_json(a_path)
         b = _read_json(b_path)
         assert a == b, f"{name} differs between two builds"
+
+
+def test_parallel_match_build_is_byte_identical_to_serial(tmp_path: Path):
+    from backend.demo_pack.builder import build_matches, build_patterns
+    from backend.demo_pack.io import write_stores
+
+    matches_dir = tmp_path / "demo_matches"
+    _write_demo_matches(matches_dir, frames=60)
+
+    serial = tmp_path / "serial"
+    _build_pack_to(serial, matches_dir)
+
+    built = build_matches(sorted(matches_dir.glob("*.json")), workers=3)
+    team_ids = sorted({t for b in built for t in b.match_id.split("-")[:2]})
+    parallel = tmp_path / "parallel"
+    write_stores(
+        parallel,
+        {b.match_id: b.events for b in built},
+        {b.match_id: b.moments for b in built},
+        build_patterns(team_ids=team_ids, all_moments=[m for b in built for m in b.moments]),
+        {eid: p for b in built for eid, p in b.panels.items()},
+    )
+
+    for name in ("events_store.json", "moments_store.json", "patterns_store.json", "evidence_refs.json"):
+        assert (serial / "processed" / name).read_bytes() == (parallel / "processed" / name).read_bytes(), name
@@ -41,6 +41,23 @@ def test_parse_match_accepts_single_json_file():
     assert payload["analytics"]["series_id"] == "S_JSON"
 
 
+def test_bad_sampling_parameters_are_rejected_with_422():
+    from backend import main
+
+    client = TestClient(main.app)
+    content = json.dumps({"data": {"seriesState": {"id": "S_BAD", "games": []}}}).encode("utf-8")
+    upload = ("match.json", content, "application/json")
+
+    for params in ({"sampling": "bogus"}, {"target_frames": 1}):
+        r = client.post("/api/parse-match", params=params, files={"file": upload})
+        assert r.status_code == 422
+        r = client.post("/api/analyze-batch", params=params, files=[("files", upload)])
+        assert r.status_code == 422
+        r = client.post("/api/live/match-params/frames", params=params, content=content)
+        assert r.status_code == 422
+    assert client.get("/api/live/match-params").status_code == 404
+
+
 def test_parse_match_accepts_jsonl_file_and_uses_last_frame_series_id():
     from backend import main
 
@@ -84,3 +101,163 @@ def test_analyze_batch_does_not_crash_when_match_has_no_games():
     assert payload["count"] == 1
     assert "aggregate" in payload
     assert payload["aggregate"]["avg_cohesion"] == 0.0
+
+
+def test_cache_stats_endpoint_reports_hits_and_misses():
+    from backend import main
+
+    main.parsing_cache.clear()
+    client = TestClient(main.app)
+
+    frame = {"data": {"seriesState": {"id": "S_CACHE", "games": [{"teams": []}]}}}
+    content = json.dumps(frame).encode("utf-8")
+    for name in ("a.json", "b.json"):
+        client.post("/api/parse-match", files={"file": (name, content, "application/json")})
+
+    stats = client.get("/api/cache/stats").json()
+    assert stats["entries"] == 1
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+
+
+def test_analyze_batch_runs_matches_in_pool_and_keeps_upload_order():
+    from backend import main
+
+    main.parsing_cache.clear()
+    client = TestClient(main.app)
+
+    uploads = []
+    for i in range(3):
+        frame = {"data": {"seriesState": {"id": f"B{i}", "games": [{"teams": []}]}}}
+        uploads.append(("files", (f"m{i}.json", json.dumps(frame).encode("utf-8"), "application/json")))
+
+    payload = client.post("/api/analyze-batch", files=uploads).json()
+    assert payload["success"] is True
+    assert [m["series_id"] for m in payload["matches"]] == ["B0", "B1", "B2"]
+
+
+def test_analyze_batch_stream_emits_match_lines_then_summary():
+    from backend import main
+
+    main.parsing_cache.clear()
+    client = TestClient(main.app)
+
+    uploads = []
+    for i in range(2):
+        frame = {"data": {"seriesState": {"id": f"ST{i}", "games": [{"teams": []}]}}}
+        uploads.append(("files", (f"s{i}.json", json.dumps(frame).encode("utf-8"), "application/json")))
+
+    response = client.post("/api/analyze-batch", params={"stream": "true"}, files=uploads)
+    lines = [json.loads(line) for line in response.text.splitlines() if line.strip()]
+
+    assert [line["type"] for line in lines] == ["match", "match", "summary"]
+    assert {line["analytics"]["series_id"] for line in lines[:2]} == {"ST0", "ST1"}
+    assert lines[-1]["success"] is True
+    assert lines[-1]["count"] == 2
+
+
+def test_analysis_stats_endpoint_reports_queue_depth():
+    from backend.main import app
+
+    client = TestClient(app)
+    stats = client.get("/api/analysis/stats").json()
+
+    assert stats["workers"] >= 1
+    assert stats["max_pending"] >= 1
+    assert stats["queue_depth"] == 0
+
+
+def test_live_push_with_an_invalid_frame_applies_nothing():
+    from backend import main
+
+    client = TestClient(main.app)
+    valid = json.dumps({"data": {"seriesState": {"id": "LIVE_BAD", "games": [{"teams": []}]}}})
+
+    r = client.post("/api/live/match-bad/frames", content=valid + "\n{not json")
+    assert r.status_code == 400
+    assert client.get("/api/live/match-bad").status_code == 404
+
+    assert client.post("/api/live/match-bad/frames", content=valid).json()["frame_count"] == 1
+    r = client.post("/api/live/match-bad/frames", content=valid + '\n{"data": {"seriesState": 1}}')
+    assert r.status_code == 400
+    assert len(client.get("/api/live/match-bad").json()["analytics"]["timeline"]) == 1
+    client.delete("/api/live/match-bad")
+
+
+def test_live_push_with_bad_player_data_is_rejected_before_analysis():
+    from backend import main
+
+    client = TestClient(main.app)
+
+    def frame(teams):
+        state = {"id": "LIVE_PLAYERS", "games": [{"teams": teams}]}
+        return json.dumps({"data": {"seriesState": state}})
+
+    good = frame([{"players": [{"id": "p1", "position": {"x": 1, "y": 2}}]}])
+    bad_position = frame([{"players": [{"id": "p1", "position": {"x": "abc", "y": 2}}]}])
+
+    for bad in (bad_position, frame([1]), frame([{"players": [{"position": "x"}]}])):
+        r = client.post("/api/live/match-players/frames", content=good + "\n" + bad)
+        assert r.status_code == 400
+        assert "frame 1" in r.json()["detail"]
+    assert client.get("/api/live/match-players").status_code == 404
+
+    assert client.post("/api/live/match-players/frames", content=good).json()["frame_count"] == 1
+    r = client.post("/api/live/match-players/frames", content=good + "\n" + frame([1]))
+    assert r.status_code == 400
+    assert len(client.get("/api/live/match-players").json()["analytics"]["timeline"]) == 1
+    client.delete("/api/live/match-players")
+
+
+def test_live_push_body_is_capped(monkeypatch):
+    from backend import main
+
+    monkeypatch.setattr(main, "live_max_body_bytes", 64)
+    client = TestClient(main.app)
+    frame = json.dumps({"data": {"seriesState": {"id": "LIVE_BIG", "games": [{"teams": []}]}}})
+
+    r = client.post("/api/live/match-big/frames", content="\n".join([frame] * 3))
+    assert r.status_code == 413
+    assert "Fix:" in r.json()["detail"]
+    assert client.get("/api/live/match-big").status_code == 404
+
+
+def test_live_session_accepts_frames_and_serves_snapshot():
+    from backend import main
+
+    client = TestClient(main.app)
+    frames = [
+        {"data": {"seriesState": {"id": "LIVE_API", "games": [{"teams": []}]}}}
+        for _ in range(3)
+    ]
+    body = "\n".join(json.dumps(f) for f in frames)
+
+    pushed = client.post("/api/live/match-1/frames", content=body).json()
+    assert pushed["accepted"] == 3
+    assert pushed["frame_count"] == 3
+
+    snapshot = client.get("/api/live/match-1").json()
+    assert snapshot["analytics"]["series_id"] == "LIVE_API"
+    assert len(snapshot["analytics"]["timeline"]) == 3
+
+    assert client.delete("/api/live/match-1").json()["closed"] is True
+    assert client.get("/api/live/match-1/events").status_code == 404
+
+
+def test_live_push_with_other_settings_or_a_bad_length_is_rejected():
+    from backend import main
+
+    client = TestClient(main.app)
+    frame = json.dumps({"data": {"seriesState": {"id": "LIVE_CONF", "games": [{"teams": []}]}}})
+
+    r = client.post("/api/live/match-conf/frames", params={"sampling": "stride"}, content=frame)
+    assert r.status_code == 200
+    assert client.post("/api/live/match-conf/frames", content=frame).status_code == 200
+    r = client.post("/api/live/match-conf/frames", params={"sampling": "time"}, content=frame)
+    assert r.status_code == 409
+    r = client.post(
+        "/api/live/match-conf/frames", content=frame, headers={"content-length": "abc"}
+    )
+    assert r.status_code == 400
+    assert len(client.get("/api/live/match-conf").json()["analytics"]["timeline"]) == 2
+    client.delete("/api/live/match-conf")
@@ -80,14 +80,18 @@ def test_demo_endpoints_happy_path(tmp_path, monkeypatch):
             assert ref.startswith(f"{match_id}:")
 
     evidence_id = moments[0]["primary_event_ref"]
-    panel = client.get("/api/demo/analyze-moment", params={"evidence_id": evidence_id}).json()["panel"]
+    analyzed = client.get("/api/demo/analyze-moment", params={"evidence_id": evidence_id}).json()
+    panel = analyzed["panel"]
     assert panel["evidence_id"] == evidence_id
     assert panel["match_id"] == match_id
     assert all(e["match_id"] == match_id for e in panel.get("context_window", []))
+    assert moments[0]["moment_id"] in analyzed["moment_ids"]
 
     scout = client.get("/api/demo/scout-team", params={"team_id": teams[0]}).json()
     assert scout["sample_size"] == 6
     assert len(scout["patterns"]) >= 3
+    assert all(p["team_id"] == teams[0] for p in scout["patterns"])
+    assert client.get("/api/demo/scout-team", params={"team_id": "NOPE"}).json()["patterns"] == []
 
     integrity = client.get("/api/demo/integrity").json()
     assert integrity["broken_refs"] == 0
@@ -152,3 +156,84 @@ def test_demo_flow_is_flake_free_10x(tmp_path, monkeypatch):
         # Step 5: integrity
         integrity = client.get("/api/demo/integrity").json()
         assert integrity["broken_refs"] == 0
+
+
+def test_frozen_demo_responses_use_etags_and_gzip(tmp_path, monkeypatch):
+    pack_root = _build_temp_demo_pack(tmp_path)
+    monkeypatch.setenv("DEMO_PACK_ROOT", str(pack_root))
+
+    import backend.demo_pack.runtime as runtime
+
+    runtime._CACHED = None
+
+    from backend.main import app
+
+    client = TestClient(app)
+    match_id = client.get("/api/demo/matches").json()["matches"][0]
+
+    plain = client.get("/api/demo/show-moments", params={"match_id": match_id}, headers={"Accept-Encoding": "identity"})
+    assert plain.status_code == 200
+    etag = plain.headers["etag"]
+    assert etag.startswith('"') and "content-encoding" not in plain.headers
+
+    again = client.get(
+        "/api/demo/show-moments",
+        params={"match_id": match_id},
+        headers={"If-None-Match": etag, "Accept-Encoding": "identity"},
+    )
+    assert again.status_code == 304
+    assert again.content == b""
+
+    evidence_id = plain.json()["moments"][0]["primary_event_ref"]
+    zipped = client.get(
+        "/api/demo/analyze-moment",
+        params={"evidence_id": evidence_id},
+        headers={"Accept-Encoding": "gzip"},
+    )
+    assert zipped.headers["content-encoding"] == "gzip"
+    assert zipped.headers["etag"].endswith('-gz"')
+    assert zipped.json()["panel"]["evidence_id"] == evidence_id
+    # Both representations validate the same cached resource.
+    revalidate = client.get(
+        "/api/demo/analyze-moment",
+        params={"evidence_id": evidence_id},
+        headers={"If-None-Match": zipped.headers["etag"]},
+    )
+    assert revalidate.status_code == 304
+
+
+def test_masked_event_view_is_served_from_build_time_bitmaps(tmp_path, monkeypatch):
+    from backend.demo_pack.io import write_json
+    from backend.demo_pack.metrics import compute_observation_masking
+    from backend.demo_pack.runtime import read_demo_stores
+
+    pack_root = _build_temp_demo_pack(tmp_path)
+    stores = read_demo_stores(pack_root)
+    events_by_match = {mid: stores.events_by_match[mid] for mid in stores.match_ids}
+    moments_by_match = {mid: stores.moments_by_match[mid] for mid in stores.match_ids}
+    masking = compute_observation_masking(events_by_match, moments_by_match, window_seconds=0)
+    write_json(pack_root / "processed" / "observation_masking.json", masking)
+    monkeypatch.setenv("DEMO_PACK_ROOT", str(pack_root))
+
+    import backend.demo_pack.runtime as runtime
+
+    runtime._CACHED = None
+
+    from backend.main import app
+
+    client = TestClient(app)
+    summary = client.get("/api/demo/observation-masking").json()
+    assert "kept_bitmaps" not in summary
+
+    match_id = "TL-C9-G2"
+    all_events = client.get("/api/demo/events", params={"match_id": match_id}).json()["events"]
+    masked = client.get("/api/demo/events", params={"match_id": match_id, "view": "masked"}).json()["events"]
+    assert len(all_events) == len(events_by_match[match_id])
+    assert 0 < len(masked) < len(all_events)
+    masked_ids = {e["evidence_id"] for e in masked}
+    assert [e for e in all_events if e["evidence_id"] in masked_ids] == masked
+    assert summary["events_after"] == sum(len(runtime._CACHED.kept_events(mid)) for mid in events_by_match)
+
+    assert client.get("/api/demo/events", params={"match_id": match_id, "view": "bogus"}).status_code == 400
+    assert client.get("/api/demo/events", params={"match_id": "NOPE-NOPE-G1"}).status_code == 404
+    runtime._CACHED = None
@@ -102,6 +102,46 @@ def test_integrity_surfaces_missing_evidence_panel(tmp_path, monkeypatch):
     assert payload["broken_refs"] > 0
 
 
+def test_same_size_store_edit_is_not_hidden_by_the_build_report(tmp_path, monkeypatch):
+    pack_root = _build_temp_demo_pack(tmp_path)
+    monkeypatch.setenv("DEMO_PACK_ROOT", str(pack_root))
+
+    # Same-size, in-place edit: point one moment at an evidence id that does not exist.
+    moments_store = pack_root / "processed" / "moments_store.json"
+    raw = moments_store.read_bytes()
+    pos = raw.index(b'"primary_event_ref": "') + len(b'"primary_event_ref": "')
+    moments_store.write_bytes(raw[:pos] + b"XX" + raw[pos + 2:])
+    assert moments_store.stat().st_size == len(raw)
+
+    _reset_demo_runtime_cache()
+
+    from backend.main import app
+
+    client = TestClient(app)
+    assert client.get("/api/demo/integrity").json()["broken_refs"] >= 1
+    deep = client.get("/api/demo/integrity", params={"deep": "true"})
+    assert deep.status_code == 200
+    assert deep.json()["broken_refs"] >= 1
+
+
+def test_unchanged_stores_are_served_the_build_report(tmp_path, monkeypatch):
+    import backend.demo_pack.runtime as runtime
+
+    pack_root = _build_temp_demo_pack(tmp_path)
+    monkeypatch.setenv("DEMO_PACK_ROOT", str(pack_root))
+    _reset_demo_runtime_cache()
+
+    def no_recompute(*args, **kwargs):
+        raise AssertionError("integrity recomputed although the stores are unchanged")
+
+    monkeypatch.setattr(runtime, "compute_integrity_report", no_recompute)
+
+    from backend.main import app
+
+    client = TestClient(app)
+    assert client.get("/api/demo/integrity").json()["broken_refs"] == 0
+
+
 def test_wrong_demo_pack_root_returns_actionable_500(tmp_path, monkeypatch):
     # Point DEMO_PACK_ROOT at a non-existent folder.
     monkeypatch.setenv("DEMO_PACK_ROOT", str(tmp_path / "missing_demo_pack"))
@@ -137,3 +177,28 @@ def test_missing_demo_pack_root_returns_actionable_500(monkeypatch):
     assert "Demo pack corrupted" in detail
     assert "DEMO_PACK_ROOT" in detail
     assert "Fix:" in detail
+
+
+def test_demo_reload_requires_admin_token_and_bumps_generation(tmp_path, monkeypatch):
+    import backend.demo_pack.runtime as runtime
+    from backend.main import app
+
+    pack_root = _build_temp_demo_pack(tmp_path)
+    monkeypatch.setenv("DEMO_PACK_ROOT", str(pack_root))
+    monkeypatch.setattr(runtime, "demo_pack_manager", runtime.DemoPackManager())
+    monkeypatch.setattr("backend.main.demo_pack_manager", runtime.demo_pack_manager)
+    _reset_demo_runtime_cache()
+
+    client = TestClient(app)
+    monkeypatch.delenv("DEMO_ADMIN_TOKEN", raising=False)
+    assert client.post("/api/demo/reload").status_code == 403
+
+    monkeypatch.setenv("DEMO_ADMIN_TOKEN", "s3cret")
+    assert client.post("/api/demo/reload", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+    r1 = client.post("/api/demo/reload", headers={"X-Admin-Token": "s3cret"})
+    r2 = client.post("/api/demo/reload", headers={"X-Admin-Token": "s3cret"})
+    assert r1.status_code == 200 and r2.status_code == 200
+    assert r2.json()["generation"] == r1.json()["generation"] + 1
+    assert client.get("/api/demo/matches").status_code == 200
+    _reset_demo_runtime_cache()
@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+import pytest
+
+from backend.analysis_pool import AnalysisExecutor, AnalysisOverloaded
+
+
+def test_executor_rejects_beyond_max_pending_and_reports_depth():
+    executor = AnalysisExecutor(max_pending=1)
+
+    async def scenario():
+        first = asyncio.ensure_future(executor.run(time.sleep, 0.3))
+        await asyncio.sleep(0)
+        assert executor.stats()["in_flight"] == 1
+        with pytest.raises(AnalysisOverloaded):
+            await executor.run(time.sleep, 0)
+        await first
+
+    asyncio.run(scenario())
+    stats = executor.stats()
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 1
+    assert stats["in_flight"] == 0
+
+
+def test_executor_blocking_submissions_wait_for_a_slot():
+    executor = AnalysisExecutor(max_pending=1)
+
+    async def scenario():
+        return await asyncio.gather(*(executor.run(abs, -i, block=True) for i in range(4)))
+
+    assert asyncio.run(scenario()) == [0, 1, 2, 3]
+    assert executor.stats()["rejected"] == 0
+
+
+def test_queue_depth_counts_callers_waiting_for_admission(monkeypatch):
+    monkeypatch.setenv("ANALYSIS_WORKERS", "1")
+    executor = AnalysisExecutor(max_pending=1)
+
+    async def scenario():
+        jobs = [asyncio.ensure_future(executor.run(abs, -i, block=True)) for i in range(3)]
+        await asyncio.sleep(0)
+        stats = executor.stats()
+        await asyncio.gather(*jobs)
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert (stats["in_flight"], stats["waiting"], stats["queue_depth"]) == (1, 2, 2)
+    assert executor.stats()["waiting"] == 0
+
+
+def test_cancelled_run_holds_its_slot_until_the_worker_finishes():
+    executor = AnalysisExecutor(max_pending=1)
+
+    async def scenario():
+        started = time.monotonic()
+        job = asyncio.ensure_future(executor.run(time.sleep, 0.6))
+        await asyncio.sleep(0.3)
+        job.cancel()
+        await asyncio.gather(job, return_exceptions=True)
+        return time.monotonic() - started
+
+    assert asyncio.run(scenario()) >= 0.6
+    assert executor.stats()["in_flight"] == 0
@@ -2,15 +2,11 @@ import asyncio
 import json
 
 
-def test_process_match_data_caches_by_filename():
-    from backend import main
-
-    main.parsing_cache.clear()
-
-    frame_1 = {
+def _frame(series_id):
+    return {
         "data": {
             "seriesState": {
-                "id": "S1",
+                "id": series_id,
                 "games": [
                     {
                         "teams": []
@@ -20,25 +16,55 @@ def test_process_match_data_caches_by_filename():
         }
     }
 
-    frame_2 = {
-        "data": {
-            "seriesState": {
-                "id": "S2",
-                "games": [
-                    {
-                        "teams": []
-                    }
-                ]
-            }
-        }
-    }
 
-    content_1 = (json.dumps(frame_1) + "\n").encode("utf-8")
-    content_2 = (json.dumps(frame_2) + "\n").encode("utf-8")
+def test_process_match_data_caches_by_content_not_filename():
+    from backend import main
+
+    main.parsing_cache.clear()
+
+    content_1 = (json.dumps(_frame("S1")) + "\n").encode("utf-8")
+    content_2 = (json.dumps(_frame("S2")) + "\n").encode("utf-8")
 
     result_1 = asyncio.run(main.process_match_data(content_1, filename="match.jsonl"))
     result_2 = asyncio.run(main.process_match_data(content_2, filename="match.jsonl"))
+    result_3 = asyncio.run(main.process_match_data(content_1, filename="other.jsonl"))
 
     assert result_1["series_id"] == "S1"
-    assert result_2 is result_1
-    assert main.parsing_cache["match.jsonl"] is result_1
+    assert result_2["series_id"] == "S2"
+    assert result_3 is result_1
+
+    stats = main.parsing_cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["entries"] == 2
+
+
+def test_process_match_data_cache_key_includes_sampling():
+    from backend import main
+
+    main.parsing_cache.clear()
+    content = (json.dumps(_frame("S1")) + "\n").encode("utf-8")
+
+    a = asyncio.run(main.process_match_data(content, sampling="stride"))
+    b = asyncio.run(main.process_match_data(content, sampling="time"))
+
+    assert a is not b
+    assert b["sampling"]["mode"] == "time"
+
+
+def test_analytics_cache_evicts_lru_by_entries_and_bytes():
+    from backend.analytics_cache import AnalyticsCache
+
+    cache = AnalyticsCache(max_entries=2, max_bytes=10_000)
+    cache.put("a", {"v": 1})
+    cache.put("b", {"v": 2})
+    assert cache.get("a") == {"v": 1}
+    cache.put("c", {"v": 3})
+
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache
+    assert cache.stats()["evictions"] == 1
+
+    cache.put("big", {"v": "x" * 9_990})
+    assert cache.stats()["bytes"] <= 10_000
+    assert "a" not in cache
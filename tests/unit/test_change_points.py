@@ -0,0 +1,44 @@
+import numpy as np
+
+from backend.engines.change_points import detect_change_points, frame_features, mean_shift_scores
+
+
+def _features(**series):
+    return {name: np.asarray(values, dtype=float) for name, values in series.items()}
+
+
+def test_step_is_detected_at_first_frame_of_new_level():
+    cohesion = [80.0] * 30 + [40.0] * 30
+    noise = [1.0, 2.0] * 30
+    cps = detect_change_points([i * 10 for i in range(60)], _features(cohesion_blue=cohesion, noise=noise))
+    assert [(cp["frame"], cp["ts"], cp["driver"], cp["direction"]) for cp in cps] == [(30, 300, "cohesion_blue", "down")]
+    assert cps[0]["magnitude"] > 3.0
+
+
+def test_constant_series_have_no_change_points():
+    scores, _drivers, _shifts = mean_shift_scores(_features(a=[5.0] * 40, b=[1.0] * 40))
+    assert not scores.any()
+    assert detect_change_points(range(40), _features(a=[5.0] * 40)) == []
+
+
+def test_close_change_points_keep_the_stronger_one():
+    # Zweistufiger Anstieg: Scores steigen bis Frame 33 und fallen danach
+    series = [0.0] * 30 + [10.0] * 3 + [30.0] * 30
+    cps = detect_change_points(range(63), _features(a=series), threshold=2.0, min_distance=6)
+    assert [cp["frame"] for cp in cps] == [33]
+    cps = detect_change_points(range(63), _features(a=series), threshold=2.0, min_distance=2)
+    assert [cp["frame"] for cp in cps] == [31, 33]
+
+
+def test_teams_converging_shift_the_position_features():
+    frames = 40
+    positions = np.zeros((frames, 2, 5, 2))
+    positions[:, 0, :, 0] = np.arange(5) * 100.0
+    positions[:, 1, :, 0] = np.arange(5) * 100.0 + 8000.0
+    positions[20:, 1, :, 0] -= 7500.0  # Red läuft ab Frame 20 in Blue hinein
+    features = frame_features(positions)
+    assert features["team_distance"][0] == 8000.0 and features["team_distance"][-1] == 500.0
+    assert features["blue_near_red"][-1] == 5
+
+    cps = detect_change_points([i * 10 for i in range(frames)], features)
+    assert [cp["frame"] for cp in cps] == [20]
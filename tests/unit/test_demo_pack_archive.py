@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import gzip
+import io
+import random
+import tarfile
+from pathlib import Path
+
+import pytest
+
+from backend.demo_pack.archive import BlockCompressor, pack_to_archive
+
+
+def _payload(size: int) -> bytes:
+    # Compressible but not trivial: repeated words with random picks.
+    rng = random.Random(7)
+    words = [b"teamfight", b"baron", b"dragon", b"ward", b"gank", b"recall", b"0", b"1", b"{", b"}"]
+    out = bytearray()
+    while len(out) < size:
+        out += rng.choice(words) + b" "
+    return bytes(out[:size])
+
+
+def _compress(data: bytes, **kwargs) -> bytes:
+    out = io.BytesIO()
+    with BlockCompressor(out, **kwargs) as c:
+        # Uneven writes, so blocks are cut across write boundaries.
+        for i in range(0, len(data), 3001):
+            c.write(data[i : i + 3001])
+    return out.getvalue()
+
+
+@pytest.mark.parametrize("size", [0, 1, 4096, 50_000])
+def test_gzip_blocks_round_trip_and_ignore_worker_count(size: int) -> None:
+    data = _payload(size)
+    single = _compress(data, workers=1, block_size=4096)
+    parallel = _compress(data, workers=4, block_size=4096)
+
+    assert single == parallel
+    assert gzip.decompress(single) == data
+    assert single[4:8] == b"\x00\x00\x00\x00"  # mtime 0
+
+
+def test_pack_to_archive_is_deterministic_and_readable(tmp_path: Path, write_demo_pack) -> None:
+    pack_root = tmp_path / "pack"
+    write_demo_pack(pack_root, ["TL-C9-G2", "C9-100-G1"], events_per_match=50, columnar=True)
+
+    out1 = tmp_path / "out1.tar.gz"
+    out2 = tmp_path / "out2.tar.gz"
+    pack_to_archive(pack_root, out1, workers=1)
+    pack_to_archive(pack_root, out2, workers=3)
+
+    assert out1.read_bytes() == out2.read_bytes()
+    assert not list(tmp_path.glob(".*.tmp"))
+
+    with tarfile.open(out1, "r:gz") as tar:
+        members = tar.getmembers()
+        names = [m.name for m in members]
+        # Depth-first, siblings sorted by name: parents always precede their children.
+        assert names == sorted(names, key=lambda n: n.split("/"))
+        assert set(names) == {"demo_pack"} | {f"demo_pack/{p.relative_to(pack_root).as_posix()}" for p in pack_root.rglob("*")}
+        assert "demo_pack/processed/columnar/manifest.json" in names
+        assert {(m.mtime, m.uid, m.gid, m.uname, m.gname) for m in members} == {(0, 0, 0, "", "")}
+        extracted = tar.extractfile("demo_pack/processed/events_store.json")
+        assert extracted is not None
+        assert extracted.read() == (pack_root / "processed" / "events_store.json").read_bytes()
+
+
+def test_level_changes_bytes_but_not_contents() -> None:
+    data = _payload(100_000)
+    fast = _compress(data, level=1, workers=2, block_size=8192)
+    best = _compress(data, level=9, workers=2, block_size=8192)
+
+    assert fast != best
+    assert gzip.decompress(fast) == gzip.decompress(best) == data
+
+
+def test_unknown_codec_is_rejected() -> None:
+    with pytest.raises(ValueError, match="Unknown archive codec"):
+        BlockCompressor(io.BytesIO(), codec="bz2")
+
+
+def test_zstd_frames_round_trip_and_ignore_worker_count() -> None:
+    zstandard = pytest.importorskip("zstandard")
+    data = _payload(50_000)
+    single = _compress(data, codec="zstd", workers=1, block_size=4096)
+    parallel = _compress(data, codec="zstd", workers=4, block_size=4096)
+
+    assert single == parallel
+    reader = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(single), read_across_frames=True)
+    assert reader.read() == data
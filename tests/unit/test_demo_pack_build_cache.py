@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from backend.demo_pack.build_cache import MatchBuildCache, build_matches_cached, match_fingerprint
+from backend.demo_pack.builder import build_match
+
+
+def _write_matches(matches_dir: Path) -> list[Path]:
+    from scripts.generate_demo_matches import _load_base_snapshot, make_demo_match
+
+    base = _load_base_snapshot(Path("data/raw/real_data.json"))
+    matches_dir.mkdir(parents=True)
+    paths = []
+    for idx, mid in enumerate(["TL-C9-G2", "C9-100-G1"]):
+        path = matches_dir / f"{mid}.json"
+        path.write_text(json.dumps(make_demo_match(base, mid, idx, frames=30)), encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def test_unchanged_matches_are_reused_and_changed_ones_rebuilt(tmp_path: Path):
+    paths = _write_matches(tmp_path / "matches")
+    cache = MatchBuildCache(tmp_path / "cache")
+
+    first = build_matches_cached(paths, cache, workers=1)
+    assert (cache.hits, cache.misses) == (0, 2)
+
+    cache = MatchBuildCache(tmp_path / "cache")
+    second = build_matches_cached(paths, cache, workers=1)
+    assert (cache.hits, cache.misses) == (2, 0)
+    assert second == first
+
+    match = json.loads(paths[1].read_text(encoding="utf-8"))
+    match["frames"] = match["frames"][:10]
+    paths[1].write_text(json.dumps(match), encoding="utf-8")
+
+    cache = MatchBuildCache(tmp_path / "cache")
+    third = build_matches_cached(paths, cache, workers=1)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert third[0] == first[0]
+    assert third[1] == build_match(paths[1])
+
+
+def test_corrupt_entry_is_rebuilt_and_prune_drops_stale_entries(tmp_path: Path):
+    paths = _write_matches(tmp_path / "matches")
+    cache = MatchBuildCache(tmp_path / "cache")
+    build_matches_cached(paths, cache, workers=1)
+
+    key = match_fingerprint(paths[0])
+    (tmp_path / "cache" / f"{key}.json").write_text("{ truncated", encoding="utf-8")
+    assert cache.get(key) is None
+
+    assert cache.prune({key}) == 1
+    assert [p.stem for p in (tmp_path / "cache").glob("*.json")] == [key]
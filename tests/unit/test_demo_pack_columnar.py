@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from backend.demo_pack.builder import build_moments, synthesize_events
+from backend.demo_pack.columnar import encode_columnar
+from backend.demo_pack.io import load_stores, write_stores
+from backend.demo_pack.runtime import DemoPackCorrupted, read_demo_stores
+
+
+def _stores() -> tuple[dict, dict]:
+    base = json.loads(Path("data/raw/real_data.json").read_text(encoding="utf-8"))
+    events, moments = {}, {}
+    for mid in ("TL-C9-G2", "C9-100-G1"):
+        events[mid] = synthesize_events(mid, {"match_id": mid, "data": base})
+        moments[mid] = build_moments(mid, events[mid])
+    return events, moments
+
+
+def _write(root: Path, columnar: bool = True) -> tuple[dict, dict]:
+    events, moments = _stores()
+    write_stores(root, events, moments, [], {}, columnar=columnar)
+    return events, moments
+
+
+def test_columnar_stores_decode_to_the_json_stores(tmp_path: Path):
+    _write(tmp_path)
+    stores = read_demo_stores(tmp_path)
+    events, moments, _patterns, _panels = load_stores(tmp_path)
+
+    assert stores.match_ids == sorted(events)
+    for mid in events:
+        assert stores.events_by_match[mid] == events[mid]
+        assert stores.moments_by_match[mid] == moments[mid]
+    # Columns are memory-mapped, not read into memory.
+    assert isinstance(np.load(tmp_path / "processed" / "columnar" / "events.ts.npy", mmap_mode="r"), np.memmap)
+    assert stores.events_by_match.decoded_count == len(events)
+
+
+def test_columnar_bytes_are_deterministic():
+    events, moments = _stores()
+    sizes = {"events_store.json": 1, "moments_store.json": 2}
+    assert encode_columnar(events, moments, "build", sizes) == encode_columnar(
+        dict(reversed(events.items())), moments, "build", sizes
+    )
+
+
+def test_stale_or_disabled_columnar_files_fall_back_to_json(tmp_path: Path):
+    events, _moments = _write(tmp_path)
+    store = tmp_path / "processed" / "events_store.json"
+    raw = json.loads(store.read_text(encoding="utf-8"))
+    raw["matches"]["TL-C9-G2"] = raw["matches"]["TL-C9-G2"][:1]
+    store.write_text(json.dumps(raw), encoding="utf-8")
+    assert len(read_demo_stores(tmp_path).events_by_match["TL-C9-G2"]) == 1
+
+    _write(tmp_path, columnar=False)
+    assert not (tmp_path / "processed" / "columnar").exists()
+    assert read_demo_stores(tmp_path).events_by_match["TL-C9-G2"] == events["TL-C9-G2"]
+
+
+def test_columns_of_another_build_are_not_served(tmp_path: Path):
+    _write(tmp_path / "a")
+    events, moments = _stores()
+    for e in events["TL-C9-G2"]:
+        e.event_type = e.event_type.replace("SNAPSHOT", "SNAPSHOX")  # same store size
+    write_stores(tmp_path / "b", events, moments, [], {})
+    for path in (tmp_path / "b" / "processed").glob("*.json"):
+        shutil.copy(path, tmp_path / "a" / "processed" / path.name)
+    assert (tmp_path / "a" / "processed" / "columnar" / "manifest.json").exists()
+
+    stores = read_demo_stores(tmp_path / "a")
+    assert "SNAPSHOX" in [e.event_type for e in stores.events_by_match["TL-C9-G2"]]
+
+
+def test_columnar_load_hashes_nothing(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    _write(tmp_path)
+
+    def no_hashing(*args, **kwargs):
+        raise AssertionError("store files hashed on load")
+
+    monkeypatch.setattr(hashlib, "sha256", no_hashing)
+    stores = read_demo_stores(tmp_path)
+    assert stores.events_by_match["TL-C9-G2"]
+    assert stores.events_by_match._source == tmp_path / "processed" / "columnar"
+
+
+def test_out_of_range_string_code_is_reported_as_corruption(tmp_path: Path):
+    _write(tmp_path)
+    column = tmp_path / "processed" / "columnar" / "events.event_type.npy"
+    codes = np.load(column)
+    codes[0] = 10**6
+    with column.open("r+b") as f:  # same size, so the manifest still matches
+        np.save(f, codes)
+    stores = read_demo_stores(tmp_path)
+    with pytest.raises(DemoPackCorrupted):
+        stores.events_by_match[stores.match_ids[0]]
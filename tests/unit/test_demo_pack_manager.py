@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from backend.demo_pack import runtime
+from backend.demo_pack.io import store_digests
+from backend.demo_pack.runtime import DemoPackCorrupted, DemoPackManager, load_demo_stores
+
+
+@pytest.fixture
+def manager(monkeypatch, tmp_path):
+    monkeypatch.setenv("DEMO_PACK_ROOT", str(tmp_path))
+    manager = DemoPackManager()
+    monkeypatch.setattr(runtime, "demo_pack_manager", manager)
+    runtime._CACHED = None
+    yield manager
+    runtime._CACHED = None
+
+
+def test_reload_swaps_pack_while_old_snapshot_keeps_working(manager, tmp_path, write_demo_pack):
+    write_demo_pack(tmp_path, ["TL-C9-G2"])
+    old = load_demo_stores()
+    assert manager.generation == 1
+
+    write_demo_pack(tmp_path, ["C9-100-G1", "TL-100-G1"])
+    new = manager.reload()
+
+    assert load_demo_stores() is new
+    assert new.match_ids == ["C9-100-G1", "TL-100-G1"]
+    assert manager.generation == 2
+    # In-flight readers of the old snapshot still decode from their mapping.
+    assert old.panels_by_evidence_id["TL-C9-G2:000001"].event.match_id == "TL-C9-G2"
+
+
+def test_invalid_pack_is_rejected_and_old_one_keeps_serving(manager, tmp_path, write_demo_pack):
+    write_demo_pack(tmp_path, ["TL-C9-G2"])
+    old = load_demo_stores()
+
+    write_demo_pack(tmp_path, ["C9-100-G1"])
+    refs = tmp_path / "processed" / "evidence_refs.json"
+    raw = json.loads(refs.read_text(encoding="utf-8"))
+    raw["panels"] = {}
+    refs.write_text(json.dumps(raw), encoding="utf-8")
+
+    with pytest.raises(DemoPackCorrupted):
+        manager.reload()
+    assert load_demo_stores() is old
+    assert "broken references" in manager.status()["last_error"]
+
+
+def _break_panels_behind_a_clean_report(pack_root) -> None:
+    processed = pack_root / "processed"
+    refs = processed / "evidence_refs.json"
+    raw = json.loads(refs.read_text(encoding="utf-8"))
+    raw["panels"] = {}
+    refs.write_text(json.dumps(raw), encoding="utf-8")
+    # The shipped report still claims a clean pack, with digests of the broken files.
+    report_path = processed / "integrity_report.json"
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    report["store_sha256"] = store_digests([processed / name for name in report["store_sha256"]])
+    report_path.write_text(json.dumps(report), encoding="utf-8")
+
+
+def test_reload_verifies_the_stores_not_the_shipped_report(manager, tmp_path, write_demo_pack):
+    write_demo_pack(tmp_path, ["TL-C9-G2"])
+    old = load_demo_stores()
+
+    write_demo_pack(tmp_path, ["C9-100-G1"])
+    _break_panels_behind_a_clean_report(tmp_path)
+
+    with pytest.raises(DemoPackCorrupted, match="broken references"):
+        manager.reload()
+    assert load_demo_stores() is old
+
+
+def test_watcher_does_not_reread_a_rejected_pack(manager, tmp_path, write_demo_pack, monkeypatch):
+    write_demo_pack(tmp_path, ["TL-C9-G2"])
+    load_demo_stores()
+    write_demo_pack(tmp_path, ["C9-100-G1"])
+    _break_panels_behind_a_clean_report(tmp_path)
+    assert manager.check_for_update() is False
+    with pytest.raises(DemoPackCorrupted):
+        manager.check_for_update()
+
+    reads = []
+    read = runtime.read_demo_stores
+    monkeypatch.setattr(runtime, "read_demo_stores", lambda root: reads.append(root) or read(root))
+    assert manager.check_for_update() is False
+    assert manager.check_for_update() is False
+    assert reads == []
+
+    write_demo_pack(tmp_path, ["TL-100-G1"])
+    assert manager.check_for_update() is False
+    assert manager.check_for_update() is True
+    assert load_demo_stores().match_ids == ["TL-100-G1"]
+    assert manager.last_error is None
+
+
+def test_watcher_waits_for_files_to_settle(manager, tmp_path, write_demo_pack):
+    write_demo_pack(tmp_path, ["TL-C9-G2"])
+    load_demo_stores()
+    assert manager.check_for_update() is False
+
+    write_demo_pack(tmp_path, ["C9-100-G1"])
+    assert manager.check_for_update() is False  # first sighting of the change
+    assert manager.check_for_update() is True
+    assert load_demo_stores().match_ids == ["C9-100-G1"]
+
+
+def test_watcher_survives_unexpected_errors(manager, tmp_path, write_demo_pack, monkeypatch):
+    write_demo_pack(tmp_path, ["TL-C9-G2"])
+    load_demo_stores()
+    calls = []
+
+    def flaky_check() -> bool:
+        calls.append(len(calls))
+        if len(calls) == 1:
+            raise OSError("store file vanished mid-rebuild")
+        return False
+
+    monkeypatch.setattr(manager, "check_for_update", flaky_check)
+
+    async def run() -> None:
+        task = asyncio.create_task(manager.watch(0.001))
+        while len(calls) < 3 and not task.done():
+            await asyncio.sleep(0.001)
+        assert not task.done()
+        task.cancel()
+
+    asyncio.run(run())
+    assert len(calls) >= 3
+    assert manager.last_error == "Demo pack reload failed: OSError: store file vanished mid-rebuild"
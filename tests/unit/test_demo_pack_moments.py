@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from backend.demo_pack.builder import build_moments, fight_segments, synthesize_events
+from backend.demo_pack.determinism import format_game_time, make_evidence_id
+from backend.demo_pack.schemas import DemoEvent
+
+MATCH_ID = "TL-C9-G2"
+
+
+def _events(spec: list[tuple[int, str]], magnitudes: dict[int, float] | None = None) -> list[DemoEvent]:
+    magnitudes = magnitudes or {}
+    return [
+        DemoEvent(
+            match_id=MATCH_ID,
+            ts=ts,
+            game_time=format_game_time(ts),
+            event_type=event_type,
+            payload={"score": i, "magnitude": magnitudes.get(i, 0.0)},
+            global_seq=i,
+            evidence_id=make_evidence_id(MATCH_ID, i),
+        )
+        for i, (ts, event_type) in enumerate(spec, start=1)
+    ]
+
+
+def _refs(moments) -> list[str]:
+    return [m.primary_event_ref.split(":")[1] for m in moments]
+
+
+def test_default_selection_is_chronological_with_spacing():
+    events = _events([(0, "TEAMFIGHT"), (30, "PATTERN"), (120, "PATTERN"), (600, "TEAMFIGHT"), (900, "SNAPSHOT")])
+    moments = build_moments(MATCH_ID, events)
+    assert _refs(moments) == ["000001", "000003", "000004"]
+    assert all(m.validity_reasons[0].startswith("Selected from") for m in moments)
+
+
+def test_fallback_snapshots_respect_spacing_to_every_selected_moment():
+    events = _events([(0, "TEAMFIGHT"), (60, "SNAPSHOT"), (300, "SNAPSHOT"), (500, "TEAMFIGHT")])
+    moments = build_moments(MATCH_ID, events)
+    # The snapshot at 60s is within 90s of the teamfight at 0s.
+    assert _refs(moments) == ["000001", "000003", "000004"]
+    assert moments[1].validity_reasons[0] == "Selected as fallback"
+
+
+def test_ranked_top_k_with_custom_spacing():
+    spec = [(ts, "PATTERN") for ts in range(0, 1000, 50)]
+    events = _events(spec)
+    # Higher payload score ranks first.
+    moments = build_moments(
+        MATCH_ID, events, max_moments=4, spacing_seconds=200, rank=lambda e: -e.payload["score"]
+    )
+    # Picked best-first (20, 16, 12, 8), numbered in match time.
+    assert [m.moment_id for m in moments] == [f"{MATCH_ID}:M0{i}" for i in range(1, 5)]
+    assert [int(r) for r in _refs(moments)] == [8, 12, 16, 20]
+
+
+def test_tiny_matches_are_padded_to_minimum():
+    events = _events([(0, "SNAPSHOT"), (10, "SNAPSHOT")])
+    assert _refs(build_moments(MATCH_ID, events)) == ["000001", "000002"]
+
+
+def test_default_rank_prefers_events_near_strong_change_points():
+    spec = [
+        (0, "TEAMFIGHT"),
+        (200, "CHANGE_POINT"),
+        (210, "TEAMFIGHT"),
+        (400, "PATTERN"),
+        (600, "CHANGE_POINT"),
+    ]
+    events = _events(spec, magnitudes={2: 4.0, 5: 9.0})
+    moments = build_moments(MATCH_ID, events, max_moments=3)
+    # Picked strongest shift first (600s, 210s, 0s); the teamfight beats the bare change point
+    # next to it. Ids still follow match time.
+    assert _refs(moments) == ["000001", "000003", "000005"]
+    assert [m.start_ts for m in moments] == sorted(m.start_ts for m in moments)
+
+
+def test_long_fight_is_split_into_segments_with_an_end():
+    timestamps = list(range(0, 400, 10))
+    is_fight = [True] * len(timestamps)
+    is_fight[10] = False  # brief gap inside the merged fight
+    fight = {"start_frame": 1, "start_ts": 10, "end_ts": 300}
+
+    assert fight_segments(fight, timestamps, is_fight, segment_seconds=90) == [
+        (1, "start"),
+        (11, "ongoing"),
+        (20, "ongoing"),
+        (29, "ongoing"),
+        (30, "end"),
+    ]
+    short = {"start_frame": 3, "start_ts": 30, "end_ts": 30}
+    assert fight_segments(short, timestamps, is_fight) == [(3, "start")]
+
+
+def _fight_frame(ts: int, fourth_blue_x: int) -> dict:
+    blue = [{"id": f"b{i}", "position": {"x": i, "y": 0}} for i in range(3)]
+    blue.append({"id": "b3", "position": {"x": fourth_blue_x, "y": 0}})
+    red = [{"id": f"r{i}", "position": {"x": 100 + i, "y": 0}} for i in range(3)]
+    return {"ts": ts, "game": {"teams": [{"players": blue}, {"players": red}]}}
+
+
+def test_fight_events_only_carry_state_known_at_their_frame():
+    # A fourth blue player joins the fight at 100s.
+    frames = [_fight_frame(ts, 3 if ts >= 100 else 10_000) for ts in range(0, 120, 10)]
+    events = synthesize_events(MATCH_ID, {"frames": frames})
+    fight = [
+        (e.ts, e.payload["phase"], e.payload["duration_seconds"], e.payload["participants"])
+        for e in events
+        if e.event_type == "TEAMFIGHT"
+    ]
+    assert fight == [
+        (0, "start", 0, {"blue": 3, "red": 3}),
+        (90, "ongoing", 90, {"blue": 3, "red": 3}),
+        (110, "end", 110, {"blue": 4, "red": 3}),
+    ]
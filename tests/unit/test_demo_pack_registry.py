@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.demo_pack.registry import DemoPackRegistry, UnknownDemoPack, pack_resident_bytes
+
+
+@pytest.fixture
+def packs_dir(tmp_path, write_demo_pack):
+    write_demo_pack(tmp_path / "lcs-spring", ["TL-C9-G1"])
+    write_demo_pack(tmp_path / "lcs-summer", ["TL-C9-G2"])
+    write_demo_pack(tmp_path / "msi", ["C9-100-G1"])
+    (tmp_path / "not-a-pack").mkdir()
+    return tmp_path
+
+
+def test_packs_load_lazily_and_are_reused(packs_dir):
+    registry = DemoPackRegistry(packs_dir)
+    assert registry.available() == ["lcs-spring", "lcs-summer", "msi"]
+    assert registry.stats()["resident"] == []
+
+    stores = registry.get("msi")
+    assert stores.match_ids == ["C9-100-G1"]
+    assert registry.get("msi") is stores
+    assert registry.stats()["loads"] == 1 and registry.stats()["hits"] == 1
+
+
+def test_least_recently_used_pack_is_evicted_over_budget(packs_dir):
+    one_pack = pack_resident_bytes(packs_dir / "msi")
+    registry = DemoPackRegistry(packs_dir, max_bytes=2 * one_pack + one_pack // 2)
+
+    spring = registry.get("lcs-spring")
+    registry.get("lcs-summer")
+    registry.get("lcs-spring")  # summer is now least recently used
+    registry.get("msi")
+
+    assert registry.stats()["resident"] == ["lcs-spring", "msi"]
+    assert registry.evictions == 1
+    assert registry.get("lcs-spring") is spring
+    # An evicted pack is simply read again on its next use.
+    assert registry.get("lcs-summer").match_ids == ["TL-C9-G2"]
+
+
+def test_resident_bytes_include_columnar_files(tmp_path, write_demo_pack):
+    write_demo_pack(tmp_path / "json", ["TL-C9-G2"], events_per_match=20)
+    write_demo_pack(tmp_path / "columnar", ["TL-C9-G2"], events_per_match=20, columnar=True)
+
+    columnar_dir = tmp_path / "columnar" / "processed" / "columnar"
+    columns = sum(p.stat().st_size for p in columnar_dir.iterdir())
+    assert (columnar_dir / "manifest.json").exists()
+    json_only = pack_resident_bytes(tmp_path / "json")
+    assert pack_resident_bytes(tmp_path / "columnar") - json_only == columns
+
+
+@pytest.mark.parametrize("pack_id", ["../msi", ".hidden", "not-a-pack", "missing", "a/b"])
+def test_unknown_or_unsafe_pack_ids_are_rejected(packs_dir, pack_id):
+    with pytest.raises(UnknownDemoPack):
+        DemoPackRegistry(packs_dir).get(pack_id)
+
+
+def test_endpoints_select_pack_by_id(packs_dir, monkeypatch):
+    from backend import main
+
+    monkeypatch.setattr(main, "demo_packs", DemoPackRegistry(packs_dir))
+    client = TestClient(main.app)
+
+    assert client.get("/api/demo/packs").json()["packs"] == ["lcs-spring", "lcs-summer", "msi"]
+    assert client.get("/api/demo/matches", params={"pack_id": "lcs-summer"}).json() == {"matches": ["TL-C9-G2"]}
+    r = client.get("/api/demo/show-moments", params={"pack_id": "msi", "match_id": "C9-100-G1"})
+    assert r.status_code == 200 and [m["moment_id"] for m in r.json()["moments"]] == ["C9-100-G1:M01"]
+
+    r = client.get("/api/demo/matches", params={"pack_id": "../lcs-spring"})
+    assert r.status_code == 404
+    assert "Fix:" in r.json()["detail"]
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from backend.demo_pack import runtime
+from backend.demo_pack.io import write_indexed_json
+from backend.demo_pack.runtime import LazyStoreMapping, load_demo_stores
+
+
+def test_indexed_writer_matches_json_dump_byte_for_byte(tmp_path: Path) -> None:
+    data = {"version": 1, "matches": {"b": [{"x": 1, "nested": {"y": [1, 2]}}], "a": [], "ä": "ü"}}
+    path = tmp_path / "store.json"
+    entry = write_indexed_json(path, data, "matches")
+
+    raw = path.read_bytes()
+    assert raw == json.dumps(data, ensure_ascii=False, indent=2, sort_keys=True).encode("utf-8")
+    assert entry["size"] == len(raw)
+    for key, (start, end) in entry["keys"].items():
+        assert json.loads(raw[start:end]) == data["matches"][key]
+
+
+def test_indexed_pack_is_decoded_per_key(tmp_path: Path, write_demo_pack) -> None:
+    write_demo_pack(tmp_path, ["TL-C9-G2", "C9-100-G1"], events_per_match=3)
+    runtime._CACHED = None
+    try:
+        stores = load_demo_stores(tmp_path)
+        panels = stores.panels_by_evidence_id
+        assert isinstance(panels, LazyStoreMapping)
+        assert len(panels) == 6
+        assert panels.decoded_count == 0
+
+        panel = panels["TL-C9-G2:000002"]
+        assert panel.event.payload["label"] == "Ünïcode"
+        assert panels.decoded_count == 1
+        assert "C9-100-G1:000001" in panels and panels.decoded_count == 1
+        assert [e.global_seq for e in stores.events_by_match["C9-100-G1"]] == [1, 2, 3]
+    finally:
+        runtime._CACHED = None
+
+
+def test_moments_of_an_evidence_id_decode_only_its_match(tmp_path: Path, write_demo_pack) -> None:
+    write_demo_pack(tmp_path, ["TL-C9-G2", "C9-100-G1", "TL-100-G1"], events_per_match=3)
+    stores = runtime.read_demo_stores(tmp_path)
+    moments = stores.moments_by_match
+    assert isinstance(moments, LazyStoreMapping)
+
+    assert [m.moment_id for m in stores.moments_referencing("C9-100-G1", "C9-100-G1:000002")] == ["C9-100-G1:M01"]
+    assert stores.moments_referencing("C9-100-G1", "C9-100-G1:000009") == []
+    assert moments.decoded_count == 1
+
+
+def test_edited_store_falls_back_to_eager_loading(tmp_path: Path, write_demo_pack) -> None:
+    write_demo_pack(tmp_path, ["TL-C9-G2", "C9-100-G1"], events_per_match=3)
+    refs = tmp_path / "processed" / "evidence_refs.json"
+    data = json.loads(refs.read_text(encoding="utf-8"))
+    del data["panels"]["TL-C9-G2:000001"]
+    refs.write_text(json.dumps(data), encoding="utf-8")
+
+    runtime._CACHED = None
+    try:
+        panels = load_demo_stores(tmp_path).panels_by_evidence_id
+        assert isinstance(panels, dict)
+        assert "TL-C9-G2:000001" not in panels and len(panels) == 5
+    finally:
+        runtime._CACHED = None
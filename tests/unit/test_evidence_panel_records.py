@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from backend.demo_pack import runtime
+from backend.demo_pack.builder import (
+    build_evidence_panels,
+    build_moments,
+    build_panel_records,
+    synthesize_events,
+)
+from backend.demo_pack.io import normalize_evidence_panels, write_stores
+from backend.demo_pack.runtime import load_demo_stores
+from scripts.verify_integrity import _verify_panel_record
+
+
+def _match(match_id: str) -> tuple[dict, dict]:
+    base = json.loads(Path("data/raw/real_data.json").read_text(encoding="utf-8"))
+    events = synthesize_events(match_id, {"match_id": match_id, "data": base})
+    return {match_id: events}, {match_id: build_moments(match_id, events)}
+
+
+def test_records_materialize_to_full_panels_with_shared_events():
+    events_by_match, moments_by_match = _match("TL-C9-G2")
+    records = build_panel_records(events_by_match, moments_by_match)
+    panels = build_evidence_panels(events_by_match, moments_by_match)
+
+    assert normalize_evidence_panels(events_by_match, panels) == records
+    panel = next(iter(panels.values()))
+    events = events_by_match["TL-C9-G2"]
+    assert panel.context_window and all(any(e is x for x in events) for e in panel.context_window)
+
+
+def test_runtime_serves_same_panels_from_records(tmp_path: Path):
+    events_by_match, moments_by_match = _match("C9-100-G1")
+    panels = build_evidence_panels(events_by_match, moments_by_match)
+    records = build_panel_records(events_by_match, moments_by_match)
+    write_stores(tmp_path, events_by_match, moments_by_match, [], records)
+
+    stored = json.loads((tmp_path / "processed" / "evidence_refs.json").read_text(encoding="utf-8"))
+    assert stored["version"] == 2
+    assert all("context_window" not in p for p in stored["panels"].values())
+
+    runtime._CACHED = None
+    try:
+        loaded = load_demo_stores(tmp_path).panels_by_evidence_id
+        for evidence_id, panel in panels.items():
+            assert loaded[evidence_id].model_dump() == panel.model_dump()
+    finally:
+        runtime._CACHED = None
+
+
+def test_verifier_flags_dangling_record():
+    events_by_match, moments_by_match = _match("TL-C9-G2")
+    events = [e.model_dump() for e in events_by_match["TL-C9-G2"]]
+    moments = [m.model_dump() for m in moments_by_match["TL-C9-G2"]]
+    records = build_panel_records(events_by_match, moments_by_match)
+    record = next(iter(records.values())).model_dump()
+
+    assert _verify_panel_record(record["evidence_id"], record, events, moments) == []
+    record["event_index"] = len(events)
+    record["related_moment_ids"] = ["TL-C9-G2:M99"]
+    assert len(_verify_panel_record(record["evidence_id"], record, events, moments)) == 2
+
+
+def test_sweeps_match_brute_force_windows_and_moments():
+    import random
+
+    from backend.demo_pack.builder import _context_windows, _covering_moments
+    from backend.demo_pack.schemas import DemoMoment
+
+    rng = random.Random(7)
+    timestamps = sorted(rng.randrange(0, 2000, 5) for _ in range(300))
+    moments = [
+        DemoMoment(
+            match_id="M",
+            moment_id=f"M:{j}",
+            title="t",
+            description="d",
+            start_ts=start,
+            end_ts=start + rng.randrange(0, 200),
+            passes_validity_filter=True,
+            validity_reasons=["r"],
+            primary_event_ref="M:000001",
+        )
+        for j, start in enumerate(rng.randrange(0, 2000) for _ in range(20))
+    ]
+
+    windows = _context_windows(timestamps, 60)
+    related = _covering_moments(timestamps, moments)
+    for ts, (start, end), rel in zip(timestamps, windows, related):
+        in_window = [i for i, x in enumerate(timestamps) if ts - 60 <= x <= ts + 60]
+        assert list(range(start, end)) == in_window
+        assert rel == [m.moment_id for m in moments if m.start_ts <= ts <= m.end_ts]
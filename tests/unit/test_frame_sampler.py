@@ -0,0 +1,50 @@
+from itertools import pairwise
+
+import pytest
+
+from backend.engines.frame_sampler import FrameSampler
+
+
+def _run(sampler, n, priority=lambda idx: False):
+    for idx in range(n):
+        sampler.offer(idx, idx * 10, lambda idx=idx: idx, priority=priority(idx))
+    return sampler.samples()
+
+
+def test_short_match_keeps_every_frame():
+    for mode in ("stride", "time", "adaptive"):
+        assert _run(FrameSampler(target_frames=100, mode=mode), 60) == list(range(60))
+
+
+def test_stride_covers_full_match_within_target():
+    samples = _run(FrameSampler(target_frames=100, mode="stride"), 5000)
+    assert 50 <= len(samples) <= 100
+    assert samples[0] == 0
+    assert samples[-1] >= 5000 - 5000 // 50
+
+
+def test_time_mode_resamples_by_game_time():
+    samples = _run(FrameSampler(target_frames=50, mode="time", bucket_seconds=10), 1000)
+    assert len(samples) <= 50
+    gaps = {b - a for a, b in pairwise(samples)}
+    assert len(gaps) == 1
+
+
+def test_adaptive_keeps_teamfight_frames():
+    fight = set(range(3000, 3006))
+    samples = _run(FrameSampler(target_frames=40, mode="adaptive"), 4000, priority=lambda idx: idx in fight)
+    assert len(samples) <= 40
+    assert fight <= set(samples)
+
+
+def test_payload_is_only_built_for_kept_frames():
+    built = []
+    sampler = FrameSampler(target_frames=10, mode="stride")
+    for idx in range(1000):
+        sampler.offer(idx, idx * 10, lambda idx=idx: built.append(idx) or idx)
+    assert len(built) < 100
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        FrameSampler(mode="random")
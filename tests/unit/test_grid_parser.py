@@ -1,6 +1,7 @@
 import pytest
+import io
 import json
-from backend.parsers.grid_parser import load_grid_data, extract_player_positions
+from backend.parsers.grid_parser import load_grid_data, extract_player_positions, extract_position_tensor, iter_json_frames
 
 def test_load_grid_data_not_found():
     with pytest.raises(FileNotFoundError):
@@ -47,3 +48,68 @@ def test_extract_player_positions_missing_coords():
     }
     positions = extract_player_positions(mock_game)
     assert len(positions[0]) == 0
+
+def _frames_from(text, chunk_size=7):
+    return list(iter_json_frames(io.BytesIO(text.encode("utf-8")), chunk_size=chunk_size))
+
+def test_iter_json_frames_jsonl_small_chunks():
+    frames = [{"data": {"seriesState": {"id": f"S{i}", "name": "Spieler ä"}}} for i in range(20)]
+    text = "\n".join(json.dumps(f, ensure_ascii=False) for f in frames) + "\n\n"
+    assert _frames_from(text) == frames
+    assert _frames_from(text, chunk_size=1) == frames
+
+def test_iter_json_frames_single_object_and_array():
+    frame = {"data": {"seriesState": {"id": "S1", "games": [{"teams": []}]}}}
+    assert _frames_from(json.dumps(frame, indent=2)) == [frame]
+    assert _frames_from(json.dumps([frame, 1, frame], indent=2)) == [frame, frame]
+
+def test_iter_json_frames_invalid_raises():
+    with pytest.raises(ValueError):
+        _frames_from('{"data": {"seriesState": ')
+
+def test_extract_position_tensor_matches_dict_extraction():
+    game_1 = {
+        "teams": [
+            {"players": [
+                {"id": "1", "name": "Player1", "position": {"x": 100, "y": 200}, "alive": True},
+                {"id": "2", "name": "Player2", "position": {"x": 300, "y": 400}, "alive": False},
+            ]},
+            {"players": [{"id": "3", "name": "Player3", "position": {"x": 500, "y": 600}}]},
+        ]
+    }
+    game_2 = {
+        "teams": [
+            {"players": [
+                {"id": "1", "name": "Player1", "position": None},
+                {"id": "2", "name": "Player2", "position": {"x": 310, "y": 410}},
+            ]},
+            {"players": [
+                {"id": "3", "name": "Player3", "position": {"x": 510, "y": 610}},
+                {"id": "4", "name": "Player4", "position": {"x": 700, "y": 800}},
+            ]},
+        ]
+    }
+    tensor = extract_position_tensor([game_1, game_2])
+
+    assert tensor.xy.shape[:2] == (2, 2)
+    assert tensor.player_ids == [["1", "2"], ["3", "4"]]
+    for frame, game in enumerate([game_1, game_2]):
+        assert tensor.frame_players(frame) == extract_player_positions(game)
+
+def test_extract_position_tensor_grows_beyond_initial_capacity():
+    games = [{"teams": [{"players": [
+        {"id": str(p), "name": f"P{p}", "position": {"x": f, "y": p}} for p in range(7)
+    ]}]} for f in range(100)]
+    tensor = extract_position_tensor(games)
+    assert tensor.frame_count == 100
+    assert tensor.xy[99, 0, 6].tolist() == [99.0, 6.0]
+
+def test_extract_position_tensor_interns_ids_as_strings_and_skips_duplicates():
+    game = {"teams": [{"players": [
+        {"id": 7, "name": "A", "position": {"x": 1, "y": 2}},
+        {"id": "7", "name": "B", "position": {"x": 3, "y": 4}},
+        {"id": 8, "name": "C", "position": {"x": 5, "y": 6}},
+    ]}]}
+    tensor = extract_position_tensor([game, game])
+    assert tensor.player_ids[0] == ["7", "8"]
+    assert [(p["id"], p["x"]) for p in tensor.team_players(1, 0)] == [("7", 1.0), ("8", 5.0)]
@@ -0,0 +1,183 @@
+import asyncio
+import json
+
+import pytest
+
+from backend.live import (
+    LiveMatchSession,
+    LiveSessionConflict,
+    LiveSessionLimit,
+    LiveSessionRegistry,
+)
+
+
+def _players(x_offset, base):
+    return [
+        {
+            "id": f"{base}{i}",
+            "name": f"P{base}{i}",
+            "position": {"x": x_offset + base + i * 50, "y": 1000},
+        }
+        for i in range(5)
+    ]
+
+
+def _frame(x_offset):
+    teams = [{"players": _players(x_offset, 0)}, {"players": _players(x_offset, 100)}]
+    return {"data": {"seriesState": {"id": "LIVE", "games": [{"teams": teams}]}}}
+
+
+def test_session_emits_one_delta_per_frame_and_ends():
+    session = LiveMatchSession("m1")
+
+    async def scenario():
+        queue = session.subscribe()
+        stream = session.events(queue)
+        chunks = [await stream.__anext__()]
+        for i in range(3):
+            session.push_frame(_frame(i * 10))
+        session.close()
+        async for chunk in stream:
+            chunks.append(chunk)
+        return chunks
+
+    chunks = asyncio.run(scenario())
+    events = [c.split("\n")[0] for c in chunks]
+    assert events == [
+        "event: snapshot",
+        "event: frame",
+        "event: teamfight",
+        "event: frame",
+        "event: frame",
+        "event: teamfight",
+        "event: end",
+    ]
+
+    delta = json.loads(chunks[1].split("\n")[1][len("data: "):])
+    assert delta["frame"] == 0
+    assert delta["is_teamfight"] is True
+    assert delta["teamfight"]["start_time_seconds"] == 0
+    start = json.loads(chunks[2].split("\n")[1][len("data: "):])
+    end = json.loads(chunks[5].split("\n")[1][len("data: "):])
+    assert (start["type"], end["type"]) == ("start", "end")
+    assert end["duration_seconds"] == 20
+    assert session.subscriber_count == 0
+
+
+def test_session_snapshot_matches_batch_analysis():
+    from backend.engines.match_analyzer import analyze_frames
+
+    frames = [_frame(i * 10) for i in range(20)]
+    session = LiveMatchSession("m2")
+    for f in frames:
+        session.push_frame(f)
+
+    assert session.snapshot() == analyze_frames(frames)
+
+
+def test_registry_refuses_sessions_beyond_limit_when_all_are_watched():
+    registry = LiveSessionRegistry(max_sessions=1)
+    registry.get_or_create("a").subscribe()
+    with pytest.raises(LiveSessionLimit):
+        registry.get_or_create("b")
+    assert registry.close("a")
+    assert registry.get_or_create("b").session_id == "b"
+
+
+def test_registry_evicts_only_closed_or_idle_sessions_oldest_first():
+    registry = LiveSessionRegistry(max_sessions=2, idle_seconds=60)
+    fed = registry.get_or_create("fed")
+    fed.push_frame(_frame(0))  # unwatched but still receiving frames
+    other = registry.get_or_create("other")
+    with pytest.raises(LiveSessionLimit):
+        registry.get_or_create("new")
+
+    fed.last_active -= 120
+    other.last_active -= 600
+    registry.get_or_create("new")
+    assert other.closed and registry.get("other") is None
+    assert registry.get("fed") is fed and not fed.closed
+
+
+def test_frame_deltas_keep_the_fight_state_of_their_own_frame():
+    session = LiveMatchSession("m7")
+
+    async def scenario():
+        queue = session.subscribe()
+        deltas = session.push_frames([_frame(i * 10) for i in range(4)])
+        published = []
+        while not queue.empty():
+            event, data = queue.get_nowait()
+            if event == "frame":
+                published.append(json.loads(json.dumps(data)))
+        return deltas, published
+
+    deltas, published = asyncio.run(scenario())
+    assert [d["teamfight"]["duration_seconds"] for d in deltas] == [0, 10, 20, 30]
+    assert [d["teamfight"]["end_time_seconds"] for d in published] == [0, 10, 20, 30]
+
+
+def test_registry_rejects_other_settings_for_an_open_session():
+    registry = LiveSessionRegistry(max_sessions=2)
+    session = registry.get_or_create("m", target_frames=50, sampling="stride")
+    assert registry.get_or_create("m") is session
+    assert registry.get_or_create("m", target_frames=50) is session
+    with pytest.raises(LiveSessionConflict, match="sampling=stride"):
+        registry.get_or_create("m", sampling="time")
+    registry.close("m")
+    assert registry.get_or_create("m", sampling="time").sampling == "time"
+
+
+def test_lagging_subscriber_gets_an_end_event(monkeypatch):
+    from backend import live
+
+    monkeypatch.setattr(live, "SUBSCRIBER_QUEUE_SIZE", 2)
+    session = LiveMatchSession("m3")
+
+    async def scenario():
+        queue = session.subscribe()
+        stream = session.events(queue)
+        chunks = [await stream.__anext__()]
+        for i in range(5):
+            session.push_frame(_frame(i * 10))
+        async for chunk in stream:
+            chunks.append(chunk)
+        return chunks
+
+    chunks = asyncio.run(scenario())
+    assert [c.split("\n")[0] for c in chunks] == ["event: snapshot", "event: end"]
+    end = json.loads(chunks[1].split("\n")[1][len("data: "):])
+    assert end["reason"] == "lagged"
+    assert session.subscriber_count == 0
+
+
+def test_invalid_frame_leaves_session_untouched():
+    session = LiveMatchSession("m4")
+    with pytest.raises(ValueError, match="frame 1"):
+        session.push_frames([_frame(0), {"data": {"seriesState": []}}])
+    assert session.analyzer.frame_count == 0
+
+
+def test_bad_player_positions_are_rejected_up_front():
+    bad = _frame(0)
+    bad["data"]["seriesState"]["games"][0]["teams"][1]["players"][2]["position"]["x"] = "abc"
+    session = LiveMatchSession("m5")
+    with pytest.raises(ValueError, match="frame 1: .*player positions"):
+        session.push_frames([_frame(0), bad])
+    with pytest.raises(ValueError, match="frame 0"):
+        session.push_frames([{"data": {"seriesState": {"games": [{"teams": [1]}]}}}])
+    assert session.analyzer.frame_count == 0
+
+
+def test_async_push_publishes_deltas_in_order():
+    session = LiveMatchSession("m6")
+
+    async def scenario():
+        queue = session.subscribe()
+        first = session.push_frames_async([_frame(0), _frame(10)])
+        second = session.push_frames_async([_frame(20)])
+        await asyncio.gather(first, second)
+        return [queue.get_nowait() for _ in range(queue.qsize())]
+
+    published = asyncio.run(scenario())
+    assert [d["frame"] for event, d in published if event == "frame"] == [0, 1, 2]
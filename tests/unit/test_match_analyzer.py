@@ -0,0 +1,22 @@
+from backend.engines.match_analyzer import MatchAnalyzer
+
+
+def _frame(idx):
+    players = [{"id": f"p{i}", "position": {"x": 1000 + i * 400, "y": 1000}} for i in range(5)]
+    teams = [{"players": players}, {"players": []}]
+    return {"data": {"seriesState": {"id": "S_LAST", "games": [{"teams": teams}]}}}
+
+
+def test_final_risk_comes_from_the_last_frame_not_the_last_sample():
+    analyzer = MatchAnalyzer(target_frames=50, sampling="stride")
+    deltas = []
+    for idx in range(360):
+        analyzer.add_frame(_frame(idx))
+        deltas.extend(analyzer.flush())
+
+    result = analyzer.result()
+    last = deltas[-1]
+    assert last["frame"] == 359 and not last["sampled"]
+    assert result["timeline"][-1]["risk_score"] != last["risk_score"]
+    assert result["risk_score"] == last["risk_score"]
+    assert result["stage"] == last["stage"]
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from backend.demo_pack.metrics import decode_bitmap, encode_bitmap, kept_event_mask, merge_windows
+from backend.demo_pack.schemas import DemoEvent
+
+
+def _event(i: int, ts: int, event_type: str = "SNAPSHOT") -> DemoEvent:
+    return DemoEvent(
+        match_id="TL-C9-G2",
+        ts=ts,
+        game_time="00:00",
+        event_type=event_type,
+        global_seq=i + 1,
+        evidence_id=f"TL-C9-G2:{i + 1:06d}",
+    )
+
+
+def test_merge_windows_joins_overlapping_and_touching_windows():
+    windows = [(50, 60), (0, 10), (10, 20), (55, 70), (30, 40)]
+    assert merge_windows(windows) == [(0, 20), (30, 40), (50, 70)]
+
+
+def test_kept_event_mask_matches_brute_force():
+    rng = random.Random(7)
+    for _ in range(50):
+        events = [
+            _event(i, rng.randrange(0, 600), rng.choice(["SNAPSHOT", "TEAMFIGHT"]))
+            for i in range(40)
+        ]
+        starts = [rng.randrange(0, 600) for _ in range(rng.randrange(0, 6))]
+        windows = [(lo, lo + rng.randrange(0, 90)) for lo in starts]
+        expected = [
+            e.event_type == "TEAMFIGHT" or any(lo <= e.ts <= hi for lo, hi in windows)
+            for e in events
+        ]
+        assert kept_event_mask(events, windows, {"TEAMFIGHT"}) == expected
+
+
+@pytest.mark.parametrize("length", [0, 1, 8, 13])
+def test_bitmap_round_trip(length):
+    flags = [i % 3 == 0 for i in range(length)]
+    assert decode_bitmap(encode_bitmap(flags), length) == flags
+
+
+def test_bitmap_length_mismatch_is_rejected():
+    with pytest.raises(ValueError):
+        decode_bitmap(encode_bitmap([True] * 9), 20)
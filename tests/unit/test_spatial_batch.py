@@ -0,0 +1,70 @@
+import numpy as np
+
+from backend.engines.spatial_analyzer import (
+    analyze_isolation,
+    calculate_cohesion_score,
+    detect_teamfight,
+)
+from backend.engines.spatial_batch import (
+    analyze_frame_batch,
+    batch_cohesion_scores,
+    batch_detect_teamfight,
+)
+
+
+def _random_positions(frames=200, players=5, seed=7):
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform(0, 15000, size=(frames, 1, 1, 2))
+    positions = centers + rng.normal(0, 1500, size=(frames, 2, players, 2))
+    # Some players without coordinates
+    missing = rng.random((frames, 2, players)) < 0.1
+    positions[missing] = np.nan
+    return positions
+
+
+def _as_dicts(positions, frame):
+    teams = []
+    for t in range(positions.shape[1]):
+        players = []
+        for p in range(positions.shape[2]):
+            x, y = positions[frame, t, p]
+            if np.isnan(x):
+                continue
+            players.append({"id": f"{t}-{p}", "name": f"P{t}{p}", "x": float(x), "y": float(y)})
+        teams.append(players)
+    return teams
+
+
+def test_batch_matches_scalar_functions_exactly():
+    positions = _random_positions()
+    batch = analyze_frame_batch(positions)
+
+    for f in range(positions.shape[0]):
+        teams = _as_dicts(positions, f)
+        for t in range(2):
+            assert batch["cohesion"][f, t] == calculate_cohesion_score(teams[t])
+        assert bool(batch["teamfight"][f]) == detect_teamfight(teams)
+
+        alerts = analyze_isolation(teams[1], teams[0])
+        isolated = [
+            f"P1{p}" for p in range(positions.shape[2]) if batch["isolated"][f, 1, p]
+        ]
+        assert [a["player"] for a in alerts] == isolated
+        for a in alerts:
+            p = int(a["player"][-1])
+            assert a["dist_ally"] == round(float(batch["min_ally_dist"][f, 1, p]), 1)
+            assert a["dist_enemy"] == round(float(batch["min_enemy_dist"][f, 1, p]), 1)
+
+
+def test_batch_teamfight_finds_fights():
+    blue = [[1000, 1000], [1100, 1100], [1200, 1200]]
+    red = [[1050, 1050], [1150, 1150], [1250, 1250]]
+    far = [[9000, 9000], [9100, 9100], [9200, 9200]]
+    positions = np.array([[blue, red], [blue, far]], dtype=float)
+    assert batch_detect_teamfight(positions).tolist() == [True, False]
+
+
+def test_batch_cohesion_single_player_is_full_score():
+    positions = np.full((1, 2, 5, 2), np.nan)
+    positions[0, 0, 0] = [100, 100]
+    assert batch_cohesion_scores(positions).tolist() == [[100.0, 100.0]]
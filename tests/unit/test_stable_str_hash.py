@@ -0,0 +1,13 @@
+from backend.demo_pack.determinism import stable_str_hash
+
+
+def test_stable_str_hash_ignores_key_order_and_has_fixed_width():
+    a = stable_str_hash({"frame_idx": 3, "participants": {"blue": 3, "red": 4}})
+    b = stable_str_hash({"participants": {"red": 4, "blue": 3}, "frame_idx": 3})
+    assert a == b
+    assert len(a) == len(stable_str_hash({"label": "x" * 10_000})) == 32
+
+
+def test_stable_str_hash_distinguishes_payloads():
+    assert stable_str_hash({"frame_idx": 1}) != stable_str_hash({"frame_idx": 2})
+    assert stable_str_hash({"label": "1"}) != stable_str_hash({"label": 1})
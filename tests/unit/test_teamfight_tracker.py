@@ -0,0 +1,49 @@
+from backend.engines.match_analyzer import analyze_frames
+from backend.engines.teamfight_tracker import TeamfightTracker, track_teamfights
+
+
+def _run(flags, step=10):
+    counts = [3 if f else 0 for f in flags]
+    timestamps = [i * step for i in range(len(flags))]
+    return track_teamfights(range(len(flags)), timestamps, counts, counts)
+
+
+def test_frames_within_gap_merge_into_one_fight():
+    fights = _run([1, 1, 0, 1, 0, 0, 0, 1])
+    spans = [(f["start_ts"], f["end_ts"], f["duration_seconds"]) for f in fights]
+    assert spans == [(0, 30, 30), (70, 70, 0)]
+
+
+def test_tracker_emits_start_and_end_events():
+    tracker = TeamfightTracker()
+    assert [e["type"] for e in tracker.update(0, 0, 4, 3)] == ["start"]
+    assert tracker.update(1, 10, 5, 3) == []
+    assert tracker.current["participants"] == {"blue": 5, "red": 3}
+    # Nach der Merge-Lücke wird der Fight beendet, ohne dass ein neuer beginnt
+    events = tracker.update(4, 40, 0, 0)
+    assert [e["type"] for e in events] == ["end"]
+    assert events[0]["fight"]["end_ts"] == 10
+    assert tracker.current is None
+    assert tracker.close() == []
+
+
+def test_open_fight_is_closed_at_match_end():
+    tracker = TeamfightTracker()
+    tracker.update(0, 0, 3, 3)
+    assert [e["type"] for e in tracker.close()] == ["end"]
+
+
+def _players(x):
+    return [
+        {"id": f"p{x}{i}", "name": f"P{x}{i}", "position": {"x": x + i, "y": 0}}
+        for i in range(3)
+    ]
+
+
+def test_analyzer_teamfights_carry_duration_and_participants():
+    game = {"teams": [{"players": _players(0)}, {"players": _players(100)}]}
+    frames = [{"data": {"seriesState": {"games": [game]}}}] * 4
+    teamfights = analyze_frames(frames)["teamfights"]
+    assert len(teamfights) == 1
+    assert teamfights[0]["duration_seconds"] == 30
+    assert teamfights[0]["participants"] == {"blue": 3, "red": 3}